@@ -21,6 +21,8 @@ class AccessDB(object):
         self.path = path
         self.log_enabled = log_enabled
         self.connection_string = self.getConnectionString(path)
+        self.connection = None
+        self._engine = None
 
     def __enter__(self):
         self.connection = pyodbc.connect(
@@ -34,6 +36,9 @@ class AccessDB(object):
     def close(self):
         if self.connection:
             self.connection.close()
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
 
     def getConnectionString(self, path):
         return (
@@ -167,25 +172,27 @@ class AccessDB(object):
     def as_data_frame(self, query):
         """Return the result of the specified query as a pandas DataFrame.
 
+        The sqlalchemy engine used for the query is created on the first
+        call, and its pooled connection is re-used by subsequent calls until
+        :py:func:`close` is called.
+
         Args:
             query (str): access database SQL query
 
         Returns:
             pandas.DataFrame: the query result
         """
-
-        connection_string = (
-            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-            f"DBQ={self.path};"
-            r"ExtendedAnsiSQL=1;"
-        )
-        connection_url = (
-            f"access+pyodbc:///?odbc_connect={quote_plus(connection_string)}"
-        )
-        engine = sa.create_engine(connection_url)
-        try:
-            with engine.begin() as conn:
-                df = pd.read_sql(sa_text(query), conn)
-            return df
-        finally:
-            engine.dispose()
+        if self._engine is None:
+            connection_string = (
+                r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+                f"DBQ={self.path};"
+                r"ExtendedAnsiSQL=1;"
+            )
+            connection_url = (
+                "access+pyodbc:///?odbc_connect="
+                f"{quote_plus(connection_string)}"
+            )
+            self._engine = sa.create_engine(connection_url, pool_size=1)
+        with self._engine.begin() as conn:
+            df = pd.read_sql(sa_text(query), conn)
+        return df
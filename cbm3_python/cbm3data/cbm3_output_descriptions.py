@@ -1,7 +1,10 @@
 import os
+import hashlib
 from types import SimpleNamespace
 from cbm3_python.cbm3data.accessdb import AccessDB
 import pandas as pd
+import sqlalchemy
+import warnings
 from warnings import warn
 
 
@@ -36,16 +39,69 @@ def _load_substituted(aidb: AccessDB, table_name):
         return pd.read_csv(path)
 
 
-def load_archive_index_data(aidb_path):
+def _get_snapshot_path(db_path, cache_dir, prefix):
+    db_path = os.path.abspath(db_path)
+    stat = os.stat(db_path)
+    key = hashlib.sha1(
+        f"{db_path}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")
+    ).hexdigest()
+    return os.path.join(cache_dir, f"{prefix}_{key}.h5")
+
+
+def _load_snapshot(db_path, cache_dir, prefix, load_func):
+    """Load a namespace of metadata tables using a snapshot file stored in
+    the specified cache dir. The snapshot is keyed by the database path,
+    size and modification time, so that a changed database is re-queried.
+    If no matching snapshot exists load_func is called and the result is
+    stored.
+    """
+    if not cache_dir:
+        return load_func(db_path)
+    snapshot_path = _get_snapshot_path(db_path, cache_dir, prefix)
+    if os.path.exists(snapshot_path):
+        with pd.HDFStore(snapshot_path, mode="r") as store:
+            # the original table ordering is preserved since tables are
+            # written in this order by the loaders
+            return SimpleNamespace(
+                **{name: store[name] for name in store["table_order"]}
+            )
+    data = load_func(db_path)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    # write to a temporary path first so that concurrent or interrupted
+    # loads never see a partial snapshot
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with pd.HDFStore(temp_path, mode="w") as store, warnings.catch_warnings():
+        # the metadata tables are small, so pickling of mixed type object
+        # columns is acceptable here
+        warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+        for name, df in data.__dict__.items():
+            store.put(name, df.reset_index(drop=True), format="fixed")
+        store.put("table_order", pd.Series(list(data.__dict__.keys())))
+    os.replace(temp_path, snapshot_path)
+    return data
+
+
+def load_archive_index_data(aidb_path, cache_dir=None):
     """Loads descriptive/metadata tables from the specified CBM3 MS access
     archive index database path.
 
     Args:
         aidb_path (str): Path to a CBM-CFS3 archive index database.
+        cache_dir (str, optional): If specified, a directory in which
+            metadata snapshots are stored and re-used when the database
+            path, size and modification time are unchanged. Defaults to
+            None.
 
     Returns:
         namespace: A namespace of descriptive pandas.DataFrame
     """
+    return _load_snapshot(
+        aidb_path, cache_dir, "aidb", _load_archive_index_data
+    )
+
+
+def _load_archive_index_data(aidb_path):
     with AccessDB(aidb_path) as accessdb:
         aidb_data = SimpleNamespace(
             tblEcoBoundaryDefault=accessdb.as_data_frame(
@@ -86,16 +142,26 @@ def load_archive_index_data(aidb_path):
     return aidb_data
 
 
-def load_project_level_data(project_db_path):
+def load_project_level_data(project_db_path, cache_dir=None):
     """Loads descriptive/metadata tables from the specified CBM3 MS access
     project database path.
 
     Args:
         project_db_path (str): Path to a CBM-CFS3 project database
+        cache_dir (str, optional): If specified, a directory in which
+            metadata snapshots are stored and re-used when the database
+            path, size and modification time are unchanged. Defaults to
+            None.
 
     Returns:
         namespace: A namespace of descriptive pandas.DataFrames
     """
+    return _load_snapshot(
+        project_db_path, cache_dir, "project", _load_project_level_data
+    )
+
+
+def _load_project_level_data(project_db_path):
     with AccessDB(project_db_path) as accessdb:
         tblDisturbanceType = accessdb.as_data_frame(
             "SELECT DistTypeID, DistTypeName, Description, DefaultDistTypeID "
@@ -195,6 +261,81 @@ def create_project_level_output_tables(project_descriptions):
     return result
 
 
+# join definitions for each dimension exported by
+# ResultsDescriber.get_dimension_tables in terms of:
+#     (dimension table name, dimension key, fact key, column aliases)
+# If column aliases is None, all non-fact columns of the dimension are used.
+_DIMENSION_JOINS = {
+    "landclass": [
+        (
+            "dimUNFCCCLandClass",
+            "UNFCCCLandClassID",
+            "LandClassID",
+            {"Name": "UNFCCCLandClassName"},
+        ),
+        (
+            "dimKP3334Flags",
+            "KP3334ID",
+            "kf2",
+            {"Name": "KP3334Name", "Description": "KP3334Description"},
+        ),
+    ],
+    "spatial_unit": [
+        ("dimSpatialUnit", "ProjectSPUID", "SPUID", None),
+    ],
+    "disturbance_type": [
+        ("dimDisturbanceType", "ProjectDistTypeID", "DistTypeID", None),
+    ],
+    "age_class": [("dimAgeClass", "AgeClassID", "AgeClassID", None)],
+    "classifier_set": [
+        ("dimClassifierSet", "ClassifierSetID", "UserDefdClassSetID", None),
+    ],
+}
+
+
+def create_descriptive_view_select(fact_table, dimension_tables, dimensions):
+    """Create a select statement that joins a fact table to dimension tables
+    to produce the same descriptive columns as the corresponding
+    ResultsDescriber merge functions.
+
+    Args:
+        fact_table (sqlalchemy.Table): the compact fact table
+        dimension_tables (dict): dictionary of dimension table name to
+            sqlalchemy.Table for the tables returned by
+            :py:func:`ResultsDescriber.get_dimension_tables`
+        dimensions (list): the ordered list of dimension names to join to
+            the fact table. Supported values are "landclass",
+            "spatial_unit", "disturbance_type", "age_class", and
+            "classifier_set"
+
+    Returns:
+        sqlalchemy.Select: the select statement
+    """
+    columns = list(fact_table.c)
+    from_clause = fact_table
+    for dimension in dimensions:
+        dimension_columns = []
+        for dim_name, dim_key, fact_key, aliases in _DIMENSION_JOINS[
+            dimension
+        ]:
+            dim_table = dimension_tables[dim_name]
+            from_clause = from_clause.outerjoin(
+                dim_table, dim_table.c[dim_key] == fact_table.c[fact_key]
+            )
+            if aliases:
+                dimension_columns.extend(
+                    [dim_table.c[k].label(v) for k, v in aliases.items()]
+                )
+            else:
+                dimension_columns.extend(
+                    [c for c in dim_table.c if c.name not in fact_table.c]
+                )
+        # matches the column ordering of the merge functions, where each
+        # subsequent merge places its columns on the left
+        columns = dimension_columns + columns
+    return sqlalchemy.select(*columns).select_from(from_clause)
+
+
 def load_age_classes():
     """Loads the tblAgeClasses metadata table
 
@@ -214,9 +355,38 @@ class ResultsDescriber:
         aidb_path,
         loaded_csets,
         classifier_value_field="Name",
+        project_data=None,
+        aidb_data=None,
     ):
-        self.project_data = load_project_level_data(project_db_path)
-        self.aidb_data = load_archive_index_data(aidb_path)
+        """Create an object to merge descriptive metadata columns to CBM3
+        output tables.
+
+        Args:
+            project_db_path (str): Path to a CBM-CFS3 project database
+            aidb_path (str): Path to a CBM-CFS3 archive index database.
+            loaded_csets (pandas.DataFrame): the pivoted classifier sets
+                returned by
+                :py:func:`cbm3_output_classifiers.create_loaded_classifiers`
+            classifier_value_field (str, optional): the tblClassifierValues
+                column used to describe classifier values. Defaults to
+                "Name".
+            project_data (namespace, optional): previously loaded result of
+                :py:func:`load_project_level_data`. If None it is loaded
+                from project_db_path. Defaults to None.
+            aidb_data (namespace, optional): previously loaded result of
+                :py:func:`load_archive_index_data`. If None it is loaded
+                from aidb_path. Defaults to None.
+        """
+        self.project_data = (
+            project_data
+            if project_data is not None
+            else load_project_level_data(project_db_path)
+        )
+        self.aidb_data = (
+            aidb_data
+            if aidb_data is not None
+            else load_archive_index_data(aidb_path)
+        )
         self.default_view = self._create_default_data_views()
         self.project_view = self._create_project_data_view()
         self.age_classes = load_age_classes()
@@ -224,6 +394,49 @@ class ResultsDescriber:
             loaded_csets, classifier_value_field
         )
 
+    @classmethod
+    def from_dimension_tables(cls, dimension_tables):
+        """Create a ResultsDescriber from previously exported dimension
+        tables, without querying the project or archive index databases.
+
+        Args:
+            dimension_tables (object): a namespace of the tables returned by
+                :py:func:`ResultsDescriber.get_dimension_tables`
+
+        Returns:
+            ResultsDescriber: an instance whose merge functions use the
+                specified dimension tables.
+        """
+        describer = cls.__new__(cls)
+        describer.aidb_data = SimpleNamespace(
+            tblUNFCCCLandClass=dimension_tables.dimUNFCCCLandClass,
+            tblKP3334Flags=dimension_tables.dimKP3334Flags,
+        )
+        describer.project_view = SimpleNamespace(
+            project_spu_view=dimension_tables.dimSpatialUnit,
+            disturbance_type_view=dimension_tables.dimDisturbanceType,
+        )
+        describer.age_classes = dimension_tables.dimAgeClass
+        describer.mapped_csets = dimension_tables.dimClassifierSet
+        return describer
+
+    def get_dimension_tables(self):
+        """Get the descriptive tables used by the merge functions of this
+        instance in a form that can be written once alongside compact
+        integer fact tables and joined later.
+
+        Returns:
+            namespace: a namespace of dimension pandas.DataFrames
+        """
+        return SimpleNamespace(
+            dimSpatialUnit=self.project_view.project_spu_view,
+            dimDisturbanceType=self.project_view.disturbance_type_view,
+            dimClassifierSet=self.mapped_csets,
+            dimUNFCCCLandClass=self.aidb_data.tblUNFCCCLandClass,
+            dimKP3334Flags=self.aidb_data.tblKP3334Flags,
+            dimAgeClass=self.age_classes,
+        )
+
     def _create_default_data_views(self):
         default_spu_view = (
             self.aidb_data.tblSPUDefault[
@@ -379,6 +592,24 @@ class ResultsDescriber:
         )
         return mapped_csets
 
+    def get_merge_function(self, dimension):
+        """Get the merge function for the named dimension
+
+        Args:
+            dimension (str): one of "landclass", "spatial_unit",
+                "disturbance_type", "age_class", or "classifier_set"
+
+        Returns:
+            func: the merge function of this instance for the dimension
+        """
+        return {
+            "landclass": self.merge_landclass_description,
+            "spatial_unit": self.merge_spatial_unit_description,
+            "disturbance_type": self.merge_disturbance_type_description,
+            "age_class": self.merge_age_class_descriptions,
+            "classifier_set": self.merge_classifier_set_description,
+        }[dimension]
+
     def merge_spatial_unit_description(self, df):
         """Merges spatial unit metadata columns to a dataframe containing
         a project-level SPUID column.
@@ -41,20 +41,37 @@ def get_classifier_column_names():
     return [f"c{x}" for x in range(1, 11)]
 
 
-def load_pool_indicators(dir, chunksize=None):
-    """load cbmrun/output/poolind.out to a pandas.DataFrame
+def get_indicator_column_types(filename):
+    """Get the names and types of the columns of a CBM3 indicator output
+    file.
 
     Args:
-        dir (str): path to the CBMRun/output dir
-        chunksize (int, optional): If specified sets a maximum number of rows
-            to hold in memory at a given time while loading output.
-            Defaults to None.
+        filename (str): one of "poolind.out", "fluxind.out", "ageind.out",
+            or "distinds.out"
+
+    Raises:
+        ValueError: the specified file is not an indicator output file
 
     Returns:
-        pandas.DataFrame, or object: returns an iterable of dataframes
-            if chunksize is specified, and otherwise a single dataframe.
+        dict: the pandas dtype (values) of each column name (keys) in the
+            order of the columns in the file
     """
-    col_def = _build_col_def(
+    col_def_funcs = {
+        "poolind.out": _get_pool_indicators_col_def,
+        "fluxind.out": _get_flux_indicators_col_def,
+        "ageind.out": _get_age_indicators_col_def,
+        "distinds.out": _get_dist_indicators_col_def,
+    }
+    if filename not in col_def_funcs:
+        raise ValueError(f"unsupported indicator output file {filename}")
+    col_def = col_def_funcs[filename]()
+    return {
+        name: col_def.column_types[name] for name in col_def.column_names
+    }
+
+
+def _get_pool_indicators_col_def():
+    return _build_col_def(
         dict(column_names=["RunID", "TimeStep", "SPUID"], column_type="int64"),
         dict(column_names=get_classifier_column_names(), column_type="int64"),
         dict(
@@ -100,19 +117,9 @@ def load_pool_indicators(dir, chunksize=None):
         ),
     )
 
-    return pd.read_csv(
-        os.path.join(dir, "poolind.out"),
-        header=None,
-        sep=r'\s+',
-        names=col_def.column_names,
-        dtype=col_def.column_types,
-        chunksize=chunksize,
-        quoting=csv.QUOTE_NONE,
-    )
 
-
-def load_flux_indicators(dir, chunksize=None):
-    """load cbmrun/output/fluxind.out to a pandas.DataFrame
+def load_pool_indicators(dir, chunksize=None):
+    """load cbmrun/output/poolind.out to a pandas.DataFrame
 
     Args:
         dir (str): path to the CBMRun/output dir
@@ -124,7 +131,21 @@ def load_flux_indicators(dir, chunksize=None):
         pandas.DataFrame, or object: returns an iterable of dataframes
             if chunksize is specified, and otherwise a single dataframe.
     """
-    col_def = _build_col_def(
+    col_def = _get_pool_indicators_col_def()
+
+    return pd.read_csv(
+        os.path.join(dir, "poolind.out"),
+        header=None,
+        sep=r'\s+',
+        names=col_def.column_names,
+        dtype=col_def.column_types,
+        chunksize=chunksize,
+        quoting=csv.QUOTE_NONE,
+    )
+
+
+def _get_flux_indicators_col_def():
+    return _build_col_def(
         dict(
             column_names=["RunID", "TimeStep", "DistTypeID", "SPUID"],
             column_type="int64",
@@ -189,19 +210,9 @@ def load_flux_indicators(dir, chunksize=None):
         ),
     )
 
-    return pd.read_csv(
-        os.path.join(dir, "fluxind.out"),
-        header=None,
-        sep=r'\s+',
-        names=col_def.column_names,
-        dtype=col_def.column_types,
-        chunksize=chunksize,
-        quoting=csv.QUOTE_NONE,
-    )
-
 
-def load_age_indicators(dir, chunksize=None):
-    """load cbmrun/output/ageind.out to a pandas.DataFrame
+def load_flux_indicators(dir, chunksize=None):
+    """load cbmrun/output/fluxind.out to a pandas.DataFrame
 
     Args:
         dir (str): path to the CBMRun/output dir
@@ -213,7 +224,21 @@ def load_age_indicators(dir, chunksize=None):
         pandas.DataFrame, or object: returns an iterable of dataframes
             if chunksize is specified, and otherwise a single dataframe.
     """
-    col_def = _build_col_def(
+    col_def = _get_flux_indicators_col_def()
+
+    return pd.read_csv(
+        os.path.join(dir, "fluxind.out"),
+        header=None,
+        sep=r'\s+',
+        names=col_def.column_names,
+        dtype=col_def.column_types,
+        chunksize=chunksize,
+        quoting=csv.QUOTE_NONE,
+    )
+
+
+def _get_age_indicators_col_def():
+    return _build_col_def(
         dict(
             column_names=["RunID", "TimeStep", "SPUID", "AgeClass"],
             column_type="int64",
@@ -236,19 +261,9 @@ def load_age_indicators(dir, chunksize=None):
         ),
     )
 
-    return pd.read_csv(
-        os.path.join(dir, "ageind.out"),
-        header=None,
-        sep=r'\s+',
-        names=col_def.column_names,
-        dtype=col_def.column_types,
-        chunksize=chunksize,
-        quoting=csv.QUOTE_NONE,
-    )
-
 
-def load_dist_indicators(dir, chunksize=None):
-    """load cbmrun/output/distinds.out to a pandas.DataFrame
+def load_age_indicators(dir, chunksize=None):
+    """load cbmrun/output/ageind.out to a pandas.DataFrame
 
     Args:
         dir (str): path to the CBMRun/output dir
@@ -260,7 +275,21 @@ def load_dist_indicators(dir, chunksize=None):
         pandas.DataFrame, or object: returns an iterable of dataframes
             if chunksize is specified, and otherwise a single dataframe.
     """
-    col_def = _build_col_def(
+    col_def = _get_age_indicators_col_def()
+
+    return pd.read_csv(
+        os.path.join(dir, "ageind.out"),
+        header=None,
+        sep=r'\s+',
+        names=col_def.column_names,
+        dtype=col_def.column_types,
+        chunksize=chunksize,
+        quoting=csv.QUOTE_NONE,
+    )
+
+
+def _get_dist_indicators_col_def():
+    return _build_col_def(
         dict(
             column_names=["RunID", "TimeStep", "DistTypeID", "SPUID"],
             column_type="int64",
@@ -280,6 +309,22 @@ def load_dist_indicators(dir, chunksize=None):
         dict(column_names=["DistArea", "DistProduct"], column_type="float64"),
     )
 
+
+def load_dist_indicators(dir, chunksize=None):
+    """load cbmrun/output/distinds.out to a pandas.DataFrame
+
+    Args:
+        dir (str): path to the CBMRun/output dir
+        chunksize (int, optional): If specified sets a maximum number of rows
+            to hold in memory at a given time while loading output.
+            Defaults to None.
+
+    Returns:
+        pandas.DataFrame, or object: returns an iterable of dataframes
+            if chunksize is specified, and otherwise a single dataframe.
+    """
+    col_def = _get_dist_indicators_col_def()
+
     return pd.read_csv(
         os.path.join(dir, "distinds.out"),
         header=None,
@@ -1,11 +1,142 @@
 import os
 import pandas as pd
 import functools
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from cbm3_python.cbm3data import cbm3_output_files
 from cbm3_python.cbm3data import disturbance_reconciliation
 from cbm3_python.cbm3data import cbm3_output_descriptions
 from cbm3_python.cbm3data import cbm3_output_classifiers
+from cbm3_python.cbm3data import cbm3_output_loader_metrics
 from cbm3_python.cbm3data.cbm3_output_descriptions import ResultsDescriber
+from cbm3_python.cbm3data import results_queries
+from cbm3_python.cbm3data.results_queries import stock_changes_view
+
+
+# the descriptive dimensions merged to each table by the ResultsDescriber,
+# in order of application.
+_TABLE_DIMENSIONS = {
+    "tblAgeIndicators": [
+        "landclass",
+        "spatial_unit",
+        "age_class",
+        "classifier_set",
+    ],
+    "tblDistIndicators": [
+        "landclass",
+        "spatial_unit",
+        "disturbance_type",
+        "classifier_set",
+    ],
+    "tblPoolIndicators": ["landclass", "spatial_unit", "classifier_set"],
+    "tblFluxIndicators": [
+        "landclass",
+        "spatial_unit",
+        "disturbance_type",
+        "classifier_set",
+    ],
+    "tblNIRSpecialOutput": ["spatial_unit", "disturbance_type"],
+    "tblDistNotRealized": ["disturbance_type"],
+    "tblSVL": ["disturbance_type"],
+    "tblPreDisturbanceAge": [
+        "landclass",
+        "spatial_unit",
+        "disturbance_type",
+        "classifier_set",
+    ],
+    "tblPoolsSpatial": ["landclass", "spatial_unit", "classifier_set"],
+    "tblFluxSpatial": [
+        "landclass",
+        "spatial_unit",
+        "disturbance_type",
+        "classifier_set",
+    ],
+}
+
+
+def get_table_dimensions():
+    """Get the ordered list of descriptive dimensions that are merged to each
+    described table.
+
+    Returns:
+        dict: dictionary of table name (keys) to list of dimension names
+            (values)
+    """
+    return {k: list(v) for k, v in _TABLE_DIMENSIONS.items()}
+
+
+# the tables loaded from CBM output files, and the name of the ID column
+# generated for each while loading, or None if no ID column is generated
+_OUTPUT_TABLE_ID_COLUMNS = {
+    "tblAgeIndicators": "AgeIndID",
+    "tblDistIndicators": "DistIndID",
+    "tblPoolIndicators": "PoolIndID",
+    "tblFluxIndicators": "FluxIndicatorID",
+    "tblNIRSpecialOutput": "usLessPkField",
+    "tblDistNotRealized": None,
+    "tblSVL": "SVLID",
+    "tblDisturbanceSeries": None,
+    "tblAccountingRuleDiagnostics": None,
+    "tblPreDisturbanceAge": "PreDistAgeID",
+    "tblDisturbanceReconciliation": None,
+    "tblRandomSeed": None,
+    "tblPoolsSpatial": None,
+    "tblFluxSpatial": None,
+    # derived from tblFluxIndicators, see include_stock_changes
+    "tblStockChanges": "FluxIndicatorID",
+    "tblStockChangesByTimeStep": None,
+}
+
+# the columns by which the load-time stock changes are rolled up
+_STOCK_CHANGES_ROLLUP_COLUMNS = ["TimeStep", "DistTypeID"]
+
+# the tables aggregated by the results queries, which can be rolled up at
+# load time, see include_rollups
+_ROLLUP_TABLES = [
+    "tblPoolIndicators",
+    "tblFluxIndicators",
+    "tblDistIndicators",
+]
+
+
+def get_output_table_id_columns():
+    """Get the names of the tables loaded from CBM output files, along with
+    the name of the sequential ID column generated for each table.
+
+    Returns:
+        dict: dictionary of table name (keys) to the generated ID column
+            name, or None if no ID column is generated for the table (values)
+    """
+    return dict(_OUTPUT_TABLE_ID_COLUMNS)
+
+
+# the packaged mapping of raw CBM3 output column names to results database
+# column names for each indicator table
+_COLUMN_MAPPING_FILES = {
+    "tblAgeIndicators": "age_indicators_column_mapping.csv",
+    "tblDistIndicators": "dist_indicators_column_mapping.csv",
+    "tblPoolIndicators": "pool_indicators_column_mapping.csv",
+    "tblFluxIndicators": "flux_indicators_column_mapping.csv",
+}
+
+
+def get_column_mapping(table_name):
+    """Get the mapping of the raw CBM3 output column names to the column
+    names of the specified indicator table. Raw columns that are not
+    mapped keep their name.
+
+    Args:
+        table_name (str): one of "tblAgeIndicators", "tblDistIndicators",
+            "tblPoolIndicators" or "tblFluxIndicators"
+
+    Returns:
+        dict: dictionary of raw column name (keys) to table column name
+            (values)
+    """
+    return _load_local_column_map(_COLUMN_MAPPING_FILES[table_name])
 
 
 class LoadFunctionFactory:
@@ -17,6 +148,7 @@ class LoadFunctionFactory:
         cbm_output_dir,
         cbm_input_dir,
         chunksize,
+        memory_budget_mb=None,
     ):
         self.describer = describer
         self.cbm_project_db_path = cbm_project_db_path
@@ -24,6 +156,7 @@ class LoadFunctionFactory:
         self.cbm_output_dir = cbm_output_dir
         self.cbm_input_dir = cbm_input_dir
         self.chunksize = chunksize
+        self.memory_budget_mb = memory_budget_mb
 
     def _wrap_unchunkable(self, func, *args, **kwargs):
         def f():
@@ -44,6 +177,16 @@ class LoadFunctionFactory:
     def _wrap_load_func(self, func):
         return self._wrap_chunkable(func, self.cbm_output_dir, self.chunksize)
 
+    def _get_describe_function(self, table_name):
+        if not self.describer:
+            return None
+        return _compose(
+            *[
+                self.describer.get_merge_function(dimension)
+                for dimension in _TABLE_DIMENSIONS[table_name]
+            ]
+        )
+
     def get_all(self):
         """Get the functions to load, process and describe CBM3 output
         datasets.
@@ -52,7 +195,7 @@ class LoadFunctionFactory:
             dict: a dictionary containing the load functions (values) for
                 each table name (keys)
         """
-        return {
+        load_funcs = {
             "tblAgeIndicators": {
                 "load_function": self._wrap_load_func(
                     cbm3_output_files.load_age_indicators
@@ -69,14 +212,9 @@ class LoadFunctionFactory:
                     ),
                     _get_add_id_column_func("AgeIndID", index_offset),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_age_class_descriptions,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblAgeIndicators"
+                ),
             },
             "tblDistIndicators": {
                 "load_function": self._wrap_load_func(
@@ -94,14 +232,9 @@ class LoadFunctionFactory:
                     ),
                     _get_add_id_column_func("DistIndID", index_offset),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_disturbance_type_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblDistIndicators"
+                ),
             },
             "tblPoolIndicators": {
                 "load_function": self._wrap_load_func(
@@ -119,13 +252,9 @@ class LoadFunctionFactory:
                     ),
                     _get_add_id_column_func("PoolIndID", index_offset),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblPoolIndicators"
+                ),
             },
             "tblFluxIndicators": {
                 "load_function": self._wrap_load_func(
@@ -144,14 +273,9 @@ class LoadFunctionFactory:
                     _get_add_id_column_func("FluxIndicatorID", index_offset),
                     _get_gross_growth_column_funcs(),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_disturbance_type_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblFluxIndicators"
+                ),
             },
             "tblNIRSpecialOutput": {
                 "load_function": self._wrap_load_func(
@@ -160,12 +284,9 @@ class LoadFunctionFactory:
                 "process_function": lambda index_offset: _compose(
                     _get_add_id_column_func("usLessPkField", index_offset)
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_disturbance_type_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblNIRSpecialOutput"
+                ),
             },
             "tblDistNotRealized": {
                 "load_function": self._wrap_load_func(
@@ -174,11 +295,9 @@ class LoadFunctionFactory:
                 "process_function": lambda index_offset: _compose(
                     _get_drop_column_func("RunID")
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_disturbance_type_description
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblDistNotRealized"
+                ),
             },
             "tblSVL": {
                 "load_function": self._wrap_chunkable(
@@ -199,11 +318,7 @@ class LoadFunctionFactory:
                         self.loaded_csets
                     ),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_disturbance_type_description
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function("tblSVL"),
             },
             "tblDisturbanceSeries": {
                 "load_function": self._wrap_load_func(
@@ -245,14 +360,9 @@ class LoadFunctionFactory:
                         self.loaded_csets
                     ),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_disturbance_type_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblPreDisturbanceAge"
+                ),
             },
             "tblDisturbanceReconciliation": {
                 "load_function": self._wrap_unchunkable(
@@ -291,13 +401,9 @@ class LoadFunctionFactory:
                         )
                     ),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblPoolsSpatial"
+                ),
             },
             "tblFluxSpatial": {
                 "load_function": self._wrap_load_func(
@@ -317,16 +423,105 @@ class LoadFunctionFactory:
                         )
                     ),
                 ),
-                "describe_function": _compose(
-                    self.describer.merge_landclass_description,
-                    self.describer.merge_spatial_unit_description,
-                    self.describer.merge_disturbance_type_description,
-                    self.describer.merge_classifier_set_description,
-                )
-                if self.describer
-                else None,
+                "describe_function": self._get_describe_function(
+                    "tblFluxSpatial"
+                ),
             },
         }
+        if self.memory_budget_mb:
+            for table_functions in load_funcs.values():
+                chunk_sizer = _ChunkSizer(self.memory_budget_mb)
+                table_functions["load_function"] = _get_adaptive_load_function(
+                    table_functions["load_function"], chunk_sizer
+                )
+                table_functions["chunk_sizer"] = chunk_sizer
+        return load_funcs
+
+
+# the estimated multiple of a processed chunk's memory that is in use at once
+# while loading it: the raw chunk, copies made by merges, and the result
+_CHUNK_MEMORY_OVERHEAD_FACTOR = 4
+
+# the number of rows read from each table before any chunk memory has been
+# measured
+_PROBE_CHUNKSIZE = 1000
+
+# a conservative estimate of the in memory size of a row in bytes, used to
+# size chunks when no measurement is possible
+_ESTIMATED_ROW_BYTES = 2048
+
+
+def get_memory_budget_chunksize(memory_budget_mb, row_bytes=None):
+    """Get the number of rows per chunk that fits the specified memory
+    budget.
+
+    Args:
+        memory_budget_mb (float): the memory budget in megabytes
+        row_bytes (float, optional): the size of a loaded row in bytes. If
+            not specified a conservative estimate is used. Defaults to None.
+
+    Returns:
+        int: the number of rows per chunk
+    """
+    if not row_bytes:
+        row_bytes = _ESTIMATED_ROW_BYTES
+    return max(
+        1,
+        int(
+            memory_budget_mb
+            * 1024**2
+            / (row_bytes * _CHUNK_MEMORY_OVERHEAD_FACTOR)
+        ),
+    )
+
+
+class _ChunkSizer:
+    """Tracks the measured memory per row of a table's processed chunks to
+    size subsequent chunks to fit a memory budget.
+    """
+
+    def __init__(self, memory_budget_mb):
+        self.memory_budget_mb = memory_budget_mb
+        self.row_bytes = None
+
+    @property
+    def chunksize(self):
+        if self.row_bytes is None:
+            return min(
+                _PROBE_CHUNKSIZE,
+                get_memory_budget_chunksize(self.memory_budget_mb),
+            )
+        return get_memory_budget_chunksize(
+            self.memory_budget_mb, self.row_bytes
+        )
+
+    def observe(self, n_rows, processed_chunk):
+        if not n_rows:
+            return
+        row_bytes = (
+            processed_chunk.memory_usage(index=True, deep=True).sum() / n_rows
+        )
+        # rows widths are similar within a table, but the width of
+        # described string columns can vary, so keep the widest observed
+        self.row_bytes = max(self.row_bytes or 0, row_bytes)
+
+
+def _get_adaptive_load_function(load_function, chunk_sizer):
+    def f():
+        result = load_function()
+        if not hasattr(result, "get_chunk"):
+            # not a pandas.io.parsers.TextFileReader: the chunk sizes
+            # cannot be varied
+            yield from result
+            return
+        with result:
+            while True:
+                try:
+                    yield result.get_chunk(chunk_sizer.chunksize)
+                except StopIteration:
+                    return
+
+    return f
 
 
 def _update_dict(d1, *d):
@@ -382,24 +577,71 @@ def _get_add_id_column_func(id_column_name, index_offset):
     return func
 
 
+# gross growth AG and BG are composite flux indicators that are not
+# included in RAW CBM3 output, but are present in tblFluxIndicators. They
+# are the sum of these tblFluxIndicators columns for undisturbed records,
+# and 0 for disturbed records.
+_GROSS_GROWTH_COLUMNS = {
+    "GrossGrowth_AG": [
+        "DeltaBiomass_AG",
+        "MerchLitterInput",
+        "FolLitterInput",
+        "OthLitterInput",
+        "SubMerchLitterInput",
+    ],
+    "GrossGrowth_BG": [
+        "DeltaBiomass_BG",
+        "CoarseLitterInput",
+        "FineLitterInput",
+    ],
+}
+
+
+def get_gross_growth_columns():
+    """Get the tblFluxIndicators columns summed to compute each of the gross
+    growth columns. The gross growth of disturbed records (DistTypeID other
+    than 0) is 0.
+
+    Returns:
+        dict: dictionary of gross growth column name (keys) to the list of
+            summed column names (values)
+    """
+    return {k: list(v) for k, v in _GROSS_GROWTH_COLUMNS.items()}
+
+
+def iter_flux_indicators(cbm_output_dir, chunksize):
+    """Read the flux indicators of a CBM run from the CBM output files in
+    chunks, with the columns of tblFluxIndicators, for example to compute
+    the stock changes of a run in bounded memory without loading it (see
+    :py:func:`stock_changes_view.aggregate_stock_changes`).
+
+    Unlike :py:func:`load_output_relational_tables`, the raw classifier
+    value columns are not replaced with the UserDefdClassSetID column, and
+    the FluxIndicatorID column is not added.
+
+    Args:
+        cbm_output_dir (str): path to a CBMRun/output dir
+        chunksize (int): the maximum number of rows per chunk
+
+    Yields:
+        pandas.DataFrame: the chunks of flux indicators
+    """
+    process = _compose(
+        _get_drop_column_func("RunID"),
+        _get_column_rename_func(get_column_mapping("tblFluxIndicators")),
+        _get_gross_growth_column_funcs(),
+    )
+    for chunk in cbm3_output_files.load_flux_indicators(
+        cbm_output_dir, chunksize
+    ):
+        yield process(chunk)
+
+
 def _get_gross_growth_column_funcs():
     def func(df):
-        # gross growth AG and BG are composite flux indicators that are not
-        # included in RAW CBM3 output, but are present in tblFluxIndicators
-        df["GrossGrowth_AG"] = df[
-            [
-                "DeltaBiomass_AG",
-                "MerchLitterInput",
-                "FolLitterInput",
-                "OthLitterInput",
-                "SubMerchLitterInput",
-            ]
-        ].sum(axis=1)
-        df.loc[df.DistTypeID != 0, "GrossGrowth_AG"] = 0.0
-        df["GrossGrowth_BG"] = df[
-            ["DeltaBiomass_BG", "CoarseLitterInput", "FineLitterInput"]
-        ].sum(axis=1)
-        df.loc[df.DistTypeID != 0, "GrossGrowth_BG"] = 0.0
+        for column, summed_columns in _GROSS_GROWTH_COLUMNS.items():
+            df[column] = df[summed_columns].sum(axis=1)
+            df.loc[df.DistTypeID != 0, column] = 0.0
         return df
 
     return func
@@ -422,6 +664,17 @@ def _compose(*fs):
     return functools.reduce(compose2, fs)
 
 
+def _get_chunksize(chunksize, memory_budget_mb):
+    if not memory_budget_mb:
+        return chunksize
+    if chunksize:
+        raise ValueError(
+            "only one of chunksize and memory_budget_mb may be specified"
+        )
+    # the initial chunk size, which is adapted per table while loading
+    return get_memory_budget_chunksize(memory_budget_mb)
+
+
 def _get_cbm_input_dir(cbm_output_dir):
     return os.path.realpath(os.path.join(cbm_output_dir, "..", "input"))
 
@@ -434,6 +687,16 @@ def load_output_relational_tables(
     chunksize=None,
     include_spatial=False,
     include_diagnostics=False,
+    include_dimensions=False,
+    metadata_cache_dir=None,
+    max_workers=None,
+    pipelined=False,
+    memory_budget_mb=None,
+    metrics=None,
+    checkpoint=None,
+    include_stock_changes=False,
+    rollups=None,
+    include_metadata=True,
 ):
     """Load all CBM datasets to a relational database output
 
@@ -452,12 +715,76 @@ def load_output_relational_tables(
             otherwise be ignored. Defaults to False.
         include_diagnostics (bool, optional): If set to true extra diagnostic
             tables will be loaded. Defaults to False.
+        include_dimensions (bool, optional): If set to true the descriptive
+            dimension tables (see
+            :py:func:`ResultsDescriber.get_dimension_tables`) are also
+            passed to out_func so that the loaded tables can be described
+            at a later time by joining. Defaults to False.
+        metadata_cache_dir (str, optional): If specified, a directory used
+            to cache snapshots of the project and archive index metadata
+            tables between loads. Defaults to None.
+        max_workers (int, optional): If specified, the tables are loaded and
+            processed concurrently by at most this many worker processes,
+            and out_func is called from this process only. If None the
+            tables are loaded sequentially. Defaults to None.
+        pipelined (bool, optional): If set to true, reading, processing and
+            writing are performed in separate threads connected by bounded
+            queues so that I/O and processing of successive chunks overlap.
+            Cannot be combined with max_workers. Defaults to False.
+        memory_budget_mb (float, optional): If specified, the number of rows
+            per chunk is computed separately for each table, and adapted
+            while loading from the measured memory of the loaded chunks, so
+            that each chunk in memory fits approximately this budget in
+            megabytes. When combined with max_workers the budget is shared
+            among the workers. Cannot be combined with chunksize. Defaults
+            to None.
+        metrics (cbm3_output_loader_metrics.LoadMetrics, optional): If
+            specified, the wall time, rows, bytes read and peak memory of
+            each stage of each loaded chunk are recorded in this object.
+            Defaults to None.
+        checkpoint (cbm3_output_loader_checkpoint.LoadCheckpoint, optional):
+            If specified, the progress of the load is recorded in this
+            checkpoint, and tables and rows already written according to
+            the checkpoint are skipped. Defaults to None.
+        include_stock_changes (bool, optional): If set to true, the stock
+            changes (see :py:func:`stock_changes_view.get_stock_changes_view`)
+            are computed from each chunk of tblFluxIndicators as it is
+            loaded, and written to "tblStockChanges". The stock changes are
+            also summed by TimeStep and DistTypeID and written to
+            "tblStockChangesByTimeStep" after all tables are loaded. Cannot
+            be combined with checkpoint. Defaults to False.
+        rollups (list, optional): If specified, a list of groupings by
+            which tblPoolIndicators, tblFluxIndicators and tblDistIndicators
+            are rolled up while they are loaded. Each grouping is a list of
+            grouping names (see :py:data:`results_queries.GROUPINGS`), and
+            the rows of each table are summed by TimeStep and the grouping
+            columns. Each rollup is written to the table named by
+            :py:func:`results_queries.get_rollup_table_name`, and listed in
+            the table named by :py:data:`results_queries.ROLLUPS_TABLE_NAME`.
+            Groupings by disturbance type are not applied to
+            tblPoolIndicators. Cannot be combined with checkpoint. Defaults
+            to None.
+        include_metadata (bool, optional): If set to false the project and
+            archive index metadata tables are not passed to out_func, and
+            only the loaded fact tables, and the dimension tables if
+            include_dimensions is set, are written. Defaults to True.
     """
+    chunksize = _get_chunksize(chunksize, memory_budget_mb)
+    rollup_stage = _get_rollup_stage(rollups, checkpoint, out_func)
+    if rollup_stage:
+        out_func = rollup_stage
+    stock_changes_stage = _get_stock_changes_stage(
+        include_stock_changes, checkpoint, out_func
+    )
+    if stock_changes_stage:
+        out_func = stock_changes_stage
     project_data = cbm3_output_descriptions.load_project_level_data(
-        project_db_path
+        project_db_path, metadata_cache_dir
     )
 
-    aidb_data = cbm3_output_descriptions.load_archive_index_data(aidb_path)
+    aidb_data = cbm3_output_descriptions.load_archive_index_data(
+        aidb_path, metadata_cache_dir
+    )
 
     loaded_csets = cbm3_output_classifiers.create_loaded_classifiers(
         project_data.tblClassifiers,
@@ -482,44 +809,79 @@ def load_output_relational_tables(
         )
     )
 
-    for k, v in aidb_data.__dict__.items():
-        out_func(k, v)
-    for k, v in out_project_data.__dict__.items():
-        out_func(k, v)
-    out_func("tblAgeClasses", cbm3_output_descriptions.load_age_classes())
-    load_func_factory = LoadFunctionFactory(
-        loaded_csets,
+    if include_metadata:
+        for k, v in aidb_data.__dict__.items():
+            _write_table(out_func, checkpoint, k, v)
+        for k, v in out_project_data.__dict__.items():
+            _write_table(out_func, checkpoint, k, v)
+        _write_table(
+            out_func,
+            checkpoint,
+            "tblAgeClasses",
+            cbm3_output_descriptions.load_age_classes(),
+        )
+    if include_dimensions:
+        describer = ResultsDescriber(
+            project_db_path,
+            aidb_path,
+            loaded_csets,
+            classifier_value_field="Name",
+            project_data=project_data,
+            aidb_data=aidb_data,
+        )
+        for k, v in describer.get_dimension_tables().__dict__.items():
+            _write_table(out_func, checkpoint, k, v)
+    factory_kwargs = dict(
+        loaded_csets=loaded_csets,
         describer=None,
         cbm_project_db_path=project_db_path,
         cbm_output_dir=cbm_output_dir,
         cbm_input_dir=_get_cbm_input_dir(cbm_output_dir),
         chunksize=chunksize,
+        memory_budget_mb=memory_budget_mb,
     )
-    load_funcs = load_func_factory.get_all()
-    for table_name in load_funcs.keys():
-        load_functions = load_funcs[table_name]
-        if (
+    table_names = [
+        table_name
+        for table_name in LoadFunctionFactory(**factory_kwargs).get_all()
+        if not (
             table_name in ["tblPoolsSpatial", "tblFluxSpatial"]
             and not include_spatial
-        ):
-            continue
-        if (
+        )
+        and not (
             table_name
             in ["tblAccountingRuleDiagnostics", "tblDisturbanceSeries"]
             and not include_diagnostics
-        ):
-            continue
-        result_chunk_iterable = load_functions["load_function"]()
-        index_offset = 0
-        for chunk in result_chunk_iterable:
-            process_function = load_functions["process_function"](index_offset)
-            processed_chunk = process_function(chunk)
-            index_offset = index_offset + len(processed_chunk.index)
-            out_func(table_name, processed_chunk)
+        )
+    ]
+    _load_tables(
+        table_names,
+        factory_kwargs,
+        False,
+        out_func,
+        max_workers,
+        pipelined,
+        metrics,
+        checkpoint,
+    )
+    if stock_changes_stage:
+        stock_changes_stage.write_rollup()
+    if rollup_stage:
+        rollup_stage.write_rollups()
 
 
 def load_output_descriptive_tables(
-    cbm_output_dir, project_db_path, aidb_path, out_func, chunksize=None
+    cbm_output_dir,
+    project_db_path,
+    aidb_path,
+    out_func,
+    chunksize=None,
+    metadata_cache_dir=None,
+    max_workers=None,
+    pipelined=False,
+    memory_budget_mb=None,
+    metrics=None,
+    checkpoint=None,
+    include_stock_changes=False,
 ):
     """Load all CBM datasets to a descriptive format.
 
@@ -534,10 +896,52 @@ def load_output_descriptive_tables(
         chunksize (int, optional): If specified sets a maximum number of rows
             to hold in memory at a given time while loading output.
             Defaults to None.
+        metadata_cache_dir (str, optional): If specified, a directory used
+            to cache snapshots of the project and archive index metadata
+            tables between loads. Defaults to None.
+        max_workers (int, optional): If specified, the tables are loaded and
+            described concurrently by at most this many worker processes,
+            and out_func is called from this process only. If None the
+            tables are loaded sequentially. Defaults to None.
+        pipelined (bool, optional): If set to true, reading, processing and
+            writing are performed in separate threads connected by bounded
+            queues so that I/O and processing of successive chunks overlap.
+            Cannot be combined with max_workers. Defaults to False.
+        memory_budget_mb (float, optional): If specified, the number of rows
+            per chunk is computed separately for each table, and adapted
+            while loading from the measured memory of the loaded chunks, so
+            that each chunk in memory fits approximately this budget in
+            megabytes. When combined with max_workers the budget is shared
+            among the workers. Cannot be combined with chunksize. Defaults
+            to None.
+        metrics (cbm3_output_loader_metrics.LoadMetrics, optional): If
+            specified, the wall time, rows, bytes read and peak memory of
+            each stage of each loaded chunk are recorded in this object.
+            Defaults to None.
+        checkpoint (cbm3_output_loader_checkpoint.LoadCheckpoint, optional):
+            If specified, the progress of the load is recorded in this
+            checkpoint, and tables and rows already written according to
+            the checkpoint are skipped. Defaults to None.
+        include_stock_changes (bool, optional): If set to true, the stock
+            changes (see :py:func:`stock_changes_view.get_stock_changes_view`)
+            are computed from each chunk of tblFluxIndicators as it is
+            loaded, and written to "tblStockChanges". The stock changes are
+            also summed by TimeStep and DistTypeID and written to
+            "tblStockChangesByTimeStep" after all tables are loaded. Cannot
+            be combined with checkpoint. Defaults to False.
 
     """
+    chunksize = _get_chunksize(chunksize, memory_budget_mb)
+    stock_changes_stage = _get_stock_changes_stage(
+        include_stock_changes, checkpoint, out_func
+    )
+    if stock_changes_stage:
+        out_func = stock_changes_stage
     project_data = cbm3_output_descriptions.load_project_level_data(
-        project_db_path
+        project_db_path, metadata_cache_dir
+    )
+    aidb_data = cbm3_output_descriptions.load_archive_index_data(
+        aidb_path, metadata_cache_dir
     )
     loaded_csets = cbm3_output_classifiers.create_loaded_classifiers(
         project_data.tblClassifiers,
@@ -546,26 +950,649 @@ def load_output_descriptive_tables(
         chunksize=chunksize,
     )
     describer = ResultsDescriber(
-        project_db_path, aidb_path, loaded_csets, classifier_value_field="Name"
-    )
-    load_func_factory = LoadFunctionFactory(
+        project_db_path,
+        aidb_path,
         loaded_csets,
+        classifier_value_field="Name",
+        project_data=project_data,
+        aidb_data=aidb_data,
+    )
+    factory_kwargs = dict(
+        loaded_csets=loaded_csets,
         describer=describer,
         cbm_project_db_path=project_db_path,
         cbm_output_dir=cbm_output_dir,
         cbm_input_dir=_get_cbm_input_dir(cbm_output_dir),
         chunksize=chunksize,
+        memory_budget_mb=memory_budget_mb,
+    )
+    table_names = list(LoadFunctionFactory(**factory_kwargs).get_all())
+    _load_tables(
+        table_names,
+        factory_kwargs,
+        True,
+        out_func,
+        max_workers,
+        pipelined,
+        metrics,
+        checkpoint,
+    )
+    if stock_changes_stage:
+        stock_changes_stage.write_rollup()
+
+
+class _StockChangesStage:
+    def __init__(self, out_func):
+        """Passes each loaded chunk to out_func, and for chunks of
+        tblFluxIndicators also computes and writes the stock changes, and
+        accumulates their rollup.
+        """
+        self.out_func = out_func
+        self.rollup = None
+
+    def __call__(self, table_name, df):
+        if table_name != "tblFluxIndicators":
+            self.out_func(table_name, df)
+            return
+        # computed before writing the flux indicators since out_func may
+        # modify the chunk
+        stock_changes = stock_changes_view.get_stock_changes_view(df)
+        value_columns = list(
+            stock_changes.columns[df.columns.get_loc("CO2Production") :]
+        )
+        chunk_rollup = stock_changes.groupby(_STOCK_CHANGES_ROLLUP_COLUMNS)[
+            value_columns
+        ].sum()
+        self.out_func(table_name, df)
+        self.out_func("tblStockChanges", stock_changes)
+        if self.rollup is None:
+            self.rollup = chunk_rollup
+        else:
+            self.rollup = self.rollup.add(chunk_rollup, fill_value=0.0)
+
+    def write_rollup(self):
+        if self.rollup is None:
+            return
+        self.out_func(
+            "tblStockChangesByTimeStep", self.rollup.sort_index().reset_index()
+        )
+
+
+def _get_stock_changes_stage(include_stock_changes, checkpoint, out_func):
+    if not include_stock_changes:
+        return None
+    if checkpoint:
+        # the rollup of the chunks loaded before an interruption is lost
+        raise ValueError(
+            "include_stock_changes cannot be combined with checkpoint"
+        )
+    return _StockChangesStage(out_func)
+
+
+class _RollupStage:
+    def __init__(self, out_func, rollups):
+        """Passes each loaded chunk to out_func, and for chunks of the
+        rolled up tables also accumulates the sums of the value columns by
+        TimeStep and the columns of each grouping. Groupings by columns
+        which a table does not have (for example the disturbance type of
+        tblPoolIndicators) are omitted from the rollups of that table.
+        """
+        self.out_func = out_func
+        self.groupings = [list(grouping_names) for grouping_names in rollups]
+        self.rollups = {}
+
+    def __call__(self, table_name, df):
+        # computed before writing the chunk since out_func may modify it
+        chunk_rollups = {}
+        if table_name in _ROLLUP_TABLES:
+            for grouping_names in self.groupings:
+                grouping_names = [
+                    name
+                    for name in results_queries.GROUPINGS
+                    if name in grouping_names
+                    and set(results_queries.GROUPINGS[name]).issubset(
+                        df.columns
+                    )
+                ]
+                rollup_table_name = results_queries.get_rollup_table_name(
+                    table_name, grouping_names
+                )
+                if rollup_table_name not in chunk_rollups:
+                    chunk_rollups[rollup_table_name] = (
+                        grouping_names,
+                        self._rollup_chunk(df, grouping_names),
+                    )
+        self.out_func(table_name, df)
+        for rollup_table_name, chunk_rollup in chunk_rollups.items():
+            grouping_names, chunk_rollup = chunk_rollup
+            rollup = self.rollups.get(rollup_table_name)
+            if rollup is None:
+                self.rollups[rollup_table_name] = dict(
+                    table_name=table_name,
+                    grouping_names=grouping_names,
+                    rollup=chunk_rollup,
+                )
+            else:
+                # re-grouped rather than aligned by index, since the
+                # grouping columns may have null values
+                merged = pd.concat([rollup["rollup"], chunk_rollup])
+                rollup["rollup"] = merged.groupby(
+                    level=list(range(merged.index.nlevels)), dropna=False
+                ).sum(min_count=1)
+
+    def _rollup_chunk(self, df, grouping_names):
+        grouping_columns = ["TimeStep"]
+        for name in grouping_names:
+            grouping_columns.extend(results_queries.GROUPINGS[name])
+        # the generated ID and the stratification columns are not summed
+        excluded_columns = set(_OUTPUT_TABLE_ID_COLUMNS.values())
+        excluded_columns.add("TimeStep")
+        for columns in results_queries.GROUPINGS.values():
+            excluded_columns.update(columns)
+        value_columns = [
+            column for column in df.columns if column not in excluded_columns
+        ]
+        # as in SQL, the sum of only null values is null
+        return df.groupby(grouping_columns, dropna=False)[value_columns].sum(
+            min_count=1
+        )
+
+    def write_rollups(self):
+        catalogue = []
+        for rollup_table_name, rollup in self.rollups.items():
+            self.out_func(
+                rollup_table_name, rollup["rollup"].sort_index().reset_index()
+            )
+            catalogue.append(
+                [
+                    rollup["table_name"],
+                    rollup_table_name,
+                    ",".join(rollup["grouping_names"]),
+                ]
+            )
+        if catalogue:
+            self.out_func(
+                results_queries.ROLLUPS_TABLE_NAME,
+                pd.DataFrame(
+                    columns=[
+                        "TableName",
+                        "RollupTableName",
+                        "GroupingNames",
+                    ],
+                    data=catalogue,
+                ),
+            )
+
+
+def _get_rollup_stage(rollups, checkpoint, out_func):
+    if not rollups:
+        return None
+    if checkpoint:
+        # the rollups of the chunks loaded before an interruption are lost
+        raise ValueError("rollups cannot be combined with checkpoint")
+    for grouping_names in rollups:
+        for name in grouping_names:
+            if name not in results_queries.GROUPINGS:
+                raise ValueError(
+                    f"unknown rollup grouping {name}, expected one of "
+                    f"{list(results_queries.GROUPINGS)}"
+                )
+    return _RollupStage(out_func, rollups)
+
+
+def _write_table(out_func, checkpoint, table_name, df):
+    """Write a table that is loaded as a single chunk"""
+    if not checkpoint:
+        out_func(table_name, df)
+        return
+    if checkpoint.is_completed(table_name):
+        return
+    chunk_index, _ = checkpoint.get_progress().get(table_name, (0, 0))
+    if not chunk_index:
+        checkpoint.get_out_func(out_func)(table_name, df)
+    checkpoint.complete_table(table_name)
+
+
+def _process_chunk(load_functions, chunk, index_offset, describe):
+    """Process, and optionally describe a single loaded chunk
+
+    Returns:
+        tuple: the resulting chunk, and the index offset for the next chunk
+            of the same table
+    """
+    process_function = load_functions["process_function"](index_offset)
+    processed_chunk = process_function(chunk)
+    n_rows = len(processed_chunk.index)
+    index_offset = index_offset + n_rows
+    if describe:
+        describe_func = load_functions["describe_function"]
+        processed_chunk = describe_func(processed_chunk)
+    if "chunk_sizer" in load_functions:
+        load_functions["chunk_sizer"].observe(n_rows, processed_chunk)
+    return processed_chunk, index_offset
+
+
+def _iter_table_chunks(load_functions, describe):
+    """Yield the processed, and optionally described, chunks of a single
+    table
+    """
+    result_chunk_iterable = load_functions["load_function"]()
+    index_offset = load_functions.get("index_offset", 0)
+    for chunk in result_chunk_iterable:
+        processed_chunk, index_offset = _process_chunk(
+            load_functions, chunk, index_offset, describe
+        )
+        yield processed_chunk
+
+
+# the approximate maximum number of rows buffered between each pipeline stage
+_PIPELINE_BUFFER_ROWS = 200000
+
+
+def _get_pipeline_queue_size(chunksize):
+    if not chunksize:
+        # each table is loaded as a single chunk
+        return 1
+    return max(2, _PIPELINE_BUFFER_ROWS // chunksize)
+
+
+def _get_resumed_load_functions(load_functions, index_offset):
+    """Skip the rows of a table that were already written by an interrupted
+    load, and continue the ID sequence after them.
+    """
+    load_function = load_functions["load_function"]
+
+    def f():
+        n_skip = index_offset
+        for chunk in load_function():
+            n_rows = len(chunk.index)
+            if n_skip and n_skip >= n_rows:
+                n_skip -= n_rows
+                continue
+            if n_skip:
+                chunk = chunk.iloc[n_skip:].copy()
+                n_skip = 0
+            yield chunk
+        if n_skip:
+            raise ValueError(
+                "checkpoint records more rows than are present in the "
+                "CBM output"
+            )
+
+    return dict(load_functions, load_function=f, index_offset=index_offset)
+
+
+def _get_load_funcs(factory_kwargs, metrics=None, progress=None):
+    load_funcs = LoadFunctionFactory(**factory_kwargs).get_all()
+    if progress:
+        for table_name, (_, index_offset) in progress.items():
+            if table_name in load_funcs:
+                load_funcs[table_name] = _get_resumed_load_functions(
+                    load_funcs[table_name], index_offset
+                )
+    if metrics:
+        load_funcs = {
+            table_name: cbm3_output_loader_metrics.instrument(
+                table_name, table_functions, metrics
+            )
+            for table_name, table_functions in load_funcs.items()
+        }
+    return load_funcs
+
+
+def _load_tables(
+    table_names,
+    factory_kwargs,
+    describe,
+    out_func,
+    max_workers,
+    pipelined=False,
+    metrics=None,
+    checkpoint=None,
+):
+    if max_workers and pipelined:
+        raise ValueError(
+            "only one of max_workers and pipelined may be specified"
+        )
+    progress = None
+    complete_table = _no_op
+    if checkpoint:
+        table_names = [
+            table_name
+            for table_name in table_names
+            if not checkpoint.is_completed(table_name)
+        ]
+        progress = checkpoint.get_progress()
+        complete_table = checkpoint.complete_table
+        out_func = checkpoint.get_out_func(out_func)
+    if metrics:
+        out_func = cbm3_output_loader_metrics.instrument_out_func(
+            out_func, metrics
+        )
+    if max_workers:
+        _load_tables_concurrent(
+            table_names,
+            factory_kwargs,
+            describe,
+            out_func,
+            max_workers,
+            metrics,
+            progress,
+            complete_table,
+        )
+        return
+    if pipelined:
+        _load_tables_pipelined(
+            table_names,
+            factory_kwargs,
+            describe,
+            out_func,
+            _get_pipeline_queue_size(factory_kwargs["chunksize"]),
+            metrics,
+            progress,
+            complete_table,
+        )
+        return
+    load_funcs = _get_load_funcs(factory_kwargs, metrics, progress)
+    for table_name in table_names:
+        for chunk in _iter_table_chunks(load_funcs[table_name], describe):
+            out_func(table_name, chunk)
+        complete_table(table_name)
+
+
+def _no_op(*args):
+    pass
+
+
+class _PipelineStopped(Exception):
+    pass
+
+
+def _load_tables_pipelined(
+    table_names,
+    factory_kwargs,
+    describe,
+    out_func,
+    queue_size,
+    metrics=None,
+    progress=None,
+    complete_table=_no_op,
+):
+    """Load tables using three threads connected by bounded queues:
+
+        1. parse: calls the load functions to read raw chunks
+        2. transform: calls the process and describe functions
+        3. write: calls out_func
+
+    so that reading, processing and writing of successive chunks overlap.
+    The bounded queues apply backpressure to the earlier stages so that at
+    most queue_size chunks are held between each pair of stages.
+    """
+    load_funcs = _get_load_funcs(factory_kwargs, metrics, progress)
+    parsed_queue = queue.Queue(maxsize=queue_size)
+    transformed_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    errors = []
+    end_of_data = object()
+
+    def put(q, item):
+        while True:
+            if stop_event.is_set():
+                raise _PipelineStopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(q):
+        while True:
+            if stop_event.is_set():
+                raise _PipelineStopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def parse():
+        for table_name in table_names:
+            for chunk in load_funcs[table_name]["load_function"]():
+                put(parsed_queue, (table_name, chunk))
+            # marks the end of the table
+            put(parsed_queue, (table_name, None))
+        put(parsed_queue, end_of_data)
+
+    def transform():
+        index_offsets = {}
+        while True:
+            item = get(parsed_queue)
+            if item is end_of_data:
+                put(transformed_queue, end_of_data)
+                return
+            table_name, chunk = item
+            if chunk is None:
+                put(transformed_queue, item)
+                continue
+            load_functions = load_funcs[table_name]
+            processed_chunk, index_offsets[table_name] = _process_chunk(
+                load_functions,
+                chunk,
+                index_offsets.get(
+                    table_name, load_functions.get("index_offset", 0)
+                ),
+                describe,
+            )
+            put(transformed_queue, (table_name, processed_chunk))
+
+    def write():
+        while True:
+            item = get(transformed_queue)
+            if item is end_of_data:
+                return
+            table_name, chunk = item
+            if chunk is None:
+                complete_table(table_name)
+            else:
+                out_func(table_name, chunk)
+
+    def run_stage(stage_func):
+        try:
+            stage_func()
+        except _PipelineStopped:
+            pass
+        except BaseException as ex:
+            errors.append(ex)
+            stop_event.set()
+
+    threads = [
+        threading.Thread(target=run_stage, args=(stage_func,), daemon=True)
+        for stage_func in [parse, transform, write]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+# the chunk queue and cancel event shared with this worker process, set by
+# _init_worker when the process starts
+_worker_state = {}
+
+
+def _init_worker(chunk_queue, cancel_event):
+    _worker_state["chunk_queue"] = chunk_queue
+    _worker_state["cancel_event"] = cancel_event
+
+
+def _load_table_worker(
+    table_name,
+    factory_kwargs,
+    describe,
+    collect_metrics,
+    progress,
+):
+    # runs in a worker process: the load functions are re-created here since
+    # they are closures that cannot be pickled
+    chunk_queue = _worker_state["chunk_queue"]
+    cancel_event = _worker_state["cancel_event"]
+    metrics = (
+        cbm3_output_loader_metrics.LoadMetrics() if collect_metrics else None
+    )
+
+    def pop_records():
+        return metrics.pop_records() if metrics else []
+
+    completed = False
+    try:
+        if cancel_event.is_set():
+            # the load was cancelled before this table was started
+            return
+        load_funcs = _get_load_funcs(factory_kwargs, metrics, progress)
+        for chunk in _iter_table_chunks(load_funcs[table_name], describe):
+            if cancel_event.is_set():
+                break
+            chunk_queue.put((table_name, chunk, pop_records(), False))
+        else:
+            completed = True
+    finally:
+        # signals the end of this table to the writer, even on failure
+        chunk_queue.put((table_name, None, pop_records(), completed))
+
+
+# the interval at which the writer checks that the worker processes are
+# alive while waiting for chunks
+_WORKER_POLL_SECONDS = 1.0
+
+
+def _get_worker_item(chunk_queue, futures):
+    """Get the next item put on the chunk queue by the workers, checking
+    periodically that the pool is not broken, in which case no further items
+    may be put on the queue.
+
+    Raises:
+        BrokenProcessPool: a worker process terminated abruptly, for example
+            when killed by the operating system for lack of memory.
+    """
+    while True:
+        try:
+            return chunk_queue.get(timeout=_WORKER_POLL_SECONDS)
+        except queue.Empty:
+            for future in futures:
+                if future.done() and isinstance(
+                    future.exception(), BrokenProcessPool
+                ):
+                    future.result()
+
+
+def _load_tables_concurrent(
+    table_names,
+    factory_kwargs,
+    describe,
+    out_func,
+    max_workers,
+    metrics=None,
+    progress=None,
+    complete_table=_no_op,
+):
+    """Load and process tables in a pool of worker processes, while calling
+    out_func for each chunk from this process only, since the supported
+    writers are not safe for concurrent use.
+
+    The chunks of each table are passed to out_func in order, but chunks of
+    different tables may be interleaved.
+    """
+    if factory_kwargs.get("memory_budget_mb"):
+        # each worker holds its own chunks in memory
+        factory_kwargs = dict(
+            factory_kwargs,
+            memory_budget_mb=factory_kwargs["memory_budget_mb"] / max_workers,
+        )
+    mp_context = multiprocessing.get_context()
+    # the chunks are passed to this process on a queue shared with each
+    # worker process when it starts, so that each chunk is pickled once.
+    # The queue is bounded to limit the loaded chunks waiting to be written
+    chunk_queue = mp_context.Queue(maxsize=2 * max_workers)
+    cancel_event = mp_context.Event()
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(chunk_queue, cancel_event),
+    ) as executor:
+        futures = {
+            table_name: executor.submit(
+                _load_table_worker,
+                table_name,
+                factory_kwargs,
+                describe,
+                metrics is not None,
+                progress,
+            )
+            for table_name in table_names
+        }
+        n_remaining = len(futures)
+        try:
+            while n_remaining:
+                table_name, chunk, records, completed = _get_worker_item(
+                    chunk_queue, futures.values()
+                )
+                if metrics:
+                    for record in records:
+                        metrics.add_record(record)
+                if chunk is None:
+                    n_remaining -= 1
+                    if completed:
+                        complete_table(table_name)
+                    else:
+                        # re-raises the exception that stopped the worker,
+                        # without waiting for the other tables
+                        futures[table_name].result()
+                else:
+                    out_func(table_name, chunk)
+        except BaseException:
+            # stop the workers: the tables not yet started are cancelled,
+            # and the queue is drained so that none of the started workers
+            # remain blocked on a full queue
+            cancel_event.set()
+            n_remaining -= sum(future.cancel() for future in futures.values())
+            try:
+                while n_remaining:
+                    item = _get_worker_item(chunk_queue, futures.values())
+                    if item[1] is None:
+                        n_remaining -= 1
+            except BrokenProcessPool:
+                # the remaining workers were terminated with the pool
+                pass
+            raise
+        for future in futures.values():
+            # re-raises any exception that occurred in a worker
+            future.result()
+
+
+def describe_fact_table(table_name, df, dimension_tables):
+    """Produce the descriptive form of a table loaded by
+    :py:func:`load_output_relational_tables` using previously loaded
+    dimension tables.
+
+    Args:
+        table_name (str): the name of the loaded table
+        df (pandas.DataFrame): the loaded (fact) table or chunk of it
+        dimension_tables (object): a namespace of the tables returned by
+            :py:func:`ResultsDescriber.get_dimension_tables`
+
+    Returns:
+        pandas.DataFrame: the described table with the same columns as
+            produced by :py:func:`load_output_descriptive_tables`
+    """
+    if table_name not in _TABLE_DIMENSIONS:
+        return df
+    describer = ResultsDescriber.from_dimension_tables(dimension_tables)
+    describe_func = _compose(
+        *[
+            describer.get_merge_function(dimension)
+            for dimension in _TABLE_DIMENSIONS[table_name]
+        ]
     )
-    load_funcs = load_func_factory.get_all()
-    for table_name in load_funcs.keys():
-        load_functions = load_funcs[table_name]
-
-        result_chunk_iterable = load_functions["load_function"]()
-        index_offset = 0
-        for chunk in result_chunk_iterable:
-            process_function = load_functions["process_function"](index_offset)
-            processed_chunk = process_function(chunk)
-            index_offset = index_offset + len(processed_chunk.index)
-            describe_func = load_functions["describe_function"]
-            described_chunk = describe_func(processed_chunk)
-            out_func(table_name, described_chunk)
+    return describe_func(df)
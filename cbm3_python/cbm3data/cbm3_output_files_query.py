@@ -0,0 +1,244 @@
+import os
+import hashlib
+from cbm3_python.cbm3data import cbm3_output_files
+from cbm3_python.cbm3data import cbm3_output_files_loader
+from cbm3_python.cbm3data import cbm3_output_descriptions
+from cbm3_python.cbm3data import cbm3_output_classifiers
+
+try:
+    import duckdb
+except ImportError:
+    # duckdb is only required to query CBM output files in place
+    duckdb = None
+
+# the indicator tables queried by the results queries, and the CBM output
+# file from which each is read
+_INDICATOR_FILES = {
+    "tblAgeIndicators": "ageind.out",
+    "tblDistIndicators": "distinds.out",
+    "tblPoolIndicators": "poolind.out",
+    "tblFluxIndicators": "fluxind.out",
+}
+
+_DUCKDB_TYPES = {"int64": "BIGINT", "float64": "DOUBLE"}
+
+# the name of the registered table of classifier values by classifier set
+_CLASSIFIER_SETS_TABLE = "_cbm3_classifier_sets"
+
+
+def _quote_literal(value):
+    return "'{}'".format(value.replace("'", "''"))
+
+
+def _get_text_source(path, column_types):
+    """Get a subquery parsing the whitespace delimited CBM output file at
+    the specified path. Each line is read as a single column, since the
+    fields are separated by a variable number of spaces, and then split
+    into the typed fields.
+    """
+    fields = ", ".join(
+        f'CAST(f[{i_column + 1}] AS {_DUCKDB_TYPES[dtype]}) AS "{name}"'
+        for i_column, (name, dtype) in enumerate(column_types.items())
+    )
+    # the delimiter is a character that never occurs in the numeric output
+    lines = (
+        f"read_csv({_quote_literal(path)}, columns={{'line': 'VARCHAR'}}, "
+        "header=false, delim='|', quote='', escape='', auto_detect=false)"
+    )
+    split = "list_filter(string_split(replace(line, chr(9), ' '), ' '), "
+    split += "x -> x <> '')"
+    return f"(SELECT {fields} FROM (SELECT {split} AS f FROM {lines}))"
+
+
+def _get_cache_path(path, cache_dir):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = hashlib.sha1(
+        f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8")
+    ).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}_{key}.parquet")
+
+
+def _get_source(connection, path, column_types, cache_dir):
+    text_source = _get_text_source(path, column_types)
+    if not cache_dir:
+        return text_source
+    cache_path = _get_cache_path(path, cache_dir)
+    if not os.path.exists(cache_path):
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # write to a temporary path first so that concurrent or
+        # interrupted queries never see a partial copy
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        connection.execute(
+            f"COPY {text_source} TO {_quote_literal(temp_path)} "
+            "(FORMAT parquet)"
+        )
+        os.replace(temp_path, cache_path)
+    return f"read_parquet({_quote_literal(cache_path)})"
+
+
+def _get_indicator_select(table_name, source, classifier_columns):
+    """Get the select statement producing the rows of the specified
+    indicator table from the raw output source, as processed by
+    :py:class:`cbm3_output_files_loader.LoadFunctionFactory`, but without
+    the generated ID column.
+    """
+    column_types = cbm3_output_files.get_indicator_column_types(
+        _INDICATOR_FILES[table_name]
+    )
+    column_mapping = cbm3_output_files_loader.get_column_mapping(table_name)
+    raw_classifier_columns = cbm3_output_files.get_classifier_column_names()
+    columns = []
+    for name in column_types:
+        if name == "RunID" or name in raw_classifier_columns[1:]:
+            continue
+        if name == raw_classifier_columns[0]:
+            columns.append(
+                "CAST(cs.ClassifierSetID AS BIGINT) AS UserDefdClassSetID"
+            )
+        else:
+            columns.append(
+                f'raw."{name}" AS "{column_mapping.get(name, name)}"'
+            )
+    # classifier value ids of 0 or less are the wildcard value 1
+    join_condition = " AND ".join(
+        f'GREATEST(raw."{column}", 1) = cs."{column}"'
+        for column in classifier_columns
+    )
+    select = (
+        f"SELECT {', '.join(columns)} FROM {source} AS raw "
+        f"LEFT JOIN {_CLASSIFIER_SETS_TABLE} AS cs ON {join_condition}"
+    )
+    if table_name == "tblFluxIndicators":
+        gross_growth_columns = [
+            "CASE WHEN DistTypeID <> 0 THEN 0.0 "
+            f"ELSE {' + '.join(summed_columns)} "
+            f"END AS {column}"
+            for column, summed_columns in (
+                cbm3_output_files_loader.get_gross_growth_columns().items()
+            )
+        ]
+        select = f"SELECT *, {', '.join(gross_growth_columns)} FROM ({select})"
+    return select
+
+
+def _load_metadata_tables(
+    cbm_output_dir, project_db_path, aidb_path, metadata_cache_dir
+):
+    project_data = cbm3_output_descriptions.load_project_level_data(
+        project_db_path, metadata_cache_dir
+    )
+    aidb_data = cbm3_output_descriptions.load_archive_index_data(
+        aidb_path, metadata_cache_dir
+    )
+    loaded_csets = cbm3_output_classifiers.create_loaded_classifiers(
+        project_data.tblClassifiers,
+        project_data.tblClassifierSetValues,
+        cbm_output_dir,
+    )
+    project_data.tblClassifierSetValues = (
+        cbm3_output_classifiers.melt_loaded_csets(loaded_csets)
+    )
+    project_data.tblClassifierSets = (
+        cbm3_output_classifiers.create_classifier_sets(
+            loaded_csets,
+            project_data.tblClassifiers,
+            project_data.tblClassifierValues,
+            project_data.tblClassifierAggregates,
+        )
+    )
+    tables = dict(aidb_data.__dict__)
+    tables.update(
+        cbm3_output_descriptions.create_project_level_output_tables(
+            project_data
+        ).__dict__
+    )
+    tables["tblAgeClasses"] = cbm3_output_descriptions.load_age_classes()
+    return loaded_csets, tables
+
+
+def connect(
+    cbm_output_dir,
+    project_db_path,
+    aidb_path,
+    cache_dir=None,
+    metadata_cache_dir=None,
+):
+    """Create an in-memory DuckDB connection in which the CBM3 output files
+    can be queried in place, without loading them into a results database.
+
+    The indicator output files (poolind.out, fluxind.out, ageind.out and
+    distinds.out) are registered as the views tblPoolIndicators,
+    tblFluxIndicators, tblAgeIndicators and tblDistIndicators. The views
+    read the files on each query and apply the same column mapping and
+    classifier set replacement as
+    :py:func:`cbm3_output_files_loader.load_output_relational_tables`.
+    The generated ID columns (for example PoolIndID) are not included.
+    The project and archive index metadata tables are also registered, so
+    the returned connection can be passed to the functions of
+    :py:mod:`cbm3_results`, for example::
+
+        with cbm3_output_files_query.connect(
+            cbm_output_dir, project_db_path, aidb_path
+        ) as connection:
+            pool_indicators = cbm3_results.load_pool_indicators(
+                connection, spatial_unit_grouping=True
+            )
+
+    Requires the duckdb package.
+
+    Args:
+        cbm_output_dir (str): path to the CBMRun/output dir
+        project_db_path (str): path to the CBM3 project database
+        aidb_path (str): path to the CBM3 archive index database
+        cache_dir (str, optional): If specified, a directory in which a
+            Parquet copy of each indicator output file is stored, and then
+            queried in place of the output file. The copies are re-used for
+            as long as the path, size and modification time of the output
+            files are unchanged. Defaults to None.
+        metadata_cache_dir (str, optional): If specified, a directory used
+            to cache snapshots of the project and archive index metadata
+            tables. Defaults to None.
+
+    Raises:
+        ImportError: duckdb is not installed
+
+    Returns:
+        duckdb.DuckDBPyConnection: the connection
+    """
+    if duckdb is None:
+        raise ImportError("querying CBM output files requires duckdb")
+    loaded_csets, tables = _load_metadata_tables(
+        cbm_output_dir, project_db_path, aidb_path, metadata_cache_dir
+    )
+    # the first matching classifier set is used for duplicated classifier
+    # values, as by cbm3_output_classifiers.replace_with_classifier_set_id
+    classifier_columns = list(loaded_csets.columns[1:])
+    classifier_sets = loaded_csets.drop_duplicates(
+        subset=classifier_columns, ignore_index=True
+    )
+    connection = duckdb.connect()
+    try:
+        for table_name, df in tables.items():
+            connection.register(table_name, df)
+        connection.register(_CLASSIFIER_SETS_TABLE, classifier_sets)
+        for table_name, filename in _INDICATOR_FILES.items():
+            path = os.path.join(cbm_output_dir, filename)
+            if not os.path.exists(path):
+                continue
+            source = _get_source(
+                connection,
+                path,
+                cbm3_output_files.get_indicator_column_types(filename),
+                cache_dir,
+            )
+            connection.execute(
+                f'CREATE VIEW "{table_name}" AS '
+                + _get_indicator_select(table_name, source, classifier_columns)
+            )
+    except BaseException:
+        connection.close()
+        raise
+    return connection
@@ -1,9 +1,24 @@
+import os
+from types import SimpleNamespace
 from contextlib import contextmanager
+import pandas as pd
 from cbm3_python.cbm3data import cbm3_results_file_writer
 from cbm3_python.cbm3data.cbm3_results_file_writer import CBM3ResultsFileWriter
 from cbm3_python.cbm3data.cbm3_results_db_writer import CBMResultsDBWriter
+from cbm3_python.cbm3data.cbm3_results_postgres_writer import (
+    CBMResultsPostgresWriter,
+)
 from cbm3_python.cbm3data import cbm3_results_db_schema
 from cbm3_python.cbm3data import cbm3_output_files_loader
+from cbm3_python.cbm3data import cbm3_output_descriptions
+from cbm3_python.cbm3data import cbm3_output_loader_metrics
+from cbm3_python.cbm3data import cbm3_output_loader_checkpoint
+from cbm3_python.cbm3data.cbm3_results_multi_run import MultiRunDBWriter
+from cbm3_python.cbm3data.cbm3_results_async_writer import AsyncWriter
+from cbm3_python.cbm3data.cbm3_results_duckdb_writer import (
+    CBMResultsDuckDBWriter,
+)
+from cbm3_python.util import loghelper
 
 
 @contextmanager
@@ -17,6 +32,36 @@ def get_db_writer(loader_config):
       * multi_update_variable_limit - if specified enables the "multi" method
         of pandas.DataFrame.to_sql and also sets the upper bound for the number
         of variables per chunk.
+      * sqlite_bulk_load - if set to true, and the url refers to an SQLite
+        database, the tables are written using a bulk load path with one
+        transaction per table and relaxed durability pragmas, and the
+        secondary indexes are created after all data is written. See
+        :py:class:`CBMResultsDBWriter`. Because the rows of the table being
+        loaded are only committed once the table is complete, this cannot
+        be combined with checkpoint_path.
+      * deferred_constraints - if set to true, the tables are created
+        without constraints or indexes, and the primary keys, foreign keys
+        and indexes are added once all data is written. For SQLite only
+        the indexes are deferred, and the foreign keys are checked once all
+        data is written. See :py:class:`CBMResultsDBWriter`. Cannot be
+        combined with checkpoint_path.
+      * query_indexes - a list of column names to index in each of the
+        loaded tables having the column, for example
+        ["TimeStep", "SPUID"], or true to index the columns in
+        :py:data:`cbm3_results_db_schema.QUERY_INDEX_COLUMNS`. The indexes
+        are created once all data is written.
+      * postgres_copy - if specified, the url must refer to a PostgreSQL
+        database, and each chunk is written using COPY FROM STDIN rather
+        than pandas.DataFrame.to_sql. The value is the COPY format: "csv"
+        or "binary". See :py:class:`CBMResultsPostgresWriter`.
+      * run - if specified, the database is shared by multiple runs. See
+        :py:func:`load_db_run`. This is a dictionary with the optional
+        fields:
+
+          * run_id - an integer id for the loaded run. If not specified the
+            next available id is used.
+          * run_name - a name for the loaded run, for example a scenario
+            name.
 
     Args:
         loader_config (dict): a configuration dictionary
@@ -25,31 +70,81 @@ def get_db_writer(loader_config):
         object: an object to write dataframes, or dataframe chunks to a
             relational database.
     """
-
-    writer = CBMResultsDBWriter(
-        loader_config["url"],
-        cbm3_results_db_schema.get_constraints(),
-        loader_config["create_engine_kwargs"]
-        if "create_engine_kwargs" in loader_config
-        else None,
-        loader_config["multi_update_variable_limit"]
-        if "multi_update_variable_limit" in loader_config
-        else None,
-    )
+    postgres_copy = _parse_optional(loader_config, "postgres_copy")
+    if postgres_copy:
+        writer = CBMResultsPostgresWriter(
+            loader_config["url"],
+            _get_db_constraints(loader_config),
+            _parse_optional(loader_config, "create_engine_kwargs"),
+            postgres_copy,
+            _parse_bool(loader_config, "deferred_constraints"),
+            _get_query_index_columns(loader_config),
+        )
+    else:
+        writer = CBMResultsDBWriter(
+            loader_config["url"],
+            _get_db_constraints(loader_config),
+            loader_config["create_engine_kwargs"]
+            if "create_engine_kwargs" in loader_config
+            else None,
+            loader_config["multi_update_variable_limit"]
+            if "multi_update_variable_limit" in loader_config
+            else None,
+            _parse_bool(loader_config, "sqlite_bulk_load"),
+            _parse_bool(loader_config, "deferred_constraints"),
+            _get_query_index_columns(loader_config),
+        )
     with writer:
         yield writer
 
 
+def _get_query_index_columns(loader_config):
+    query_indexes = _parse_optional(loader_config, "query_indexes")
+    if query_indexes is True:
+        return cbm3_results_db_schema.QUERY_INDEX_COLUMNS
+    if not query_indexes:
+        return None
+    return list(query_indexes)
+
+
+def _get_db_constraints(loader_config):
+    if _parse_optional(loader_config, "run") is None:
+        return cbm3_results_db_schema.get_constraints()
+    return cbm3_results_db_schema.get_constraints(
+        cbm3_output_files_loader.get_output_table_id_columns()
+    )
+
+
 @contextmanager
 def get_file_writer(loader_config):
     """Yield an object for writing loaded CBM results to file(s). The
     loader_config parameter is a dictionary with the following fields:
 
-      * type - a string specifying the load format ("csv")
+      * type - a string specifying the load format ("csv", "parquet" or
+        "arrow"). The parquet and arrow formats require the pyarrow
+        package.
       * output_path - either a directory or filename depending on if
-        the configured output is multiple files (csv) or a single file
+        the configured output is multiple files (csv, parquet, arrow) or a
+        single file
       * writer_kwargs - extra keyword arguments passed to pandas.to_csv if
-        type "csv"
+        type "csv", to pyarrow.parquet.ParquetWriter if type "parquet",
+        for example {"compression": "zstd"}, or to
+        pyarrow.ipc.IpcWriteOptions if type "arrow"
+      * partition_by_timestep - if set to true, and type is "parquet", the
+        tables with a TimeStep column are partitioned by TimeStep. See
+        :py:class:`CBM3ResultsFileWriter`.
+      * compression - if type is "csv", either "gzip" or "zstd" to write
+        compressed csv files. The zstd compression requires the zstandard
+        package.
+      * float_format - if type is "csv", a format string for floating point
+        values, for example "%.6g". By default floats are written with
+        full precision.
+
+    Tables written in the parquet format can be read, with filtering of
+    timesteps and columns, using
+    :py:func:`cbm3_results_file_writer.read_parquet`. Tables written in the
+    arrow format (one Arrow IPC stream file per table) can be memory mapped
+    and read using :py:func:`cbm3_results_file_writer.read_arrow`.
 
     Args:
         loader_config (dict): a configuration dictionary
@@ -64,9 +159,42 @@ def get_file_writer(loader_config):
         else None
     )
     writer = CBM3ResultsFileWriter(
-        loader_config["type"], loader_config["output_path"], writer_kwargs
+        loader_config["type"],
+        loader_config["output_path"],
+        writer_kwargs,
+        partition_by_timestep=_parse_bool(
+            loader_config, "partition_by_timestep"
+        ),
+        compression=_parse_optional(loader_config, "compression"),
+        float_format=_parse_optional(loader_config, "float_format"),
     )
-    yield writer
+    with writer:
+        yield writer
+
+
+@contextmanager
+def get_duckdb_writer(loader_config):
+    """Yield an object for writing loaded CBM results to a DuckDB database
+    file. The loader_config parameter is a dictionary with the following
+    fields:
+
+      * type - "duckdb"
+      * output_path - the path to the DuckDB database file
+
+    The loaded results can be queried with the functions in
+    :py:mod:`cbm3_results` by passing a connection returned by
+    duckdb.connect(output_path). Requires the duckdb package.
+
+    Args:
+        loader_config (dict): a configuration dictionary
+
+    Yields:
+        CBMResultsDuckDBWriter: an object to write dataframes, or dataframe
+            chunks to the DuckDB database.
+    """
+    writer = CBMResultsDuckDBWriter(loader_config["output_path"])
+    with writer:
+        yield writer
 
 
 def load(loader_config, cbm_output_dir, project_db_path, aidb_path):
@@ -74,8 +202,89 @@ def load(loader_config, cbm_output_dir, project_db_path, aidb_path):
     built-in database or file writing method that is configured by the
     loader_config parameter.
 
-    See :py:func:`get_file_writer` and :py:func:`get_db_writer` for
-    documentation on configs.
+    See :py:func:`get_file_writer`, :py:func:`get_db_writer` and
+    :py:func:`get_duckdb_writer` for documentation on configs.
+
+    The following optional loader_config fields apply to all loader types:
+
+      * chunksize - sets a maximum number of rows to hold in memory at a
+        given time while loading output.
+      * metadata_cache_dir - a directory in which snapshots of the project
+        and archive index metadata tables are cached. The snapshots are
+        re-used by subsequent loads for as long as the path, size and
+        modification time of the source database are unchanged.
+      * max_workers - if specified the output tables are loaded and
+        processed concurrently by at most this many worker processes. The
+        writes are still performed by the calling process. As with other
+        uses of multiprocessing this must be called from a "main script" on
+        Windows.
+      * pipelined - if set to true, reading, processing and writing of
+        successive chunks overlap in separate threads connected by bounded
+        queues. Cannot be combined with max_workers.
+      * memory_budget_mb - if specified, the number of rows per chunk is
+        computed for each table, and adapted while loading from the
+        measured memory of loaded chunks, to fit approximately this many
+        megabytes. Cannot be combined with chunksize.
+      * deferred_descriptions - if set to true, descriptions are not
+        denormalized into every loaded row. Instead compact integer fact
+        tables are written once along with small dimension tables.
+        For the "db" type a descriptive view is created for each described
+        table (see :py:func:`get_descriptive_view_name`), and for file types
+        only the fact and dimension tables are written, and the descriptive
+        tables can be read with :py:func:`read_descriptive_table`.
+      * metrics - if specified, a dictionary enabling collection of the
+        wall time, rows, bytes read and memory of each stage (load,
+        process, describe, write) of each loaded chunk. The bytes read and
+        memory are measured for the whole process. See
+        :py:class:`cbm3_output_loader_metrics.LoadMetrics`. It has the
+        following optional fields:
+
+          * log - if true each record is written to the log
+          * json_lines_path - a path to a file to which each record is
+            appended as a line of JSON
+          * callback - a function called with each record (dict)
+
+        A summary by table and stage is logged at the end of the load.
+      * checkpoint_path - if specified, the path to a JSON manifest in
+        which the completed tables, and the number of chunks and rows
+        written for each table in progress are recorded while loading. If
+        a load is interrupted, calling this function again with the same
+        configuration skips the tables and rows already written, appends
+        to the partially written tables, and continues their ID sequences.
+        For the "csv" loader type the size of each file is recorded along
+        with each chunk, and the files are truncated to the recorded sizes
+        when the load is resumed, discarding any chunk written after the
+        last recorded chunk. For the "db" and "duckdb" loader types the
+        rows of each partially written table are counted, and the load
+        resumes after the rows found. In both cases no rows are written
+        twice. The "parquet" and "arrow" loader types cannot be resumed
+        once a table was started. The manifest is deleted when the load
+        completes.
+      * stock_changes - if set to true, stock changes are computed from the
+        flux indicators while they are loaded, and written to the
+        tblStockChanges table, along with the tblStockChangesByTimeStep
+        table of stock changes summed by TimeStep and DistTypeID. Cannot
+        be combined with checkpoint_path.
+      * async_writer - if specified, the writes are performed on a
+        dedicated thread while the next chunks are loaded. See
+        :py:class:`AsyncWriter`. This is either true, or a dictionary with
+        the optional field max_queue_size: the maximum number of chunks
+        waiting to be written (default 4). The queue metrics are logged at
+        the end of the load. Cannot be combined with checkpoint_path.
+
+    The following optional loader_config field applies to the "db" and
+    "duckdb" loader types only:
+
+      * rollups - a list of groupings, each of which is a list of grouping
+        names (see :py:data:`results_queries.GROUPINGS`), for example
+        ``[["spatial_unit"], ["spatial_unit", "disturbance_type"]]``. The
+        pool, flux and disturbance indicators are summed by TimeStep and
+        the columns of each grouping while they are loaded, and written to
+        rollup tables which are used by the functions of
+        :py:mod:`cbm3_results` in place of the indicator tables when they
+        cover the requested grouping. See
+        :py:func:`cbm3_output_files_loader.load_output_relational_tables`.
+        Cannot be combined with checkpoint_path or "run".
 
     Args:
         loader_config (dict): a dictionary configuring the load process
@@ -84,40 +293,202 @@ def load(loader_config, cbm_output_dir, project_db_path, aidb_path):
         aidb_path (str): path to the CBM3 archive index database
 
     Raises:
-        ValueError: An unsupported loader type was specified
+        ValueError: An unsupported loader type was specified, or "run"
+            was specified for a loader type other than "db", or rollups
+            was specified for a loader type other than "db" or "duckdb", or
+            sqlite_bulk_load, deferred_constraints or async_writer was
+            combined with checkpoint_path
+
+    Returns:
+        pandas.DataFrame: if metrics are configured, the summary of the
+            collected metrics by table and stage, and otherwise None.
     """
+    if (
+        _parse_optional(loader_config, "run") is not None
+        and loader_config["type"] != "db"
+    ):
+        raise ValueError('"run" is only supported for the "db" loader type')
+    rollups = _parse_optional(loader_config, "rollups")
+    if rollups and loader_config["type"] not in ["db", "duckdb"]:
+        raise ValueError(
+            '"rollups" is only supported for the "db" and "duckdb" loader '
+            "types"
+        )
+    if _parse_optional(loader_config, "checkpoint_path"):
+        for key in [
+            "sqlite_bulk_load",
+            "deferred_constraints",
+            "async_writer",
+        ]:
+            if _parse_bool(loader_config, key):
+                raise ValueError(
+                    f"{key} cannot be combined with checkpoint_path"
+                )
+    load_kwargs = _get_load_kwargs(loader_config)
+    metrics = _get_load_metrics(loader_config)
+    load_kwargs["metrics"] = metrics
+    checkpoint_path = _parse_optional(loader_config, "checkpoint_path")
+    checkpoint = (
+        cbm3_output_loader_checkpoint.LoadCheckpoint(checkpoint_path)
+        if checkpoint_path
+        else None
+    )
+    load_kwargs["checkpoint"] = checkpoint
     if loader_config["type"] in cbm3_results_file_writer.FORMATS:
-        with get_file_writer(loader_config) as writer:
+        with get_file_writer(loader_config) as file_writer, _get_async_writer(
+            file_writer, loader_config, metrics
+        ) as writer:
             load_file(
                 writer,
                 cbm_output_dir,
                 project_db_path,
                 aidb_path,
-                _parse_chunksize(loader_config),
+                **load_kwargs,
             )
     elif loader_config["type"] == "db":
-        with get_db_writer(loader_config) as db_writer:
+        run_config = _parse_optional(loader_config, "run")
+        with get_db_writer(loader_config) as writer, _get_async_writer(
+            writer, loader_config, metrics
+        ) as db_writer:
+            if run_config is None:
+                load_db(
+                    db_writer,
+                    cbm_output_dir,
+                    project_db_path,
+                    aidb_path,
+                    rollups=rollups,
+                    **load_kwargs,
+                )
+            else:
+                load_db_run(
+                    db_writer,
+                    cbm_output_dir,
+                    project_db_path,
+                    aidb_path,
+                    run_id=_parse_optional(run_config, "run_id"),
+                    run_name=_parse_optional(run_config, "run_name"),
+                    rollups=rollups,
+                    **load_kwargs,
+                )
+    elif loader_config["type"] == "duckdb":
+        with get_duckdb_writer(loader_config) as writer, _get_async_writer(
+            writer, loader_config, metrics
+        ) as db_writer:
             load_db(
                 db_writer,
                 cbm_output_dir,
                 project_db_path,
                 aidb_path,
-                _parse_chunksize(loader_config),
+                rollups=rollups,
+                **load_kwargs,
             )
     else:
         raise ValueError(
             f"unsupported loader_config type {loader_config['type']}"
         )
+    if checkpoint:
+        checkpoint.remove()
+    if metrics:
+        metrics.log_summary()
+        return metrics.get_summary()
+    return None
+
+
+@contextmanager
+def _get_async_writer(writer, loader_config, metrics):
+    async_config = _parse_optional(loader_config, "async_writer")
+    if not async_config:
+        yield writer
+        return
+    max_queue_size = None
+    if isinstance(async_config, dict):
+        max_queue_size = _parse_optional(async_config, "max_queue_size")
+    with AsyncWriter(
+        writer, max_queue_size if max_queue_size else 4, metrics
+    ) as async_writer:
+        yield async_writer
+    loghelper.get_logger().info(
+        "async writer queue metrics: {}".format(
+            async_writer.get_queue_metrics()
+        )
+    )
+
+
+def _get_load_metrics(loader_config):
+    metrics_config = _parse_optional(loader_config, "metrics")
+    if metrics_config is None:
+        return None
+    sinks = []
+    if _parse_bool(metrics_config, "log"):
+        sinks.append(cbm3_output_loader_metrics.get_log_sink())
+    json_lines_path = _parse_optional(metrics_config, "json_lines_path")
+    if json_lines_path:
+        sinks.append(cbm3_output_loader_metrics.JsonLinesSink(json_lines_path))
+    callback = _parse_optional(metrics_config, "callback")
+    if callback:
+        sinks.append(callback)
+    return cbm3_output_loader_metrics.LoadMetrics(sinks)
+
+
+def _get_load_kwargs(loader_config):
+    return dict(
+        chunksize=_parse_optional(loader_config, "chunksize"),
+        deferred_descriptions=_parse_bool(
+            loader_config, "deferred_descriptions"
+        ),
+        metadata_cache_dir=_parse_optional(
+            loader_config, "metadata_cache_dir"
+        ),
+        max_workers=_parse_optional(loader_config, "max_workers"),
+        pipelined=_parse_bool(loader_config, "pipelined"),
+        memory_budget_mb=_parse_optional(loader_config, "memory_budget_mb"),
+        include_stock_changes=_parse_bool(loader_config, "stock_changes"),
+    )
 
 
-def _parse_chunksize(loader_config):
-    if "chunksize" in loader_config and loader_config["chunksize"] is not None:
-        return loader_config["chunksize"]
+def _parse_optional(loader_config, key):
+    if key in loader_config and loader_config[key] is not None:
+        return loader_config[key]
     return None
 
 
+def _parse_bool(loader_config, key):
+    if key in loader_config and loader_config[key] is not None:
+        return bool(loader_config[key])
+    return False
+
+
+def get_descriptive_view_name(table_name):
+    """Get the name of the descriptive view created for the specified table
+    when loading with deferred descriptions to a database.
+
+    Args:
+        table_name (str): the loaded table name, for example
+            "tblFluxIndicators"
+
+    Returns:
+        str: the view name, for example "vwFluxIndicators"
+    """
+    if table_name.startswith("tbl"):
+        table_name = table_name[3:]
+    return f"vw{table_name}"
+
+
 def load_db(
-    db_writer, cbm_output_dir, project_db_path, aidb_path, chunksize=None
+    db_writer,
+    cbm_output_dir,
+    project_db_path,
+    aidb_path,
+    chunksize=None,
+    deferred_descriptions=False,
+    metadata_cache_dir=None,
+    max_workers=None,
+    pipelined=False,
+    memory_budget_mb=None,
+    metrics=None,
+    checkpoint=None,
+    include_stock_changes=False,
+    rollups=None,
 ):
     """Load CBM3 results into a relational database.
 
@@ -131,19 +502,184 @@ def load_db(
         chunksize (int, optional): If specified sets a maximum number of rows
             to hold in memory at a given time while loading output.
             Defaults to None.
+        deferred_descriptions (bool, optional): If set to true dimension
+            tables are loaded, and a descriptive view is created for each
+            described table. Defaults to False.
+        metadata_cache_dir (str, optional): If specified, a directory used
+            to cache snapshots of the project and archive index metadata
+            tables between loads. Defaults to None.
+        max_workers (int, optional): If specified the maximum number of
+            worker processes used to load tables concurrently. Defaults to
+            None.
+        pipelined (bool, optional): If set to true reading, processing and
+            writing are performed in overlapping pipeline stages. Defaults
+            to False.
+        memory_budget_mb (float, optional): If specified, chunk sizes are
+            computed per table to fit approximately this many megabytes.
+            Defaults to None.
+        metrics (cbm3_output_loader_metrics.LoadMetrics, optional): If
+            specified, per-stage metrics of each loaded chunk are recorded
+            in this object. Defaults to None.
+        checkpoint (cbm3_output_loader_checkpoint.LoadCheckpoint, optional):
+            If specified, the load progress is recorded in this checkpoint,
+            and a load previously interrupted according to the checkpoint
+            is resumed. The rows of the partially written tables are
+            counted with the get_row_count function of db_writer, so that
+            the rows written before the interruption are not written
+            again. Defaults to None.
+        include_stock_changes (bool, optional): If set to true stock changes
+            and their rollup by timestep are computed and written while
+            loading the flux indicators. Defaults to False.
+        rollups (list, optional): If specified, a list of groupings by which
+            the pool, flux and disturbance indicators are rolled up while
+            loading. See
+            :py:func:`cbm3_output_files_loader.load_output_relational_tables`.
+            Defaults to None.
     """
-
+    if checkpoint:
+        db_writer.resume(checkpoint.get_started_tables())
+        # a chunk written before the interruption, but not recorded, is
+        # found in the database rather than written a second time
+        for table_name in checkpoint.get_progress():
+            checkpoint.reconcile_rows(
+                table_name, db_writer.get_row_count(table_name)
+            )
     cbm3_output_files_loader.load_output_relational_tables(
         cbm_output_dir=cbm_output_dir,
         project_db_path=project_db_path,
         aidb_path=aidb_path,
         out_func=db_writer.write,
         chunksize=chunksize,
+        include_dimensions=deferred_descriptions,
+        metadata_cache_dir=metadata_cache_dir,
+        max_workers=max_workers,
+        pipelined=pipelined,
+        memory_budget_mb=memory_budget_mb,
+        metrics=metrics,
+        checkpoint=checkpoint,
+        include_stock_changes=include_stock_changes,
+        rollups=rollups,
+    )
+    if deferred_descriptions:
+        _create_descriptive_views(db_writer, checkpoint)
+
+
+def load_db_run(
+    db_writer,
+    cbm_output_dir,
+    project_db_path,
+    aidb_path,
+    run_id=None,
+    run_name=None,
+    **load_db_kwargs,
+):
+    """Append the results of a single CBM run to a relational database
+    shared by multiple runs, so that the results of all runs can be queried
+    together.
+
+    The run is added to the run catalogue table (tblRuns), and a RunID column
+    is added to each of the output tables. The generated ID columns
+    (for example PoolIndID, FluxIndicatorID) are offset so that they are
+    unique across runs, and the metadata tables are deduplicated. See
+    :py:class:`cbm3_results_multi_run.MultiRunDBWriter`.
+
+    Args:
+        db_writer (CBMResultsDBWriter): the database writer. It must be
+            created with the constraints for multiple runs, as is done by
+            :py:func:`get_db_writer` when the "run" field is specified.
+        cbm_output_dir (str): path to the CBMRun/output dir
+        project_db_path (str): path to the CBM3 project database
+        aidb_path (str): path to the CBM3 archive index database
+        run_id (int, optional): The id of the loaded run. If None the next
+            available id is used. Defaults to None.
+        run_name (str, optional): A name for the loaded run. Defaults to
+            None.
+        load_db_kwargs (dict): further keyword arguments passed to
+            :py:func:`load_db`. The deferred_descriptions, checkpoint and
+            rollups options are not supported.
+
+    Raises:
+        ValueError: the run_id was already loaded, or an unsupported option
+            was specified.
+
+    Returns:
+        int: the id of the loaded run
+    """
+    for key in ["deferred_descriptions", "checkpoint", "rollups"]:
+        if load_db_kwargs.get(key):
+            # the rollups of a shared database would sum over all runs
+            raise ValueError(
+                "deferred_descriptions, checkpoint and rollups are not "
+                "supported when loading multiple runs"
+            )
+    multi_run_writer = MultiRunDBWriter(
+        db_writer,
+        cbm3_results_db_schema.get_constraints(
+            cbm3_output_files_loader.get_output_table_id_columns()
+        ),
+        cbm3_output_files_loader.get_output_table_id_columns(),
+    )
+    run_id = multi_run_writer.add_run(
+        project_db_path, cbm_output_dir, run_id, run_name
     )
+    load_db(
+        multi_run_writer,
+        cbm_output_dir,
+        project_db_path,
+        aidb_path,
+        **load_db_kwargs,
+    )
+    return run_id
+
+
+def _create_descriptive_views(db_writer, checkpoint=None):
+    dimension_tables = {
+        name: db_writer.get_table(name)
+        for name in _get_dimension_table_names()
+    }
+    table_dimensions = cbm3_output_files_loader.get_table_dimensions()
+    for table_name, dimensions in table_dimensions.items():
+        fact_table = db_writer.get_table(table_name)
+        if fact_table is None:
+            continue
+        view_name = get_descriptive_view_name(table_name)
+        if checkpoint and checkpoint.is_completed(view_name):
+            continue
+        db_writer.create_view(
+            view_name,
+            cbm3_output_descriptions.create_descriptive_view_select(
+                fact_table, dimension_tables, dimensions
+            ),
+        )
+        if checkpoint:
+            checkpoint.complete_table(view_name)
+
+
+def _get_dimension_table_names():
+    return [
+        "dimSpatialUnit",
+        "dimDisturbanceType",
+        "dimClassifierSet",
+        "dimUNFCCCLandClass",
+        "dimKP3334Flags",
+        "dimAgeClass",
+    ]
 
 
 def load_file(
-    writer, cbm_output_dir, project_db_path, aidb_path, chunksize=None
+    writer,
+    cbm_output_dir,
+    project_db_path,
+    aidb_path,
+    chunksize=None,
+    deferred_descriptions=False,
+    metadata_cache_dir=None,
+    max_workers=None,
+    pipelined=False,
+    memory_budget_mb=None,
+    metrics=None,
+    checkpoint=None,
+    include_stock_changes=False,
 ):
     """Loads CBM3 output using descriptive dataframes
 
@@ -157,11 +693,146 @@ def load_file(
         chunksize (int, optional): If specified sets a maximum number of rows
             to hold in memory at a given time while loading output
             Defaults to None.
+        deferred_descriptions (bool, optional): If set to true compact fact
+            tables and dimension tables are written in place of the
+            descriptive tables, and the project and archive index metadata
+            tables are not written. See :py:func:`read_descriptive_table`.
+            Defaults to False.
+        metadata_cache_dir (str, optional): If specified, a directory used
+            to cache snapshots of the project and archive index metadata
+            tables between loads. Defaults to None.
+        max_workers (int, optional): If specified the maximum number of
+            worker processes used to load tables concurrently. Defaults to
+            None.
+        pipelined (bool, optional): If set to true reading, processing and
+            writing are performed in overlapping pipeline stages. Defaults
+            to False.
+        memory_budget_mb (float, optional): If specified, chunk sizes are
+            computed per table to fit approximately this many megabytes.
+            Defaults to None.
+        metrics (cbm3_output_loader_metrics.LoadMetrics, optional): If
+            specified, per-stage metrics of each loaded chunk are recorded
+            in this object. Defaults to None.
+        checkpoint (cbm3_output_loader_checkpoint.LoadCheckpoint, optional):
+            If specified, the load progress is recorded in this checkpoint,
+            and a load previously interrupted according to the checkpoint
+            is resumed. The file sizes are recorded with the
+            get_file_size function of writer, and the files are truncated
+            to the recorded sizes by its resume function, so that the rows
+            written before the interruption are not written again.
+            Defaults to None.
+        include_stock_changes (bool, optional): If set to true stock changes
+            and their rollup by timestep are computed and written while
+            loading the flux indicators. Defaults to False.
     """
-    cbm3_output_files_loader.load_output_descriptive_tables(
-        cbm_output_dir=cbm_output_dir,
-        project_db_path=project_db_path,
-        aidb_path=aidb_path,
-        out_func=writer.write,
-        chunksize=chunksize,
+    if checkpoint:
+        # the chunks written to file after the last recorded chunk are
+        # discarded, and written again
+        checkpoint.track_file_sizes(writer.get_file_size)
+        writer.resume(
+            checkpoint.get_started_tables(), checkpoint.get_file_sizes()
+        )
+    if deferred_descriptions:
+        cbm3_output_files_loader.load_output_relational_tables(
+            cbm_output_dir=cbm_output_dir,
+            project_db_path=project_db_path,
+            aidb_path=aidb_path,
+            out_func=writer.write,
+            chunksize=chunksize,
+            include_spatial=True,
+            include_diagnostics=True,
+            include_dimensions=True,
+            include_metadata=False,
+            metadata_cache_dir=metadata_cache_dir,
+            max_workers=max_workers,
+            pipelined=pipelined,
+            memory_budget_mb=memory_budget_mb,
+            metrics=metrics,
+            checkpoint=checkpoint,
+            include_stock_changes=include_stock_changes,
+        )
+    else:
+        cbm3_output_files_loader.load_output_descriptive_tables(
+            cbm_output_dir=cbm_output_dir,
+            project_db_path=project_db_path,
+            aidb_path=aidb_path,
+            out_func=writer.write,
+            chunksize=chunksize,
+            metadata_cache_dir=metadata_cache_dir,
+            max_workers=max_workers,
+            pipelined=pipelined,
+            memory_budget_mb=memory_budget_mb,
+            metrics=metrics,
+            checkpoint=checkpoint,
+            include_stock_changes=include_stock_changes,
+        )
+
+
+def _read_file_table(output_path, table_name, format):
+    if format == "parquet":
+        return cbm3_results_file_writer.read_parquet(output_path, table_name)
+    if format == "arrow":
+        return cbm3_results_file_writer.read_arrow(output_path, table_name)
+    return pd.read_csv(
+        cbm3_results_file_writer.get_csv_path(output_path, table_name)
+    )
+
+
+def read_descriptive_table(
+    output_path, table_name, chunksize=None, format="csv"
+):
+    """Read a descriptive table from files loaded with deferred
+    descriptions by joining the fact table with the dimension tables. The
+    csv files may be compressed.
+
+    Args:
+        output_path (str): the output_path of the file loader_config used to
+            load the results
+        table_name (str): the name of the table to read, for example
+            "tblFluxIndicators"
+        chunksize (int, optional): If specified the fact table is described
+            in chunks of at most this many rows. For the csv format the fact
+            table is also read in chunks, while for the parquet and arrow
+            formats it is read in full. Defaults to None.
+        format (str, optional): the type of the file loader_config used to
+            load the results: "csv", "parquet" or "arrow". Defaults to
+            "csv".
+
+    Raises:
+        ValueError: the specified format is not one of the file formats
+
+    Returns:
+        pandas.DataFrame, or object: returns an iterable of dataframes
+            if chunksize is specified, and otherwise a single dataframe.
+    """
+    if format not in cbm3_results_file_writer.FORMATS:
+        raise ValueError(
+            f"format must be one of: {cbm3_results_file_writer.FORMATS}"
+        )
+    dimension_tables = SimpleNamespace(
+        **{
+            name: _read_file_table(output_path, name, format)
+            for name in _get_dimension_table_names()
+        }
     )
+
+    def describe(df):
+        return cbm3_output_files_loader.describe_fact_table(
+            table_name, df, dimension_tables
+        )
+
+    if format != "csv":
+        fact_table = _read_file_table(output_path, table_name, format)
+        if chunksize:
+            return (
+                describe(fact_table.iloc[start : start + chunksize])
+                for start in range(0, len(fact_table.index), chunksize)
+            )
+        return describe(fact_table)
+    fact_path = cbm3_results_file_writer.get_csv_path(output_path, table_name)
+    if chunksize:
+        return (
+            describe(chunk)
+            for chunk in pd.read_csv(fact_path, chunksize=chunksize)
+        )
+    return describe(pd.read_csv(fact_path))
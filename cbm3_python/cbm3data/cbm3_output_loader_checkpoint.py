@@ -0,0 +1,185 @@
+import os
+import json
+
+
+class LoadCheckpoint:
+    def __init__(self, path):
+        """Tracks the progress of an output load in a small JSON manifest
+        so that an interrupted load can be resumed.
+
+        For each table the manifest records the number of chunks written
+        (chunk_index), the number of rows written (index_offset), whether
+        the table was completely written and, if tracked, the size of its
+        file (file_size). The manifest is saved after each written chunk.
+
+        If the manifest at the specified path exists, the progress of the
+        previous load is read from it.
+
+        Args:
+            path (str): path to the manifest file
+        """
+        self.path = os.path.abspath(path)
+        self._tables = {}
+        self._get_file_size = None
+        if os.path.exists(self.path):
+            with open(self.path) as manifest_file:
+                self._tables = json.load(manifest_file)["tables"]
+
+    def _save(self):
+        manifest_dir = os.path.dirname(self.path)
+        if not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as manifest_file:
+            json.dump({"tables": self._tables}, manifest_file, indent=2)
+        # replace the manifest atomically so that an interruption while
+        # saving does not corrupt it
+        os.replace(tmp_path, self.path)
+
+    def _get_entry(self, table_name):
+        if table_name not in self._tables:
+            self._tables[table_name] = dict(
+                chunk_index=0, index_offset=0, completed=False
+            )
+        return self._tables[table_name]
+
+    def get_started_tables(self):
+        """Get the names of the tables to which at least one chunk was
+        written, including completed tables.
+
+        Returns:
+            list: the table names in the order they were started
+        """
+        return list(self._tables.keys())
+
+    def is_completed(self, table_name):
+        """Check if the specified table was completely written
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            bool: True if the table was completely written
+        """
+        return (
+            table_name in self._tables
+            and self._tables[table_name]["completed"]
+        )
+
+    def get_progress(self):
+        """Get the progress of the started, but incomplete tables
+
+        Returns:
+            dict: a dictionary of table name to a tuple of the number of
+                chunks written, and the number of rows written
+        """
+        return {
+            table_name: (entry["chunk_index"], entry["index_offset"])
+            for table_name, entry in self._tables.items()
+            if not entry["completed"]
+        }
+
+    def track_file_sizes(self, get_file_size):
+        """Record the size of the file of each table along with each
+        written chunk, so that data written after the last recorded chunk
+        can be discarded when the load is resumed.
+
+        Args:
+            get_file_size (func): a function of (table_name) returning the
+                size in bytes of the file of the table, or None if it is
+                not known.
+        """
+        self._get_file_size = get_file_size
+
+    def get_file_sizes(self):
+        """Get the file sizes recorded with the last written chunk of each
+        started, but incomplete table. See :py:func:`track_file_sizes`
+
+        Returns:
+            dict: a dictionary of table name to file size in bytes
+        """
+        return {
+            table_name: entry["file_size"]
+            for table_name, entry in self._tables.items()
+            if not entry["completed"] and "file_size" in entry
+        }
+
+    def commit_chunk(self, table_name, n_rows):
+        """Record that a chunk of the specified table was written
+
+        Args:
+            table_name (str): the table name
+            n_rows (int): the number of rows in the written chunk
+        """
+        entry = self._get_entry(table_name)
+        entry["chunk_index"] += 1
+        entry["index_offset"] += n_rows
+        if self._get_file_size:
+            file_size = self._get_file_size(table_name)
+            if file_size is not None:
+                entry["file_size"] = file_size
+        self._save()
+
+    def reconcile_rows(self, table_name, n_rows):
+        """Update the progress of a started, incomplete table to the
+        number of rows found in the load target. This exceeds the recorded
+        number of rows if the load was interrupted after a chunk, or part
+        of a chunk, was written but before it was recorded, and since the
+        rows are written in order, the load resumes after the rows found.
+
+        Args:
+            table_name (str): the table name
+            n_rows (int): the number of rows of the table in the load
+                target
+
+        Raises:
+            ValueError: the load target has fewer rows than recorded
+        """
+        entry = self._get_entry(table_name)
+        if entry["completed"] or n_rows == entry["index_offset"]:
+            return
+        if n_rows < entry["index_offset"]:
+            raise ValueError(
+                f"{table_name} has {n_rows} rows, but the checkpoint records "
+                f"{entry['index_offset']} rows written"
+            )
+        entry["chunk_index"] += 1
+        entry["index_offset"] = n_rows
+        self._save()
+
+    def complete_table(self, table_name):
+        """Record that the specified table was completely written
+
+        Args:
+            table_name (str): the table name
+        """
+        self._get_entry(table_name)["completed"] = True
+        self._save()
+
+    def get_out_func(self, out_func):
+        """Wrap an out_func of (table_name, data) so that each written
+        chunk is recorded
+
+        Args:
+            out_func (func): the function to wrap
+
+        Returns:
+            func: the wrapped function
+        """
+
+        def f(table_name, df):
+            if table_name not in self._tables:
+                # record the table as started before writing, so that it is
+                # resumed even if the first write is interrupted
+                self._get_entry(table_name)
+                self._save()
+            out_func(table_name, df)
+            self.commit_chunk(table_name, len(df.index))
+
+        return f
+
+    def remove(self):
+        """Delete the manifest, normally once the load is complete"""
+        self._tables = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,349 @@
+import os
+import sys
+import json
+import time
+import threading
+import psutil
+import pandas as pd
+from cbm3_python.util import loghelper
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+
+STAGES = [
+    "load_function",
+    "process_function",
+    "describe_function",
+    "out_func",
+]
+
+
+def get_rss():
+    """Get the current resident set size of the current process in bytes.
+
+    Returns:
+        int: the resident set size
+    """
+    return psutil.Process().memory_info().rss
+
+
+def get_peak_rss():
+    """Get the peak resident set size of the current process in bytes: the
+    high-water mark of the whole process since it started.
+
+    Returns:
+        int: the peak resident set size, or None if it cannot be determined
+            on this platform.
+    """
+    memory_info = psutil.Process().memory_info()
+    if hasattr(memory_info, "peak_wset"):
+        # windows
+        return memory_info.peak_wset
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, and in kilobytes elsewhere
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    return None
+
+
+def get_bytes_read():
+    """Get the number of bytes read by the current process so far.
+
+    Returns:
+        int: the number of bytes read, or None if the platform does not
+            support I/O counters.
+    """
+    try:
+        return psutil.Process().io_counters().read_bytes
+    except (AttributeError, NotImplementedError, psutil.Error):
+        return None
+
+
+def get_log_sink(logger=None):
+    """Get a metrics sink that writes each record to a logger
+
+    Args:
+        logger (logging.Logger, optional): the logger. If None the
+            "cbm3_python" logger is used. Defaults to None.
+
+    Returns:
+        func: a function of a single metrics record (dict)
+    """
+    if logger is None:
+        logger = loghelper.get_logger()
+
+    def sink(record):
+        logger.info(
+            "{table_name} chunk {chunk_index} {stage}: {seconds:.3f}s "
+            "{rows} rows".format(**record)
+        )
+
+    return sink
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        """A metrics sink that appends each record to a JSON lines file.
+
+        Args:
+            path (str): path to the JSON lines file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record)
+        with self._lock, open(self.path, "a") as out_file:
+            out_file.write(line + "\n")
+
+
+class LoadMetrics:
+    def __init__(self, sinks=None):
+        """Collects per-table, per-chunk, per-stage metrics of the output
+        loader pipeline and emits each record to the specified sinks.
+
+        Each record is a dictionary with the following keys:
+
+            * table_name - the name of the loaded table
+            * chunk_index - the 0 based index of the chunk within the table
+            * stage - one of "load_function", "process_function",
+              "describe_function", "out_func", or "async_write" (see
+              :py:class:`AsyncWriter`)
+            * seconds - the wall time spent in the stage
+            * rows - the number of rows in the chunk produced or consumed
+            * bytes_read - bytes read by the process during the stage, if
+              measurable on this platform, otherwise None
+            * rss - the resident set size in bytes of the process after
+              the stage
+            * rss_delta - the change in the resident set size of the
+              process during the stage
+            * peak_rss - the peak resident set size in bytes of the process
+              since it started, if measurable, otherwise None
+            * pid - the id of the process in which the stage ran
+
+        The memory and I/O values are measured for the whole process. When
+        stages run concurrently in the same process, as with the pipelined
+        loader or the :py:class:`AsyncWriter`, bytes_read and rss_delta
+        include the reads and allocations of the other stages running at
+        the same time.
+
+        Args:
+            sinks (list, optional): list of functions of a single record
+                (dict). See :py:func:`get_log_sink` and
+                :py:class:`JsonLinesSink`. Defaults to None.
+        """
+        self.sinks = sinks if sinks else []
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add_record(self, record):
+        """Add a single metrics record, and pass it to the sinks
+
+        Args:
+            record (dict): the metrics record
+        """
+        with self._lock:
+            self.records.append(record)
+        for sink in self.sinks:
+            sink(record)
+
+    def measure(self, table_name, chunk_index, stage, func, *args):
+        """Call func with the specified args, and record metrics for the
+        call.
+
+        Args:
+            table_name (str): the table name
+            chunk_index (int): the index of the chunk within the table
+            stage (str): the stage name
+            func (func): the function to measure
+            args (list): arguments passed to func
+
+        Returns:
+            object: the return value of func(*args)
+        """
+        bytes_read_start = get_bytes_read()
+        rss_start = get_rss()
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        rss_end = get_rss()
+        bytes_read_end = get_bytes_read()
+        # the out_func stage returns nothing, and is measured on its input
+        rows_df = result if isinstance(result, pd.DataFrame) else args[-1]
+        self.add_record(
+            dict(
+                table_name=table_name,
+                chunk_index=chunk_index,
+                stage=stage,
+                seconds=seconds,
+                rows=int(len(rows_df.index)),
+                bytes_read=(
+                    None
+                    if bytes_read_start is None or bytes_read_end is None
+                    else bytes_read_end - bytes_read_start
+                ),
+                rss=rss_end,
+                rss_delta=rss_end - rss_start,
+                peak_rss=get_peak_rss(),
+                pid=os.getpid(),
+            )
+        )
+        return result
+
+    def pop_records(self):
+        """Remove and return the collected records
+
+        Returns:
+            list: the records collected since the last call
+        """
+        with self._lock:
+            records = self.records
+            self.records = []
+        return records
+
+    def get_summary(self):
+        """Summarize the collected records by table and stage.
+
+        Returns:
+            pandas.DataFrame: a table with columns table_name, stage,
+                chunks, rows, seconds, bytes_read, rss_delta (maximum) and
+                peak_rss (maximum)
+        """
+        columns = [
+            "table_name",
+            "stage",
+            "chunks",
+            "rows",
+            "seconds",
+            "bytes_read",
+            "rss_delta",
+            "peak_rss",
+        ]
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(self.records)
+        summary = (
+            df.groupby(["table_name", "stage"], sort=False)
+            .agg(
+                chunks=("chunk_index", "count"),
+                rows=("rows", "sum"),
+                seconds=("seconds", "sum"),
+                bytes_read=("bytes_read", "sum"),
+                rss_delta=("rss_delta", "max"),
+                peak_rss=("peak_rss", "max"),
+            )
+            .reset_index()
+        )
+        return summary[columns]
+
+    def log_summary(self, logger=None):
+        """Write the summary of the collected records to a logger
+
+        Args:
+            logger (logging.Logger, optional): the logger. If None the
+                "cbm3_python" logger is used. Defaults to None.
+        """
+        if logger is None:
+            logger = loghelper.get_logger()
+        logger.info(
+            "output loader metrics summary\n{}".format(
+                self.get_summary().to_string(index=False)
+            )
+        )
+
+
+def instrument(table_name, load_functions, metrics):
+    """Wrap the load, process and describe functions of a table so that
+    each call is measured.
+
+    Args:
+        table_name (str): the table name
+        load_functions (dict): the load functions for the table as
+            returned by
+            :py:func:`cbm3_output_files_loader.LoadFunctionFactory.get_all`
+        metrics (LoadMetrics): the object to which records are added
+
+    Returns:
+        dict: a copy of load_functions with measured functions
+    """
+    instrumented = dict(load_functions)
+    load_function = load_functions["load_function"]
+    process_function = load_functions["process_function"]
+    describe_function = load_functions["describe_function"]
+    chunk_indices = {stage: 0 for stage in STAGES}
+
+    def next_chunk_index(stage):
+        chunk_index = chunk_indices[stage]
+        chunk_indices[stage] += 1
+        return chunk_index
+
+    def measured_load_function():
+        iterator = iter(load_function())
+        while True:
+            try:
+                chunk = metrics.measure(
+                    table_name,
+                    chunk_indices["load_function"],
+                    "load_function",
+                    next,
+                    iterator,
+                )
+            except StopIteration:
+                return
+            next_chunk_index("load_function")
+            yield chunk
+
+    def measured_process_function(index_offset):
+        func = process_function(index_offset)
+
+        def f(df):
+            return metrics.measure(
+                table_name,
+                next_chunk_index("process_function"),
+                "process_function",
+                func,
+                df,
+            )
+
+        return f
+
+    def measured_describe_function(df):
+        return metrics.measure(
+            table_name,
+            next_chunk_index("describe_function"),
+            "describe_function",
+            describe_function,
+            df,
+        )
+
+    instrumented["load_function"] = measured_load_function
+    instrumented["process_function"] = measured_process_function
+    if describe_function is not None:
+        instrumented["describe_function"] = measured_describe_function
+    return instrumented
+
+
+def instrument_out_func(out_func, metrics):
+    """Wrap an out_func of (table_name, data) so that each call is measured.
+
+    Args:
+        out_func (func): the function to wrap
+        metrics (LoadMetrics): the object to which records are added
+
+    Returns:
+        func: the wrapped function
+    """
+    chunk_indices = {}
+
+    def f(table_name, df):
+        chunk_index = chunk_indices.get(table_name, 0)
+        chunk_indices[table_name] = chunk_index + 1
+        metrics.measure(
+            table_name, chunk_index, "out_func", out_func, table_name, df
+        )
+
+    return f
@@ -1,17 +1,138 @@
+import re
+import sqlite3
+import functools
+from types import SimpleNamespace
+import numpy as np
 import pandas as pd
+import sqlalchemy
 import warnings
 from cbm3_python.cbm3data import results_queries
+from cbm3_python.cbm3data import cbm3_results_cache
 from cbm3_python.cbm3data.results_queries import stock_changes_view
 
+try:
+    import duckdb
+except ImportError:
+    # duckdb is only required to query DuckDB results databases
+    duckdb = None
+
+# the opt-in cache of query results, see set_query_cache
+_query_cache = None
+
+# the classifier values of recently queried results database files, by
+# database identity, so that a modified database is not matched
+_classifier_values_cache = {}
+_CLASSIFIER_VALUES_CACHE_SIZE = 16
+
+
+def set_query_cache(cache_dir, max_size_mb=1024):
+    """Enable or disable the on-disk cache of the results of
+    :py:func:`load_pool_indicators`, :py:func:`load_flux_indicators`
+    (and so :py:func:`load_stock_changes`), :py:func:`load_age_indicators`
+    and :py:func:`load_disturbance_indicators`.
+
+    Results are cached by the path, size and modification time of the
+    results database, the query and the rollup_format parameter, so that a
+    repeated call on an unchanged database returns the cached result. Only
+    results databases specified by path, or by an sqlalchemy engine of a
+    database file (for example sqlite) are cached. See
+    :py:class:`cbm3_results_cache.QueryCache`.
+
+    Args:
+        cache_dir (str): the directory in which results are cached, or None
+            to disable the cache.
+        max_size_mb (float, optional): the maximum total size of the
+            cached results in megabytes. The least recently used results
+            are deleted to fit this size. Defaults to 1024.
+    """
+    global _query_cache
+    _query_cache = (
+        cbm3_results_cache.QueryCache(cache_dir, max_size_mb)
+        if cache_dir
+        else None
+    )
+
+
+def _get_cache_key(results_db, sql, rollup_format):
+    if _query_cache is None:
+        return None
+    if isinstance(results_db, CBM3Results):
+        results_db = results_db.results_db
+    identity = cbm3_results_cache.get_database_identity(results_db)
+    if identity is None:
+        return None
+    return _query_cache.get_key(identity, sql, rollup_format)
+
+
+def _get_cached(cache_key):
+    if cache_key is None:
+        return None
+    return _query_cache.get(cache_key)
+
+
+def _put_cached(cache_key, df):
+    if cache_key is not None:
+        _query_cache.put(cache_key, df)
+
+
+def _to_duckdb_sql(sql):
+    """Convert the MS Access style [quoted identifiers] in the results
+    queries to standard "quoted identifiers"
+    """
+    return re.sub(r"\[([^\]]+)\]", r'"\1"', sql)
+
+
+def _use_rollup(sql, results_db, table_name, grouping_names):
+    """Replace the specified table in a results query with the smallest
+    rollup table materialized at load time that covers the grouping, if
+    any. See :py:func:`cbm3_output_loader.load`.
+    """
+    if not isinstance(results_db, CBM3Results):
+        return sql
+    rollup_table_name = results_db.get_rollup_table_name(
+        table_name, grouping_names
+    )
+    if rollup_table_name is None:
+        return sql
+    return re.sub(
+        rf"\bfrom\s+{table_name}\b",
+        f"from {rollup_table_name}",
+        sql,
+        flags=re.IGNORECASE,
+    )
+
 
 def _load_df(sql, results_db):
-    from cbm3_python.cbm3data.accessdb import AccessDB
+    if isinstance(results_db, CBM3Results):
+        return results_db.load_df(sql)
+    with CBM3Results(results_db) as results:
+        return results.load_df(sql)
 
-    if isinstance(results_db, str):
-        with AccessDB(results_db) as access_db:
-            return access_db.as_data_frame(sql)
-    else:
-        return pd.read_sql(sql, results_db)
+
+def _load_dimension(sql, results_db):
+    """Load a dimension table, for example the spatial units, which is
+    queried once for the duration of a :py:class:`CBM3Results` session.
+    """
+    if not isinstance(results_db, CBM3Results):
+        return _load_df(sql, results_db)
+    if sql not in results_db._dimensions:
+        results_db._dimensions[sql] = _load_df(sql, results_db)
+    return results_db._dimensions[sql]
+
+
+def _with_session(func):
+    """Decorates a function of a results_db so that all of the queries it
+    performs use a single :py:class:`CBM3Results` session.
+    """
+
+    @functools.wraps(func)
+    def wrapper(results_db, *args, **kwargs):
+        if isinstance(results_db, CBM3Results):
+            return func(results_db, *args, **kwargs)
+        with CBM3Results(results_db) as results:
+            return func(results, *args, **kwargs)
+
+    return wrapper
 
 
 def _get_classifier_values(results_db):
@@ -19,16 +140,39 @@ def _get_classifier_values(results_db):
     loads the classifier values in the specified results database into an
     indexed collection to serve for labels, grouping and filtering CBM results
     tables
+
+    The values are categorical encoded, and cached for the duration of a
+    :py:class:`CBM3Results` session, and for results database files (see
+    :py:func:`cbm3_results_cache.get_database_identity`) until the file is
+    modified.
     """
-    sql = results_queries.get_classifiers_view()
-    df = _load_df(sql, results_db)
-    return df.pivot(
-        index="UserDefdClassSetID",
-        columns="ClassDesc",
-        values="UserDefdSubClassName",
+    session = results_db if isinstance(results_db, CBM3Results) else None
+    if session is not None and session._classifier_values is not None:
+        return session._classifier_values
+    identity = cbm3_results_cache.get_database_identity(
+        session.results_db if session is not None else results_db
     )
-
-
+    classifier_values = _classifier_values_cache.get(identity)
+    if classifier_values is None:
+        sql = results_queries.get_classifiers_view()
+        df = _load_df(sql, results_db)
+        classifier_values = df.pivot(
+            index="UserDefdClassSetID",
+            columns="ClassDesc",
+            values="UserDefdSubClassName",
+        ).astype("category")
+        if identity is not None:
+            if len(_classifier_values_cache) >= _CLASSIFIER_VALUES_CACHE_SIZE:
+                # dicts are ordered by insertion, so this is the oldest
+                oldest = next(iter(_classifier_values_cache))
+                del _classifier_values_cache[oldest]
+            _classifier_values_cache[identity] = classifier_values
+    if session is not None:
+        session._classifier_values = classifier_values
+    return classifier_values
+
+
+@_with_session
 def load_row_counts(results_db):
     queries = {
         "tblPoolIndicators": (
@@ -51,19 +195,25 @@ def load_row_counts(results_db):
     return pd.DataFrame(index=[0], columns=data.keys(), data=data)
 
 
+@_with_session
 def load_pool_indicators(
     results_db,
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
     rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
 ):
     """Load pool indicators from a cbm3 results database
 
     Args:
         results_db (str, connection, or sqlalchemy.Connectable): path to a
             CBM3 MS access database if a string is specified. Otherwise a
-            connection to a database with CBM3 results schema.
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
         spatial_unit_grouping (bool, optional): If set to True the result will
             be returned with spatial unit stratification. Defaults to False.
         classifier_set_grouping (bool, optional): If set to True the result
@@ -73,12 +223,49 @@ def load_pool_indicators(
             be returned with land class stratification. Defaults to False.
         rollup_format (bool, optional): If set to true query the database in
             the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the result. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
 
     Returns:
         pandas.DataFrame: dataframe containing the results
     """
+    filters = dict(
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
+    )
     sql = results_queries.get_pool_indicators_view_sql(
-        spatial_unit_grouping, classifier_set_grouping, land_class_grouping
+        spatial_unit_grouping,
+        classifier_set_grouping,
+        land_class_grouping,
+        filters,
+    )
+    cache_key = _get_cache_key(results_db, sql, rollup_format)
+    df = _get_cached(cache_key)
+    if df is not None:
+        return df
+    sql = _use_rollup(
+        sql,
+        results_db,
+        "tblPoolIndicators",
+        results_queries.get_grouping_names(
+            False,
+            spatial_unit_grouping,
+            classifier_set_grouping,
+            land_class_grouping,
+        )
+        + results_queries.get_filter_grouping_names(filters),
     )
     df = _load_df(sql, results_db)
     if classifier_set_grouping:
@@ -86,14 +273,16 @@ def load_pool_indicators(
     if spatial_unit_grouping:
         df = _join_spatial_units(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_spatial_units_view(rollup_format),
                 results_db,
             ),
         )
+    _put_cached(cache_key, df)
     return df
 
 
+@_with_session
 def load_stock_changes(
     results_db,
     disturbance_type_grouping=True,
@@ -101,13 +290,19 @@ def load_stock_changes(
     classifier_set_grouping=False,
     land_class_grouping=False,
     rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    disturbance_type_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
 ):
     """Load stock changes from a cbm3 results database
 
     Args:
         results_db (str, connection, or sqlalchemy.Connectable): path to a
             CBM3 MS access database if a string is specified. Otherwise a
-            connection to a database with CBM3 results schema.
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
         disturbance_type_grouping (bool, optional):  If set to True the result
             will be returned with disturbance type stratification. Defaults to
             True. If set to false a warning will be produced but the result
@@ -122,6 +317,21 @@ def load_stock_changes(
             be returned with land class stratification. Defaults to False.
         rollup_format (bool, optional): If set to true query the database in
             the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the result. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        disturbance_type_ids (list, optional): If specified, only the
+            disturbance types (DistTypeID) in this list are included.
+            Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
 
     Returns:
         pandas.DataFrame: dataframe containing the results
@@ -140,10 +350,16 @@ def load_stock_changes(
         classifier_set_grouping=classifier_set_grouping,
         land_class_grouping=land_class_grouping,
         rollup_format=rollup_format,
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        disturbance_type_ids=disturbance_type_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
     )
     return stock_changes_view.get_stock_changes_view(flux_ind_df)
 
 
+@_with_session
 def load_flux_indicators(
     results_db,
     disturbance_type_grouping=False,
@@ -151,13 +367,19 @@ def load_flux_indicators(
     classifier_set_grouping=False,
     land_class_grouping=False,
     rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    disturbance_type_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
 ):
     """Load flux indicators from a cbm3 results database
 
     Args:
         results_db (str, connection, or sqlalchemy.Connectable): path to a
             CBM3 MS access database if a string is specified. Otherwise a
-            connection to a database with CBM3 results schema.
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
         disturbance_type_grouping (bool, optional):  If set to True the result
             will be returned with disturbance type stratification. Defaults to
             False.
@@ -170,15 +392,54 @@ def load_flux_indicators(
             be returned with land class stratification. Defaults to False.
         rollup_format (bool, optional): If set to true query the database in
             the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the result. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        disturbance_type_ids (list, optional): If specified, only the
+            disturbance types (DistTypeID) in this list are included.
+            Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
 
     Returns:
         pandas.DataFrame: dataframe containing the results
     """
+    filters = dict(
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        disturbance_type_ids=disturbance_type_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
+    )
     sql = results_queries.get_flux_indicators_view(
         disturbance_type_grouping,
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
+    )
+    cache_key = _get_cache_key(results_db, sql, rollup_format)
+    df = _get_cached(cache_key)
+    if df is not None:
+        return df
+    sql = _use_rollup(
+        sql,
+        results_db,
+        "tblFluxIndicators",
+        results_queries.get_grouping_names(
+            disturbance_type_grouping,
+            spatial_unit_grouping,
+            classifier_set_grouping,
+            land_class_grouping,
+        )
+        + results_queries.get_filter_grouping_names(filters),
     )
     df = _load_df(sql, results_db)
     if classifier_set_grouping:
@@ -186,7 +447,7 @@ def load_flux_indicators(
     if spatial_unit_grouping:
         df = _join_spatial_units(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_spatial_units_view(rollup_format),
                 results_db,
             ),
@@ -194,27 +455,34 @@ def load_flux_indicators(
     if disturbance_type_grouping:
         df = _join_disturbance_types(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_disturbance_types_view(rollup_format),
                 results_db,
             ),
         )
+    _put_cached(cache_key, df)
     return df
 
 
+@_with_session
 def load_age_indicators(
     results_db,
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
     rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
 ):
     """Load age indicators from a cbm3 results database
 
     Args:
         results_db (str, connection, or sqlalchemy.Connectable): path to a
             CBM3 MS access database if a string is specified. Otherwise a
-            connection to a database with CBM3 results schema.
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
         spatial_unit_grouping (bool, optional): If set to True the result will
             be returned with spatial unit stratification. Defaults to False.
         classifier_set_grouping (bool, optional): If set to True the result
@@ -224,27 +492,54 @@ def load_age_indicators(
             be returned with land class stratification. Defaults to False.
         rollup_format (bool, optional): If set to true query the database in
             the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the result. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
 
     Returns:
         pandas.DataFrame: dataframe containing the results
     """
+    filters = dict(
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
+    )
     sql = results_queries.get_age_indicators_view_sql(
-        spatial_unit_grouping, classifier_set_grouping, land_class_grouping
+        spatial_unit_grouping,
+        classifier_set_grouping,
+        land_class_grouping,
+        filters,
     )
+    cache_key = _get_cache_key(results_db, sql, rollup_format)
+    df = _get_cached(cache_key)
+    if df is not None:
+        return df
     df = _load_df(sql, results_db)
     if classifier_set_grouping:
         df = _join_classifiers(df, _get_classifier_values(results_db))
     if spatial_unit_grouping:
         df = _join_spatial_units(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_spatial_units_view(rollup_format),
                 results_db,
             ),
         )
+    _put_cached(cache_key, df)
     return df
 
 
+@_with_session
 def load_disturbance_indicators(
     results_db,
     disturbance_type_grouping=False,
@@ -252,13 +547,19 @@ def load_disturbance_indicators(
     classifier_set_grouping=False,
     land_class_grouping=False,
     rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    disturbance_type_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
 ):
     """Load disturbance indicators from a cbm3 results database
 
     Args:
         results_db (str, connection, or sqlalchemy.Connectable): path to a
             CBM3 MS access database if a string is specified. Otherwise a
-            connection to a database with CBM3 results schema.
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
         disturbance_type_grouping (bool, optional):  If set to True the result
             will be returned with disturbance type stratification. Defaults to
             False.
@@ -271,15 +572,54 @@ def load_disturbance_indicators(
             be returned with land class stratification. Defaults to False.
         rollup_format (bool, optional): If set to true query the database in
             the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the result. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        disturbance_type_ids (list, optional): If specified, only the
+            disturbance types (DistTypeID) in this list are included.
+            Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
 
     Returns:
         pandas.DataFrame: dataframe containing the results
     """
+    filters = dict(
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        disturbance_type_ids=disturbance_type_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
+    )
     sql = results_queries.get_disturbance_indicators_view_sql(
         disturbance_type_grouping,
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
+    )
+    cache_key = _get_cache_key(results_db, sql, rollup_format)
+    df = _get_cached(cache_key)
+    if df is not None:
+        return df
+    sql = _use_rollup(
+        sql,
+        results_db,
+        "tblDistIndicators",
+        results_queries.get_grouping_names(
+            disturbance_type_grouping,
+            spatial_unit_grouping,
+            classifier_set_grouping,
+            land_class_grouping,
+        )
+        + results_queries.get_filter_grouping_names(filters),
     )
     df = _load_df(sql, results_db)
     if classifier_set_grouping:
@@ -287,7 +627,7 @@ def load_disturbance_indicators(
     if spatial_unit_grouping:
         df = _join_spatial_units(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_spatial_units_view(rollup_format),
                 results_db,
             ),
@@ -295,21 +635,139 @@ def load_disturbance_indicators(
     if disturbance_type_grouping:
         df = _join_disturbance_types(
             df,
-            _load_df(
+            _load_dimension(
                 results_queries.get_disturbance_types_view(rollup_format),
                 results_db,
             ),
         )
+    _put_cached(cache_key, df)
     return df
 
 
+@_with_session
+def load_indicator_bundle(
+    results_db,
+    disturbance_type_grouping=True,
+    spatial_unit_grouping=False,
+    classifier_set_grouping=False,
+    land_class_grouping=False,
+    rollup_format=False,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    disturbance_type_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
+):
+    """Load the pool, flux, age and disturbance indicators, and the stock
+    changes from a cbm3 results database with the same grouping and
+    filters.
+
+    Each indicator query is performed once, and the spatial unit,
+    disturbance type and classifier dimensions are loaded once for all of
+    the indicators. The stock changes are computed from the loaded flux
+    indicators, which therefore must be stratified by disturbance type. If
+    disturbance_type_grouping is false, a warning is produced and the flux
+    indicators are queried a second time with disturbance type
+    stratification to compute the stock changes, as by
+    :py:func:`load_stock_changes`.
+
+    Args:
+        results_db (str, connection, or sqlalchemy.Connectable): path to a
+            CBM3 MS access database if a string is specified. Otherwise a
+            connection to a database with CBM3 results schema, which may be
+            a duckdb connection, or a :py:class:`CBM3Results` session.
+        disturbance_type_grouping (bool, optional): If set to True the flux
+            indicators, disturbance indicators and stock changes are
+            returned with disturbance type stratification. The pool and age
+            indicators are not stratified by disturbance type. Defaults to
+            True.
+        spatial_unit_grouping (bool, optional): If set to True the results
+            will be returned with spatial unit stratification. Defaults to
+            False.
+        classifier_set_grouping (bool, optional): If set to True the results
+            will be returned with classifier set stratification. Defaults to
+            False.
+        land_class_grouping (bool, optional): If set to True the results
+            will be returned with land class stratification. Defaults to
+            False.
+        rollup_format (bool, optional): If set to true query the database in
+            the rollup CBM3 format variant. Defaults to False.
+        timestep_range (tuple, optional): If specified, the first and last
+            timesteps (inclusive) of the results. Either may be None for an
+            open range. Defaults to None.
+        spatial_unit_ids (list, optional): If specified, only the spatial
+            units (SPUID) in this list are included. Defaults to None.
+        disturbance_type_ids (list, optional): If specified, only the
+            disturbance types (DistTypeID) in this list are included in the
+            flux indicators, disturbance indicators and stock changes.
+            Defaults to None.
+        classifier_values (dict, optional): If specified, a dictionary of
+            classifier name to a list of classifier value names, and only
+            the rows matching the values of every specified classifier are
+            included. Defaults to None.
+        land_class_ids (list, optional): If specified, only the land
+            classes (LandClassID) in this list are included. Defaults to
+            None.
+
+    Returns:
+        types.SimpleNamespace: an object with the dataframes
+            pool_indicators, flux_indicators, stock_changes, age_indicators
+            and disturbance_indicators
+    """
+    kwargs = dict(
+        spatial_unit_grouping=spatial_unit_grouping,
+        classifier_set_grouping=classifier_set_grouping,
+        land_class_grouping=land_class_grouping,
+        rollup_format=rollup_format,
+        timestep_range=timestep_range,
+        spatial_unit_ids=spatial_unit_ids,
+        classifier_values=classifier_values,
+        land_class_ids=land_class_ids,
+    )
+    disturbance_kwargs = dict(
+        kwargs,
+        disturbance_type_grouping=disturbance_type_grouping,
+        disturbance_type_ids=disturbance_type_ids,
+    )
+    flux_indicators = load_flux_indicators(results_db, **disturbance_kwargs)
+    if disturbance_type_grouping:
+        stock_changes = stock_changes_view.get_stock_changes_view(
+            flux_indicators
+        )
+    else:
+        stock_changes = load_stock_changes(results_db, **disturbance_kwargs)
+    return SimpleNamespace(
+        pool_indicators=load_pool_indicators(results_db, **kwargs),
+        flux_indicators=flux_indicators,
+        stock_changes=stock_changes,
+        age_indicators=load_age_indicators(results_db, **kwargs),
+        disturbance_indicators=load_disturbance_indicators(
+            results_db, **disturbance_kwargs
+        ),
+    )
+
+
 def _join_classifiers(indicators, classifiers):
-    return pd.merge(
-        classifiers,
-        indicators,
-        left_on="UserDefdClassSetID",
-        right_on="UserDefdClassSetID",
-        validate="1:m",
+    """Join the classifier values to the indicators by classifier set by
+    taking the positions of the classifier sets in the classifier values
+    index, in the row order of an inner merge of the classifier values and
+    the indicators.
+    """
+    positions = classifiers.index.get_indexer(indicators["UserDefdClassSetID"])
+    # rows of undefined classifier sets are dropped, as by an inner merge,
+    # and the remaining rows are ordered by classifier set
+    rows = np.flatnonzero(positions >= 0)
+    rows = rows[np.argsort(positions[rows], kind="stable")]
+    classifier_columns = classifiers.iloc[positions[rows]].reset_index()
+    classifier_columns.columns.name = None
+    return pd.concat(
+        [
+            classifier_columns,
+            indicators.drop(columns="UserDefdClassSetID")
+            .iloc[rows]
+            .reset_index(drop=True),
+        ],
+        axis=1,
     )
 
 
@@ -331,3 +789,190 @@ def _join_disturbance_types(indicators, disturbance_types):
         right_on="DistTypeID",
         validate="1:m",
     )
+
+
+class CBM3Results:
+    def __init__(self, results_db):
+        """A session for querying a CBM3 results database, in which all
+        queries share a single connection.
+
+        The module level functions, for example
+        :py:func:`load_flux_indicators`, open a session for the duration of
+        each call, so that the several queries performed by a call share a
+        connection. Use this class as a context manager to also share the
+        connection across calls::
+
+            with CBM3Results(results_path) as results:
+                pool_indicators = results.load_pool_indicators()
+                flux_indicators = results.load_flux_indicators(True)
+
+        Args:
+            results_db (str, connection, or sqlalchemy.Connectable): path to
+                a CBM3 MS access database if a string is specified.
+                Otherwise a connection to a database with CBM3 results
+                schema, which may be a duckdb connection. If an sqlalchemy
+                engine is specified a connection is checked out of its pool
+                for the session.
+        """
+        self.results_db = results_db
+        self._access_db = None
+        self._connection = None
+        self._rollups = None
+        self._classifier_values = None
+        self._dimensions = {}
+
+    def __enter__(self):
+        if isinstance(self.results_db, str):
+            from cbm3_python.cbm3data.accessdb import AccessDB
+
+            self._access_db = AccessDB(self.results_db)
+        elif isinstance(self.results_db, sqlalchemy.engine.Engine):
+            self._connection = self.results_db.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the connection held by this session"""
+        if self._access_db is not None:
+            self._access_db.close()
+            self._access_db = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def load_df(self, sql):
+        """Query the results database
+
+        Args:
+            sql (str): the query, in the MS access SQL dialect of the
+                results queries
+
+        Returns:
+            pandas.DataFrame: the query result
+        """
+        if self._access_db is not None:
+            return self._access_db.as_data_frame(sql)
+        elif duckdb is not None and isinstance(
+            self.results_db, duckdb.DuckDBPyConnection
+        ):
+            return self.results_db.execute(_to_duckdb_sql(sql)).df()
+        elif self._connection is not None:
+            return pd.read_sql(sql, self._connection)
+        elif isinstance(self.results_db, str):
+            raise ValueError("CBM3Results must be used as a context manager")
+        else:
+            return pd.read_sql(sql, self.results_db)
+
+    def _has_table(self, table_name):
+        if isinstance(self.results_db, str):
+            # rollups are not loaded to MS access databases
+            return False
+        if duckdb is not None and isinstance(
+            self.results_db, duckdb.DuckDBPyConnection
+        ):
+            return bool(
+                self.results_db.execute(
+                    "SELECT count(*) FROM information_schema.tables "
+                    "WHERE table_name = ?",
+                    [table_name],
+                ).fetchone()[0]
+            )
+        connectable = (
+            self._connection
+            if self._connection is not None
+            else self.results_db
+        )
+        if isinstance(
+            connectable,
+            (sqlalchemy.engine.Engine, sqlalchemy.engine.Connection),
+        ):
+            return sqlalchemy.inspect(connectable).has_table(table_name)
+        if isinstance(connectable, sqlite3.Connection):
+            return bool(
+                connectable.execute(
+                    "SELECT count(*) FROM sqlite_master WHERE name = ?",
+                    [table_name],
+                ).fetchone()[0]
+            )
+        return False
+
+    def get_rollups(self):
+        """Get the rollup tables materialized when the results database was
+        loaded. See :py:func:`cbm3_output_loader.load`.
+
+        Returns:
+            pandas.DataFrame: the rollup tables, with the columns TableName,
+                RollupTableName and GroupingNames (the comma separated
+                grouping names), which is empty if no rollups were loaded.
+        """
+        if self._rollups is None:
+            if self._has_table(results_queries.ROLLUPS_TABLE_NAME):
+                self._rollups = self.load_df(
+                    "SELECT TableName, RollupTableName, GroupingNames FROM "
+                    f"{results_queries.ROLLUPS_TABLE_NAME}"
+                )
+            else:
+                self._rollups = pd.DataFrame(
+                    columns=["TableName", "RollupTableName", "GroupingNames"]
+                )
+        return self._rollups
+
+    def get_rollup_table_name(self, table_name, grouping_names):
+        """Get the smallest rollup table of the specified table that covers
+        the specified grouping, that is, a rollup table whose groupings
+        include all of the specified groupings.
+
+        Args:
+            table_name (str): the rolled up table, for example
+                "tblFluxIndicators"
+            grouping_names (list): the names of the requested groupings.
+                See :py:data:`results_queries.GROUPINGS`
+
+        Returns:
+            str: the name of the rollup table, or None if no rollup table
+                covers the grouping
+        """
+        rollup_table_name = None
+        rollup_size = None
+        for row in self.get_rollups().itertuples():
+            if row.TableName != table_name:
+                continue
+            rollup_grouping = set(
+                name for name in (row.GroupingNames or "").split(",") if name
+            )
+            if not rollup_grouping.issuperset(grouping_names):
+                continue
+            if rollup_size is None or len(rollup_grouping) < rollup_size:
+                rollup_table_name = row.RollupTableName
+                rollup_size = len(rollup_grouping)
+        return rollup_table_name
+
+    def load_row_counts(self):
+        """See :py:func:`load_row_counts`"""
+        return load_row_counts(self)
+
+    def load_pool_indicators(self, *args, **kwargs):
+        """See :py:func:`load_pool_indicators`"""
+        return load_pool_indicators(self, *args, **kwargs)
+
+    def load_stock_changes(self, *args, **kwargs):
+        """See :py:func:`load_stock_changes`"""
+        return load_stock_changes(self, *args, **kwargs)
+
+    def load_flux_indicators(self, *args, **kwargs):
+        """See :py:func:`load_flux_indicators`"""
+        return load_flux_indicators(self, *args, **kwargs)
+
+    def load_age_indicators(self, *args, **kwargs):
+        """See :py:func:`load_age_indicators`"""
+        return load_age_indicators(self, *args, **kwargs)
+
+    def load_disturbance_indicators(self, *args, **kwargs):
+        """See :py:func:`load_disturbance_indicators`"""
+        return load_disturbance_indicators(self, *args, **kwargs)
+
+    def load_indicator_bundle(self, *args, **kwargs):
+        """See :py:func:`load_indicator_bundle`"""
+        return load_indicator_bundle(self, *args, **kwargs)
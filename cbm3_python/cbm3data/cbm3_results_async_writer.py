@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+
+# marks the end of the queued writes
+_STOP = object()
+
+
+class AsyncWriter:
+    def __init__(self, writer, max_queue_size=4, metrics=None):
+        """Wraps a writer, for example a :py:class:`CBMResultsDBWriter` or a
+        :py:class:`CBM3ResultsFileWriter`, so that the writes are performed
+        on a dedicated thread, overlapping with the loading of the next
+        chunks.
+
+        Calls to :py:func:`write` add the chunk to a bounded queue, and
+        block only while the queue is full. An exception raised by the
+        wrapped writer is raised to the caller on the next call to
+        :py:func:`write`, or when the context manager exits.
+
+        Any other attribute of the wrapped writer (for example get_table,
+        or create_view) is accessed only once all queued writes are
+        complete.
+
+        Args:
+            writer (object): the writer to wrap, with a method
+                write(table_name, pandas.DataFrame)
+            max_queue_size (int, optional): the maximum number of chunks
+                waiting to be written. Defaults to 4.
+            metrics (LoadMetrics, optional): If specified, each write is
+                measured as the "async_write" stage. See
+                :py:class:`cbm3_output_loader_metrics.LoadMetrics`. Defaults
+                to None.
+        """
+        self._writer = writer
+        self._metrics = metrics
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._error = None
+        self._chunk_indices = {}
+        self._queue_depths = []
+        self._wait_seconds = 0.0
+        self._write_seconds = 0.0
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._write_queued, name="AsyncWriter", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop()
+        if exc_type is None:
+            self._raise_error()
+
+    def __getattr__(self, name):
+        # called only for attributes not defined by this class
+        if name.startswith("_"):
+            raise AttributeError(name)
+        self.flush()
+        return getattr(self._writer, name)
+
+    def _stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _raise_error(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    def _write_queued(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                if self._error is None:
+                    self._write(*item)
+            except BaseException as error:
+                # the remaining queued items are discarded so that the
+                # caller does not block on a full queue
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, table_name, df):
+        start = time.perf_counter()
+        if self._metrics is None:
+            self._writer.write(table_name, df)
+        else:
+            chunk_index = self._chunk_indices.get(table_name, 0)
+            self._chunk_indices[table_name] = chunk_index + 1
+            self._metrics.measure(
+                table_name,
+                chunk_index,
+                "async_write",
+                self._writer.write,
+                table_name,
+                df,
+            )
+        self._write_seconds += time.perf_counter() - start
+
+    def write(self, table_name, df):
+        """Queue the specified data to be written by the wrapped writer
+
+        Args:
+            table_name (str): the table name
+            df (pandas.DataFrame): the data to write
+
+        Raises:
+            ValueError: the instance is not being used as a context manager
+        """
+        if self._thread is None:
+            raise ValueError("AsyncWriter must be used as a context manager")
+        self._raise_error()
+        start = time.perf_counter()
+        self._queue.put((table_name, df))
+        self._wait_seconds += time.perf_counter() - start
+        self._queue_depths.append(self._queue.qsize())
+
+    def flush(self):
+        """Wait until all queued data is written
+
+        Raises:
+            Exception: the exception raised by the wrapped writer, if any
+        """
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_error()
+
+    def get_queue_metrics(self):
+        """Get metrics of the write queue
+
+        Returns:
+            dict: a dictionary with the following keys:
+
+                * writes - the number of chunks queued
+                * max_queue_depth - the maximum number of chunks in the
+                  queue, sampled after each chunk is queued
+                * mean_queue_depth - the mean of the sampled queue depths
+                * wait_seconds - the total time the caller was blocked
+                  waiting for space in the queue
+                * write_seconds - the total time spent by the wrapped
+                  writer
+        """
+        writes = len(self._queue_depths)
+        return dict(
+            writes=writes,
+            max_queue_depth=max(self._queue_depths, default=0),
+            mean_queue_depth=(
+                sum(self._queue_depths) / writes if writes else 0.0
+            ),
+            wait_seconds=self._wait_seconds,
+            write_seconds=self._write_seconds,
+        )
@@ -0,0 +1,145 @@
+import os
+import glob
+import hashlib
+import pandas as pd
+import sqlalchemy
+
+try:
+    import pyarrow
+except ImportError:
+    # pyarrow is only required if the query cache is enabled
+    pyarrow = None
+
+_CACHE_FILE_EXTENSION = ".parquet"
+
+
+def get_database_identity(results_db):
+    """Get a string identifying the content of a results database by its
+    path, size and modification time, so that a changed database does not
+    match the results cached for a previous version.
+
+    Args:
+        results_db (str, or sqlalchemy.engine.Engine): path to a CBM3 MS
+            access database, or an sqlalchemy engine. Engines are
+            identified only if their database is a file, for example an
+            sqlite database.
+
+    Returns:
+        str: the identity of the database, or None if the database cannot
+            be identified.
+    """
+    if isinstance(results_db, str):
+        path = results_db
+    elif isinstance(results_db, sqlalchemy.engine.Engine):
+        path = results_db.url.database
+    else:
+        return None
+    if not path or not os.path.isfile(path):
+        return None
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class QueryCache:
+    def __init__(self, cache_dir, max_size_mb=1024):
+        """An on-disk cache of query results. Each result is stored in its
+        own Parquet file. Requires the pyarrow package.
+
+        When the total size of the cached results exceeds max_size_mb, the
+        least recently used results are deleted.
+
+        Args:
+            cache_dir (str): the directory in which results are stored. It
+                is created if it does not exist.
+            max_size_mb (float, optional): the maximum total size of the
+                cached results in megabytes. Defaults to 1024.
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+        if pyarrow is None:
+            raise ImportError("the query cache requires pyarrow")
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+
+    def get_key(self, *parts):
+        """Get the cache key of a result
+
+        Args:
+            parts (str): the values identifying the result, for example
+                the database identity and the query
+
+        Returns:
+            str: the key
+        """
+        return hashlib.sha1(
+            "|".join(str(part) for part in parts).encode("utf-8")
+        ).hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{_CACHE_FILE_EXTENSION}")
+
+    def get(self, key):
+        """Get a cached result
+
+        Args:
+            key (str): the key of the result. See :py:func:`get_key`
+
+        Returns:
+            pandas.DataFrame: the result, or None if the result is not cached
+        """
+        path = self._get_path(key)
+        try:
+            df = pd.read_parquet(path, engine="pyarrow")
+        except FileNotFoundError:
+            return None
+        # the modification time records the last use of the result
+        os.utime(path)
+        return df
+
+    def put(self, key, df):
+        """Store a result, and then delete the least recently used results
+        while the total size of the cache exceeds the limit.
+
+        Args:
+            key (str): the key of the result. See :py:func:`get_key`
+            df (pandas.DataFrame): the result
+        """
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        path = self._get_path(key)
+        # write to a temporary path first so that concurrent readers never
+        # see a partial result
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(temp_path, engine="pyarrow")
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in glob.glob(
+            os.path.join(self.cache_dir, f"*{_CACHE_FILE_EXTENSION}")
+        ):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        max_size = self.max_size_mb * 1024 * 1024
+        for _, size, path in sorted(entries):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        """Delete all cached results"""
+        for path in glob.glob(
+            os.path.join(self.cache_dir, f"*{_CACHE_FILE_EXTENSION}")
+        ):
+            os.remove(path)
@@ -2,6 +2,14 @@ import sqlalchemy
 from sqlalchemy import ForeignKey
 from sqlalchemy import Column
 
+# the name of the catalogue table of runs in a database shared by multiple
+# runs
+RUN_TABLE_NAME = "tblRuns"
+
+# columns commonly used to filter and group the results tables in queries.
+# See the query_index_columns parameter of CBMResultsDBWriter
+QUERY_INDEX_COLUMNS = ["TimeStep", "UserDefdClassSetID", "SPUID", "DistTypeID"]
+
 
 def _get_constraints(
     primary_key=None, index=None, unique=None, foreign_key=None
@@ -19,13 +27,44 @@ def _get_constraints(
     return dict(args=args, kwargs=kwargs)
 
 
-def get_constraints():
+def get_constraints(run_table_id_columns=None):
     """Get a nested dictionary of table names to column
     dictionaries containing constraint and index definitions for sqlalchemy
 
+    Args:
+        run_table_id_columns (dict, optional): If specified, the constraints
+            for a database shared by multiple runs are returned. The keys are
+            the names of the tables that have an indexed RunID column
+            referencing the run catalogue table, and the values are the
+            ID column of each table that is unique across runs, or None.
+            If None RunID is added to the primary key of the table, if it
+            has one. Defaults to None.
+
     Returns:
         dict: the column constraints and indexes
     """
+    constraints = _get_table_constraints()
+    if run_table_id_columns:
+        _add_run_constraints(constraints, run_table_id_columns)
+    return constraints
+
+
+def _add_run_constraints(constraints, run_table_id_columns):
+    constraints[RUN_TABLE_NAME] = {"RunID": _get_constraints(primary_key=True)}
+    for table_name, id_column in run_table_id_columns.items():
+        table_constraints = constraints.setdefault(table_name, {})
+        has_primary_key = any(
+            "primary_key" in column_constraints["kwargs"]
+            for column_constraints in table_constraints.values()
+        )
+        table_constraints["RunID"] = _get_constraints(
+            primary_key=has_primary_key and not id_column,
+            index=True,
+            foreign_key=f"{RUN_TABLE_NAME}.RunID",
+        )
+
+
+def _get_table_constraints():
     return {
         "tblAccountingRuleDiagnostics": {
             "DistTypeID": _get_constraints(
@@ -261,6 +300,13 @@ def get_constraints():
                 foreign_key="tblEcoBoundaryDefault.EcoBoundaryID", index=True
             ),
         },
+        "tblStockChanges": {
+            "FluxIndicatorID": _get_constraints(primary_key=True),
+            "TimeStep": _get_constraints(index=True),
+        },
+        "tblStockChangesByTimeStep": {
+            "TimeStep": _get_constraints(index=True),
+        },
         "tblSVL": {
             "SVLID": _get_constraints(primary_key=True),
             "SPUID": _get_constraints(index=True, foreign_key="tblSPU.SPUID"),
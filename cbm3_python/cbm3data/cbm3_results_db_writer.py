@@ -1,7 +1,15 @@
+import time
 from sqlalchemy import Table
+from sqlalchemy import Column
+from sqlalchemy import Index
 from sqlalchemy import MetaData
+from sqlalchemy import ForeignKeyConstraint
+from sqlalchemy.schema import AddConstraint
 from cbm3_python.cbm3data import cbm3_results_db_schema
+from cbm3_python.util import loghelper
 from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy import inspect
 
 
 class CBMResultsDBWriter:
@@ -11,6 +19,9 @@ class CBMResultsDBWriter:
         constraint_defs,
         create_engine_kwargs=None,
         multi_update_variable_limit=None,
+        sqlite_bulk_load=False,
+        deferred_constraints=False,
+        query_index_columns=None,
     ):
         """Create object to insert dataframes to a relational database.
 
@@ -25,6 +36,33 @@ class CBMResultsDBWriter:
                 the "multi" pandas.DataFrame.to_sql method for query batching.
                 The integer value is used to set the upper limit on batch
                 size. Defaults to None.
+            sqlite_bulk_load (bool, optional): If set to true, and the url
+                refers to an SQLite database, the data is written using a
+                bulk load path: the journal and synchronous pragmas are
+                relaxed for the duration of the load, the chunks of each
+                table are inserted in a single transaction with a prepared
+                statement, and the secondary indexes are created once all
+                data is written, when the writer is closed. The instance
+                must be used as a context manager. Ignored for other
+                databases. Defaults to False.
+            deferred_constraints (bool, optional): If set to true the tables
+                are created without any primary keys, foreign keys, unique
+                constraints or indexes, and these are added to the tables
+                in :py:func:`finalize` once all data is written. SQLite
+                cannot add constraints to existing tables, so there the
+                tables are created with their primary and foreign keys,
+                which SQLite does not enforce while the foreign_keys pragma
+                is off (the default), and only the indexes, including those
+                of unique columns, are deferred. The foreign keys are then
+                checked in :py:func:`finalize`, and any violations are
+                logged. Tables resumed with
+                :py:func:`resume` are not altered. Defaults to False.
+            query_index_columns (list, optional): A list of column names.
+                In :py:func:`finalize`, an index is created on each of these
+                columns, in each table created by this instance that has
+                the column, if the column is not already indexed. See
+                :py:data:`cbm3_results_db_schema.QUERY_INDEX_COLUMNS` for a
+                set of columns commonly used in queries. Defaults to None.
         """
         self._engine = (
             create_engine(url, **create_engine_kwargs)
@@ -36,15 +74,174 @@ class CBMResultsDBWriter:
         self._meta = MetaData()
         self._created_tables = {}
         self._connection = None
+        self._bulk_load = sqlite_bulk_load and self._is_sqlite()
+        self._transaction_table = None
+        self._restore_pragmas = {}
+        self._deferred_indexes = []
+        self._bulk_load_stats = {}
+        self._deferred_constraints = deferred_constraints
+        self._query_index_columns = (
+            query_index_columns if query_index_columns else []
+        )
+        # the names of the tables created by this instance and not yet
+        # finalized
+        self._unfinalized_tables = set()
+
+    @property
+    def engine(self):
+        """The sqlalchemy engine used to write to the database"""
+        return self._engine
 
     def __enter__(self):
         self._connection = self._engine.connect()
+        if self._bulk_load:
+            self._begin_bulk_load()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if self._connection:
-            self._connection.close()
-        self._engine.dispose()
+        try:
+            if self._connection:
+                if exc_type is None:
+                    self.finalize()
+                elif self._bulk_load:
+                    # keep the rows written before the error
+                    self._commit()
+                    self._end_bulk_load()
+        finally:
+            # release the database, for example the lock on a SQLite file,
+            # even if completing the tables failed
+            if self._connection:
+                self._connection.close()
+            self._engine.dispose()
+
+    def finalize(self):
+        """Complete the tables created by this instance once all data is
+        written. This is called when the context manager exits without
+        error.
+
+          * If the writer was created with deferred_constraints, the
+            primary keys, unique constraints, foreign keys and indexes are
+            added to the tables. On SQLite, the deferred indexes are
+            created, and the foreign keys are checked with
+            PRAGMA foreign_key_check, logging any violations.
+          * With the sqlite bulk load path, the deferred secondary indexes
+            are created.
+          * The indexes on the query_index_columns are created.
+        """
+        self._commit()
+        tables = [
+            table
+            for table in self._meta.sorted_tables
+            if table.name in self._unfinalized_tables
+        ]
+        if self._deferred_constraints and not self._is_sqlite():
+            self._add_constraints(tables)
+        for index in self._deferred_indexes:
+            index.create(self._connection)
+            index.table.indexes.add(index)
+        self._deferred_indexes.clear()
+        self._create_query_indexes(tables)
+        self._connection.commit()
+        if self._deferred_constraints and self._is_sqlite():
+            self._check_foreign_keys(tables)
+        self._unfinalized_tables.clear()
+        if self._bulk_load:
+            self._end_bulk_load()
+
+    def _is_sqlite(self):
+        return self._engine.dialect.name == "sqlite"
+
+    def _add_constraints(self, tables):
+        # primary keys and unique constraints are added to all tables
+        # before the foreign keys which reference them
+        for table in tables:
+            for constraint in table.constraints:
+                if isinstance(constraint, ForeignKeyConstraint):
+                    continue
+                if constraint.columns:
+                    self._connection.execute(AddConstraint(constraint))
+            for index in table.indexes:
+                index.create(self._connection)
+        for table in tables:
+            for constraint in table.foreign_key_constraints:
+                self._connection.execute(AddConstraint(constraint))
+
+    def _check_foreign_keys(self, tables):
+        # the violations are logged rather than raised, since sqlite
+        # accepts the same rows when the foreign keys are not deferred.
+        # Every row referencing a table that does not exist is reported as
+        # a violation, so those references are not checked
+        inspector = inspect(self._connection)
+        violations = {}
+        for table in tables:
+            for parent, n_rows in self._connection.exec_driver_sql(
+                "SELECT parent, COUNT(*) FROM pragma_foreign_key_check(?) "
+                "GROUP BY parent",
+                (table.name,),
+            ):
+                if inspector.has_table(parent):
+                    violations[(table.name, parent)] = n_rows
+        logger = loghelper.get_logger()
+        for (table_name, parent), n_rows in violations.items():
+            logger.warning(
+                f"foreign key check: {n_rows} rows of {table_name} "
+                f"reference missing rows of {parent}"
+            )
+
+    def _create_query_indexes(self, tables):
+        for table in tables:
+            indexed_columns = {
+                index.columns[0].name
+                for index in table.indexes
+                if len(index.columns) == 1
+            }
+            if len(table.primary_key.columns) == 1:
+                indexed_columns.update(table.primary_key.columns.keys())
+            for column in self._query_index_columns:
+                if column not in table.c or column in indexed_columns:
+                    continue
+                index = Index(f"ix_{table.name}_{column}", table.c[column])
+                index.create(self._connection)
+
+    def _begin_bulk_load(self):
+        pragmas = dict(
+            journal_mode="MEMORY", synchronous="OFF", temp_store="MEMORY"
+        )
+        for pragma, value in pragmas.items():
+            self._restore_pragmas[pragma] = self._connection.exec_driver_sql(
+                f"PRAGMA {pragma}"
+            ).scalar()
+            self._connection.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+        self._connection.commit()
+
+    def _end_bulk_load(self):
+        for pragma, value in self._restore_pragmas.items():
+            self._connection.exec_driver_sql(f"PRAGMA {pragma} = {value}")
+        self._restore_pragmas.clear()
+        self._connection.commit()
+        logger = loghelper.get_logger()
+        for table_name, (rows, seconds) in self._bulk_load_stats.items():
+            logger.info(
+                f"sqlite bulk load {table_name}: {rows} rows in "
+                f"{seconds:.3f}s ({rows / max(seconds, 1e-9):.0f} rows/s)"
+            )
+
+    def _commit(self):
+        """Commit the transaction of the table currently being bulk
+        loaded, if any.
+        """
+        if self._transaction_table is not None:
+            self._connection.commit()
+            self._transaction_table = None
+
+    def get_bulk_load_stats(self):
+        """Get the number of rows written and the seconds spent writing
+        them for each table written using the sqlite bulk load path.
+
+        Returns:
+            dict: a dictionary of table name to a tuple of (rows, seconds)
+        """
+        return dict(self._bulk_load_stats)
 
     def write(self, table_name, df):
         """Write the specified data using the sqlalchemy engine.
@@ -69,14 +266,147 @@ class CBMResultsDBWriter:
                     table_name, df, self._constraint_defs
                 )
             )
-            table.create(self._engine)
+            self._create_table(table)
             self._created_tables[table_name] = table
+            self._unfinalized_tables.add(table_name)
         # insert the values in df
-        table = self._created_tables[table_name]
+        self._insert(self._created_tables[table_name], df)
+
+    def _insert(self, table, df):
+        """Insert the rows of df into the specified, existing table"""
+        if self._bulk_load:
+            self._bulk_insert(table, df)
+            return
         to_sql_kwargs = dict(
-            name=table_name, con=self._engine, if_exists="append", index=False
+            name=table.name, con=self._engine, if_exists="append", index=False
         )
         if self._variable_limit:
             max_rows = self._variable_limit // len(df.columns)
             to_sql_kwargs.update(dict(method="multi", chunksize=max_rows))
         df.to_sql(**to_sql_kwargs)
+
+    def _create_table(self, table):
+        if self._deferred_constraints and not self._is_sqlite():
+            # the table definition, with constraints, is kept for
+            # finalize, while a table with only the columns is created
+            table = Table(
+                table.name,
+                MetaData(),
+                *[
+                    Column(column.name, column.type)
+                    for column in table.columns
+                ],
+            )
+        elif self._bulk_load or self._deferred_constraints:
+            # the primary key is created with the table, while the
+            # secondary indexes are deferred until all data is written
+            self._deferred_indexes.extend(table.indexes)
+            table.indexes.clear()
+        if self._bulk_load:
+            self._commit()
+            table.create(self._connection)
+            self._connection.commit()
+        else:
+            table.create(self._engine)
+
+    def _bulk_insert(self, table, df):
+        start = time.perf_counter()
+        if self._transaction_table != table.name:
+            # one transaction per table
+            self._commit()
+            self._transaction_table = table.name
+        quote = self._engine.dialect.identifier_preparer.quote
+        columns = ", ".join(quote(column) for column in df.columns)
+        parameters = ", ".join("?" for _ in df.columns)
+        rows = list(
+            zip(
+                *[
+                    df[column].to_numpy(dtype=object, na_value=None).tolist()
+                    for column in df.columns
+                ]
+            )
+        )
+        self._connection.exec_driver_sql(
+            f"INSERT INTO {quote(table.name)} ({columns}) "
+            f"VALUES ({parameters})",
+            rows,
+        )
+        n_rows, seconds = self._bulk_load_stats.get(table.name, (0, 0.0))
+        self._bulk_load_stats[table.name] = (
+            n_rows + len(df.index),
+            seconds + time.perf_counter() - start,
+        )
+
+    def resume(self, table_names):
+        """Resume writing to tables created by a previous, interrupted
+        load. Subsequent calls to :py:func:`write` for the specified tables
+        append to the existing tables rather than creating them.
+
+        Tables that do not exist in the database are ignored.
+
+        Args:
+            table_names (list): the names of the tables to resume
+        """
+        inspector = inspect(self._engine)
+        for table_name in table_names:
+            if table_name in self._created_tables:
+                continue
+            if not inspector.has_table(table_name):
+                continue
+            self._created_tables[table_name] = Table(
+                table_name, self._meta, autoload_with=self._engine
+            )
+
+    def get_row_count(self, table_name):
+        """Get the number of rows of a table created or resumed by this
+        instance
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            int: the number of rows, or 0 if the table has not been
+                created or resumed by this instance
+        """
+        if table_name not in self._created_tables:
+            return 0
+        quoted_name = self._engine.dialect.identifier_preparer.quote(
+            table_name
+        )
+        # release the lock held by an open bulk load transaction
+        self._commit()
+        with self._engine.connect() as conn:
+            return conn.execute(
+                text(f"SELECT COUNT(*) FROM {quoted_name}")
+            ).scalar()
+
+    def get_table(self, table_name):
+        """Get the table definition of a table created by this instance
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            sqlalchemy.Table: the table, or None if the table has not been
+                created by this instance
+        """
+        return self._created_tables.get(table_name)
+
+    def create_view(self, view_name, select):
+        """Create a view in the database
+
+        Args:
+            view_name (str): the name of the view
+            select (sqlalchemy.Select): the select statement defining the
+                view
+        """
+        select_sql = select.compile(
+            self._engine, compile_kwargs={"literal_binds": True}
+        )
+        quoted_name = self._engine.dialect.identifier_preparer.quote(
+            view_name
+        )
+        # release the lock held by an open bulk load transaction
+        self._commit()
+        with self._engine.begin() as conn:
+            conn.execute(text(f"CREATE VIEW {quoted_name} AS {select_sql}"))
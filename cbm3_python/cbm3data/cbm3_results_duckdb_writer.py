@@ -0,0 +1,195 @@
+from sqlalchemy import Table
+from sqlalchemy import Column
+from sqlalchemy import MetaData
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+from cbm3_python.cbm3data import cbm3_results_db_schema
+
+try:
+    import duckdb
+except ImportError:
+    # duckdb is only required for the duckdb loader type
+    duckdb = None
+
+try:
+    import pyarrow
+except ImportError:
+    # without pyarrow, chunks are scanned by duckdb directly from pandas
+    pyarrow = None
+
+
+def _get_duckdb_type(column_type):
+    # sqlalchemy.Float is compiled as FLOAT, which is single precision in
+    # duckdb, so the types are mapped explicitly
+    if isinstance(column_type, sqlalchemy.Boolean):
+        return "BOOLEAN"
+    if isinstance(column_type, sqlalchemy.Integer):
+        return "BIGINT"
+    if isinstance(column_type, sqlalchemy.Float):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+# the name under which each chunk is registered with the connection
+_CHUNK_VIEW_NAME = "_cbm3_chunk"
+
+
+class CBMResultsDuckDBWriter:
+    def __init__(self, path):
+        """Create object to bulk insert dataframes to a DuckDB database file.
+
+        Each chunk is converted to an Arrow table (if pyarrow is installed)
+        and inserted with a single INSERT ... SELECT statement, so that
+        DuckDB ingests it column by column rather than row by row. The
+        tables are created with the column types of the first chunk
+        written, as by :py:class:`CBMResultsDBWriter`, but without
+        constraints or indexes.
+
+        Args:
+            path (str): path to the DuckDB database file. It is created if
+                it does not exist.
+        """
+        if duckdb is None:
+            raise ImportError("the duckdb loader type requires duckdb")
+        self.path = path
+        self._meta = MetaData()
+        self._created_tables = {}
+        self._connection = None
+
+    @property
+    def connection(self):
+        """The duckdb connection used to write to the database"""
+        return self._connection
+
+    def __enter__(self):
+        self._connection = duckdb.connect(self.path)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def write(self, table_name, df):
+        """Write the specified data to the database.
+
+        If the specified table name has not already been created by this
+        instance, it will be created. If the specified table name matches
+        the name of an already existing table, and error will be raised.
+
+        On any subsequent calls to this function with the same table_name,
+        the specified data frame will be appended to the table.
+
+        Args:
+            table_name (str): the table name
+            df (pandas.DataFrame): a pandas data frame to insert to the table.
+        """
+        chunk = (
+            pyarrow.Table.from_pandas(df, preserve_index=False)
+            if pyarrow is not None
+            else df
+        )
+        if table_name not in self._created_tables:
+            self._create_table(table_name, df)
+        self._connection.register(_CHUNK_VIEW_NAME, chunk)
+        try:
+            self._connection.execute(
+                f'INSERT INTO "{table_name}" BY NAME '
+                f"SELECT * FROM {_CHUNK_VIEW_NAME}"
+            )
+        finally:
+            self._connection.unregister(_CHUNK_VIEW_NAME)
+
+    def _create_table(self, table_name, df):
+        # the column types are taken from the schema rather than inferred
+        # by duckdb, which would type a column of the first chunk having
+        # only null values as an integer column
+        table = Table(
+            table_name,
+            self._meta,
+            *cbm3_results_db_schema.create_column_definitions(
+                table_name, df, {}
+            ),
+        )
+        columns = ", ".join(
+            f'"{column.name}" {_get_duckdb_type(column.type)}'
+            for column in table.columns
+        )
+        self._connection.execute(f'CREATE TABLE "{table_name}" ({columns})')
+        self._created_tables[table_name] = table
+
+    def resume(self, table_names):
+        """Resume writing to tables created by a previous, interrupted
+        load. Subsequent calls to :py:func:`write` for the specified tables
+        append to the existing tables rather than creating them.
+
+        Tables that do not exist in the database are ignored.
+
+        Args:
+            table_names (list): the names of the tables to resume
+        """
+        for table_name in table_names:
+            if table_name in self._created_tables:
+                continue
+            columns = [
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_name = ? ORDER BY ordinal_position",
+                    [table_name],
+                ).fetchall()
+            ]
+            if columns:
+                self._add_table_definition(table_name, columns)
+
+    def _add_table_definition(self, table_name, columns):
+        # the definition is used to build the select statements of views,
+        # for which only the column names are needed
+        self._created_tables[table_name] = Table(
+            table_name, self._meta, *[Column(column) for column in columns]
+        )
+
+    def get_row_count(self, table_name):
+        """Get the number of rows of a table created or resumed by this
+        instance
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            int: the number of rows, or 0 if the table has not been
+                created or resumed by this instance
+        """
+        if table_name not in self._created_tables:
+            return 0
+        return self._connection.execute(
+            f'SELECT COUNT(*) FROM "{table_name}"'
+        ).fetchone()[0]
+
+    def get_table(self, table_name):
+        """Get the table definition of a table created by this instance
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            sqlalchemy.Table: the table, or None if the table has not been
+                created by this instance
+        """
+        return self._created_tables.get(table_name)
+
+    def create_view(self, view_name, select):
+        """Create a view in the database
+
+        Args:
+            view_name (str): the name of the view
+            select (sqlalchemy.Select): the select statement defining the
+                view
+        """
+        # the duckdb SQL dialect is compatible with PostgreSQL for the
+        # joins and labels used by the descriptive views
+        select_sql = select.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+        self._connection.execute(f'CREATE VIEW "{view_name}" AS {select_sql}')
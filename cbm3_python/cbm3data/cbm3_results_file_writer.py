@@ -1,30 +1,90 @@
+import io
 import os
+import gzip
+import shutil
 
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    # pyarrow is only required for the parquet and arrow formats
+    pyarrow = None
 
-FORMATS = ["csv"]
+try:
+    import zstandard
+except ImportError:
+    # zstandard is only required for zstd compressed csv output
+    zstandard = None
+
+
+FORMATS = ["csv", "parquet", "arrow"]
+
+# the supported csv compression methods, and their file extensions
+CSV_COMPRESSIONS = {None: ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+# the size of the write buffer of each open csv file
+_CSV_BUFFER_SIZE = 1 << 20
 
 
 class CBM3ResultsFileWriter:
-    def __init__(self, format, out_path, writer_kwargs):
+    def __init__(
+        self,
+        format,
+        out_path,
+        writer_kwargs,
+        partition_by_timestep=False,
+        compression=None,
+        float_format=None,
+    ):
         """Create object to append dataframes to file
 
         Args:
-            format (str): the format name ("csv")
+            format (str): the format name ("csv", "parquet" or "arrow")
             out_path (str): Location into which DataFrames will be appended.
-                For csv format this is a directory
+                For all formats this is a directory
             writer_kwargs (dict): extra keyword arguments to pass to the
-                underlying write methods
+                underlying write methods. For the parquet format these are
+                passed to pyarrow.parquet.ParquetWriter, for example
+                {"compression": "zstd"}. For the arrow format they are
+                passed to pyarrow.ipc.IpcWriteOptions.
+            partition_by_timestep (bool, optional): For the parquet format
+                only. If set to true the tables with a TimeStep column are
+                written to a directory per table, partitioned by TimeStep in
+                the hive layout ("<table>/TimeStep=<t>/part-<n>.parquet"),
+                with a part file per chunk written. Defaults to False.
+            compression (str, optional): For the csv format only. One of
+                "gzip" or "zstd". The files are named "<table>.csv.gz" or
+                "<table>.csv.zst" respectively. The zstd compression requires
+                the zstandard package. If None, the files are not
+                compressed. Defaults to None.
+            float_format (str, optional): For the csv format only. A format
+                string for floating point numbers, passed to
+                pandas.DataFrame.to_csv, for example "%.6g". If None floats
+                are written with full precision. Defaults to None.
 
         Raises:
             ValueError: the specified format string does not match one of the
-                supported formats.
+                supported formats, or the compression is not supported.
         """
         if format not in FORMATS:
             raise ValueError(f"format must be one of: {FORMATS}")
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(
+                "compression must be one of: "
+                f"{list(CSV_COMPRESSIONS.keys())}"
+            )
+        if compression and format != "csv":
+            raise ValueError("compression is only supported for csv")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires zstandard")
+        if format in ["parquet", "arrow"] and pyarrow is None:
+            raise ImportError(f"the {format} format requires pyarrow")
 
         self.format = format
         out_path = os.path.abspath(out_path)
-        if format == "csv":
+        if format in ["csv", "parquet", "arrow"]:
             self.out_dir = out_path
         else:
             self.out_dir = os.path.dirname(out_path)
@@ -33,19 +93,89 @@ class CBM3ResultsFileWriter:
             os.makedirs(self.out_dir)
         self.created_files = set()
         self.writer_kwargs = writer_kwargs
+        self.partition_by_timestep = partition_by_timestep
+        self.compression = compression
+        self.float_format = float_format
+        # the open csv files, and parquet and arrow writers by file path,
+        # along with the schema of each table, and the number of part files
+        # written to the TimeStep partitions of each partitioned table
+        self._open_writers = {}
+        self._schemas = {}
+        self._part_counts = {}
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
+        self.close()
+
+    def close(self):
+        """Close any files held open by this writer"""
+        for open_writer in self._open_writers.values():
+            open_writer.close()
+        self._open_writers.clear()
 
     def _def_get_file_path(self, name):
         if self.format == "csv":
-            return os.path.join(self.out_dir, f"{name}.csv")
+            extension = CSV_COMPRESSIONS[self.compression]
+            return os.path.join(self.out_dir, f"{name}{extension}")
+        elif self.format == "parquet":
+            return os.path.join(self.out_dir, f"{name}.parquet")
+        elif self.format == "arrow":
+            return os.path.join(self.out_dir, f"{name}.arrows")
         else:
             return self.out_path
 
+    def resume(self, table_names, file_sizes=None):
+        """Resume writing to tables written by a previous, interrupted
+        load. Subsequent calls to :py:func:`write` for the specified tables
+        append to the existing files rather than overwriting them.
+
+        Args:
+            table_names (list): the names of the tables to resume
+            file_sizes (dict, optional): If specified, the size in bytes of
+                the file of each table when its last chunk was recorded,
+                as returned by :py:func:`get_file_size`. The files are
+                truncated to these sizes, discarding any data written
+                after the last recorded chunk, and the files of the tables
+                not in file_sizes are overwritten. Defaults to None.
+
+        Raises:
+            ValueError: the format is parquet or arrow, which cannot be
+                appended to, or a file is smaller than its recorded size.
+        """
+        if self.format in ["parquet", "arrow"] and table_names:
+            raise ValueError(
+                f"{self.format} files cannot be appended to once they are "
+                "closed"
+            )
+        for table_name in table_names:
+            out_path = self._def_get_file_path(table_name)
+            if file_sizes is not None:
+                if table_name not in file_sizes:
+                    # no chunk of the table was recorded
+                    continue
+                _truncate(out_path, file_sizes[table_name])
+            if os.path.exists(out_path):
+                self.created_files.add(out_path)
+
+    def get_file_size(self, table_name):
+        """Get the size of the file written for the specified table. Each
+        chunk written in the csv format is flushed to the file, so this
+        size includes all written chunks.
+
+        Args:
+            table_name (str): the table name
+
+        Returns:
+            int: the size of the file in bytes, or None if the format is
+                not csv
+        """
+        if self.format != "csv":
+            return None
+        out_path = self._def_get_file_path(table_name)
+        return os.path.getsize(out_path) if os.path.exists(out_path) else 0
+
     def write(self, table_name, df):
         """Append the specified dataframe associated with the specified
         table_name to file.
@@ -53,23 +183,245 @@ class CBM3ResultsFileWriter:
         On the first call to this function for a given table any existing
         table will be overwritten, and a new file will be initialized.  On
         subsequent calls with the same table name, the specified data will
-        be appended to the corresponding file output.
+        be appended to the corresponding file output. For all formats the
+        file of each table is held open until the writer is closed, except
+        for the part files of parquet tables partitioned by TimeStep,
+        which are closed once each chunk is written. For the csv format
+        each chunk is flushed to the file once written, as a complete gzip
+        member or zstd frame if compressed.
 
         Args:
             table_name (str): the name of the table to write
             df (pandas.DataFrame): the data to write
         """
+        if self.format == "parquet":
+            self._write_parquet(table_name, df)
+            return
+        if self.format == "arrow":
+            self._write_arrow(table_name, df)
+            return
+        self._write_csv(table_name, df)
+
+    def _write_csv(self, table_name, df):
         out_path = self._def_get_file_path(table_name)
+        header = False
+        if out_path not in self._open_writers:
+            # files registered by resume are appended to
+            append = out_path in self.created_files
+            if not append:
+                if os.path.exists(out_path):
+                    os.remove(out_path)
+                self.created_files.add(out_path)
+                header = True
+            self._open_writers[out_path] = open(
+                out_path, "ab" if append else "wb", buffering=_CSV_BUFFER_SIZE
+            )
+        kwargs = dict(index=False, header=header)
+        if self.float_format:
+            kwargs["float_format"] = self.float_format
+        if self.writer_kwargs:
+            kwargs.update(self.writer_kwargs)
+        binary_file = self._open_writers[out_path]
+        chunk_file = self._open_csv_chunk(binary_file)
+        text_file = io.TextIOWrapper(chunk_file, encoding="utf-8", newline="")
+        df.to_csv(text_file, **kwargs)
+        text_file.flush()
+        text_file.detach()
+        if chunk_file is not binary_file:
+            # ends the gzip member or zstd frame without closing the file
+            chunk_file.close()
+        # each chunk is flushed to disk once written, so that the file ends
+        # with a complete chunk if the load is interrupted
+        binary_file.flush()
+
+    def _open_csv_chunk(self, binary_file):
+        if self.compression == "gzip":
+            # each chunk is written as a complete gzip member. Successive
+            # members are read as a continuation of the same stream.
+            return io.BufferedWriter(
+                gzip.GzipFile(fileobj=binary_file, mode="wb", compresslevel=6),
+                _CSV_BUFFER_SIZE,
+            )
+        elif self.compression == "zstd":
+            # likewise, each chunk is written as a complete zstd frame
+            return zstandard.ZstdCompressor().stream_writer(
+                binary_file, write_size=_CSV_BUFFER_SIZE, closefd=False
+            )
+        return binary_file
+
+    def _get_schema(self, table_name, df):
+        if table_name not in self._schemas:
+            # the schema of the first chunk is used for all chunks so that
+            # they can be appended to the same file. pyarrow types an
+            # object column having only null values as null, which the
+            # values of later chunks cannot be converted to, so such
+            # columns are typed as strings, as by the database writers
+            schema = pyarrow.Schema.from_pandas(df, preserve_index=False)
+            for i_field, field in enumerate(schema):
+                if pyarrow.types.is_null(field.type):
+                    schema = schema.set(
+                        i_field, field.with_type(pyarrow.string())
+                    )
+            self._schemas[table_name] = schema
+        return self._schemas[table_name]
+
+    def _to_table(self, table_name, df):
+        schema = self._get_schema(table_name, df)
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        if table.schema != schema:
+            # for example a column having only null values in this chunk,
+            # or integer values in a floating point column
+            table = table.select(schema.names).cast(schema)
+        return table
+
+    def _write_parquet(self, table_name, df):
+        partitioned = self.partition_by_timestep and "TimeStep" in df.columns
+        if partitioned:
+            out_path = os.path.join(self.out_dir, table_name)
+        else:
+            out_path = self._def_get_file_path(table_name)
         if out_path not in self.created_files:
-            if os.path.exists(out_path):
+            if os.path.isdir(out_path):
+                shutil.rmtree(out_path)
+            elif os.path.exists(out_path):
                 os.remove(out_path)
             self.created_files.add(out_path)
-        args = [out_path]
+            self._part_counts[table_name] = 0
+        if not partitioned:
+            if out_path not in self._open_writers:
+                self._open_writers[out_path] = pyarrow.parquet.ParquetWriter(
+                    out_path,
+                    self._get_schema(table_name, df),
+                    **(self.writer_kwargs or {}),
+                )
+            self._open_writers[out_path].write_table(
+                self._to_table(table_name, df)
+            )
+            return
+        # each chunk is written as a new part file of each of its TimeStep
+        # partitions, so that no files are held open between chunks
+        part = self._part_counts[table_name]
+        self._part_counts[table_name] += 1
+        for timestep, timestep_df in df.groupby("TimeStep", sort=False):
+            partition_dir = os.path.join(out_path, f"TimeStep={timestep}")
+            if not os.path.exists(partition_dir):
+                os.makedirs(partition_dir)
+            table = self._to_table(
+                table_name, timestep_df.drop(columns="TimeStep")
+            )
+            with pyarrow.parquet.ParquetWriter(
+                os.path.join(partition_dir, f"part-{part}.parquet"),
+                table.schema,
+                **(self.writer_kwargs or {}),
+            ) as parquet_writer:
+                parquet_writer.write_table(table)
 
-        if self.format == "csv":
-            kwargs = dict(
-                mode="a", index=False, header=not os.path.exists(out_path)
+    def _write_arrow(self, table_name, df):
+        out_path = self._def_get_file_path(table_name)
+        if out_path not in self._open_writers:
+            self._open_writers[out_path] = pyarrow.ipc.new_stream(
+                out_path,
+                self._get_schema(table_name, df),
+                options=pyarrow.ipc.IpcWriteOptions(
+                    **(self.writer_kwargs or {})
+                ),
             )
-            if self.writer_kwargs:
-                kwargs.update(self.writer_kwargs)
-            df.to_csv(*args, **kwargs)
+        self._open_writers[out_path].write_table(
+            self._to_table(table_name, df)
+        )
+
+
+def _truncate(path, size):
+    file_size = os.path.getsize(path) if os.path.exists(path) else 0
+    if file_size < size:
+        raise ValueError(
+            f"{path} has {file_size} bytes, but {size} bytes were recorded "
+            "written"
+        )
+    if file_size > size:
+        with open(path, "r+b") as file:
+            file.truncate(size)
+
+
+def get_csv_path(out_path, table_name, compression=None):
+    """Get the path of a table written by a
+    :py:class:`CBM3ResultsFileWriter` in the csv format.
+
+    Args:
+        out_path (str): the out_path of the writer
+        table_name (str): the table name
+        compression (str, optional): the compression of the writer. If
+            None, the path of the uncompressed file is returned if it
+            exists, and otherwise the path of an existing compressed file.
+            Defaults to None.
+
+    Returns:
+        str: the path to the csv file. pandas.read_csv infers the
+            compression from the file extension.
+    """
+    if compression:
+        return os.path.join(
+            out_path, f"{table_name}{CSV_COMPRESSIONS[compression]}"
+        )
+    for extension in CSV_COMPRESSIONS.values():
+        path = os.path.join(out_path, f"{table_name}{extension}")
+        if os.path.exists(path):
+            return path
+    return os.path.join(out_path, f"{table_name}.csv")
+
+
+def read_arrow(out_path, table_name, columns=None):
+    """Read a table written by a :py:class:`CBM3ResultsFileWriter` in the
+    arrow format. The file is memory mapped, so that only the specified
+    columns are read from disk.
+
+    Args:
+        out_path (str): the out_path of the writer
+        table_name (str): the name of the table to read
+        columns (list, optional): If specified, only these columns are read.
+            Defaults to None.
+
+    Returns:
+        pandas.DataFrame: the table
+    """
+    if pyarrow is None:
+        raise ImportError("the arrow format requires pyarrow")
+    path = os.path.join(os.path.abspath(out_path), f"{table_name}.arrows")
+    with pyarrow.memory_map(path) as source:
+        table = pyarrow.ipc.open_stream(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas()
+
+
+def read_parquet(out_path, table_name, columns=None, timesteps=None):
+    """Read a table written by a :py:class:`CBM3ResultsFileWriter` in the
+    parquet format, reading only the specified columns and timesteps from
+    disk.
+
+    Args:
+        out_path (str): the out_path of the writer
+        table_name (str): the name of the table to read
+        columns (list, optional): If specified, only these columns are read.
+            Defaults to None.
+        timesteps (list, optional): If specified only the rows with these
+            TimeStep values are read. Row groups and TimeStep partitions
+            without any of these values are skipped. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: the table
+    """
+    if pyarrow is None:
+        raise ImportError("the parquet format requires pyarrow")
+    path = os.path.join(os.path.abspath(out_path), table_name)
+    read_kwargs = dict(columns=columns)
+    if os.path.isdir(path):
+        # partitioned by TimeStep
+        read_kwargs["partitioning"] = pyarrow.dataset.partitioning(
+            pyarrow.schema([("TimeStep", pyarrow.int64())]), flavor="hive"
+        )
+    else:
+        path = f"{path}.parquet"
+    if timesteps is not None:
+        read_kwargs["filters"] = [("TimeStep", "in", list(timesteps))]
+    return pyarrow.parquet.read_table(path, **read_kwargs).to_pandas()
@@ -0,0 +1,250 @@
+import os
+import pandas as pd
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import func
+from cbm3_python.cbm3data.cbm3_results_db_schema import RUN_TABLE_NAME
+
+
+class MultiRunDBWriter:
+    def __init__(self, db_writer, constraint_defs, output_table_id_columns):
+        """Wraps a :py:class:`CBMResultsDBWriter` so that the results of
+        multiple CBM runs are appended to the same tables of a single
+        database.
+
+          * A row describing each run is added to the run catalogue table
+            (see :py:func:`add_run`).
+          * A RunID column is added to each of the output tables.
+          * The generated ID columns of the output tables are offset by the
+            maximum ID already in the database, so that they remain unique
+            across runs.
+          * The metadata tables (for example tblSPU, tblDisturbanceType) are
+            deduplicated: only rows with a key not already present in the
+            database are written. The runs must share the same project
+            level metadata, so a ValueError is raised if a row differs from
+            the row of the same key already in the database.
+          * Classifier sets are matched across runs by name, and the
+            UserDefdClassSetID values of each run are mapped to the IDs of
+            the matching classifier sets already in the database. The
+            name of a classifier set is formed from its classifier values,
+            so a ValueError is raised if the names are not unique, rather
+            than attributing the results of distinct classifier sets to
+            the same ID.
+
+        Args:
+            db_writer (CBMResultsDBWriter): the writer to wrap. It must be
+                created with the constraints returned by
+                :py:func:`cbm3_results_db_schema.get_constraints` with the
+                run_table_id_columns parameter.
+            constraint_defs (dict): the constraint definitions used by
+                db_writer
+            output_table_id_columns (dict): the output tables and their
+                generated ID columns as returned by
+                :py:func:`cbm3_output_files_loader.get_output_table_id_columns`
+        """
+        self._db_writer = db_writer
+        self._constraint_defs = constraint_defs
+        self._output_table_id_columns = output_table_id_columns
+        self._existing_tables = set(
+            inspect(db_writer.engine).get_table_names()
+        )
+        # the tables written by previous runs are appended to
+        db_writer.resume(self._existing_tables)
+        self._id_offsets = {}
+        self._classifier_set_id_map = None
+        self.run_id = None
+
+    def add_run(
+        self, project_db_path, cbm_output_dir, run_id=None, run_name=None
+    ):
+        """Add a run to the run catalogue table. This must be called before
+        any other data is written.
+
+        Args:
+            project_db_path (str): path to the CBM3 project database
+            cbm_output_dir (str): path to the CBMRun/output dir
+            run_id (int, optional): The id of the run. If None, the run is
+                assigned the next available id. Defaults to None.
+            run_name (str, optional): A name for the run, for example a
+                scenario name. Defaults to None.
+
+        Raises:
+            ValueError: the specified run_id has already been loaded
+
+        Returns:
+            int: the run id
+        """
+        existing_run_ids = set()
+        if RUN_TABLE_NAME in self._existing_tables:
+            existing_run_ids = set(
+                pd.read_sql_table(
+                    RUN_TABLE_NAME, self._db_writer.engine, columns=["RunID"]
+                ).RunID
+            )
+        if run_id is None:
+            run_id = max(existing_run_ids, default=0) + 1
+        elif run_id in existing_run_ids:
+            raise ValueError(f"RunID {run_id} has already been loaded")
+        self.run_id = int(run_id)
+        self._db_writer.write(
+            RUN_TABLE_NAME,
+            pd.DataFrame(
+                {
+                    "RunID": [self.run_id],
+                    "RunName": [run_name if run_name else ""],
+                    "ProjectPath": [os.path.abspath(project_db_path)],
+                    "CBMOutputDir": [os.path.abspath(cbm_output_dir)],
+                }
+            ),
+        )
+        return self.run_id
+
+    def write(self, table_name, df):
+        """Write the specified data for the current run.
+
+        Args:
+            table_name (str): the table name
+            df (pandas.DataFrame): the data to write
+        """
+        if self.run_id is None:
+            raise ValueError("add_run must be called before writing data")
+        if table_name in self._output_table_id_columns:
+            df = self._prepare_output_table(table_name, df)
+        else:
+            df = self._prepare_metadata_table(table_name, df)
+            if table_name in self._existing_tables and df.empty:
+                return
+        self._db_writer.write(table_name, df)
+
+    def get_table(self, table_name):
+        """See :py:func:`CBMResultsDBWriter.get_table`"""
+        return self._db_writer.get_table(table_name)
+
+    def _prepare_output_table(self, table_name, df):
+        # the IDs are offset in a copy, leaving the written data unchanged
+        df = self._map_classifier_set_ids(df.copy())
+        id_column = self._output_table_id_columns[table_name]
+        if id_column:
+            if table_name not in self._id_offsets:
+                self._id_offsets[table_name] = self._get_max_value(
+                    table_name, id_column
+                )
+            df[id_column] = df[id_column] + self._id_offsets[table_name]
+        df.insert(loc=1 if id_column else 0, column="RunID", value=self.run_id)
+        return df
+
+    def _prepare_metadata_table(self, table_name, df):
+        if table_name == "tblUserDefdClassSets":
+            self._classifier_set_id_map = self._create_classifier_set_id_map(
+                df
+            )
+        df = self._map_classifier_set_ids(df.copy())
+        if table_name not in self._existing_tables:
+            return df
+        key_columns = self._get_primary_key_columns(table_name)
+        if not key_columns:
+            key_columns = list(df.columns)
+        value_columns = [
+            column for column in df.columns if column not in key_columns
+        ]
+        existing = pd.read_sql_table(
+            table_name, self._db_writer.engine, columns=list(df.columns)
+        )
+        existing_values = dict(
+            zip(
+                _get_row_keys(existing[key_columns]),
+                _get_row_keys(existing[value_columns]),
+            )
+        )
+        is_new_row = []
+        mismatched_keys = []
+        for key, values in zip(
+            _get_row_keys(df[key_columns]), _get_row_keys(df[value_columns])
+        ):
+            is_new_row.append(key not in existing_values)
+            if key in existing_values and existing_values[key] != values:
+                mismatched_keys.append(key)
+        if mismatched_keys:
+            raise ValueError(
+                f"the {table_name} rows with the {key_columns} values "
+                f"{mismatched_keys} differ from the rows of the same key "
+                "already in the database: the runs must share the same "
+                "metadata"
+            )
+        return df[is_new_row]
+
+    def _create_classifier_set_id_map(self, df):
+        _check_unique_classifier_set_names(df, "the loaded run")
+        if "tblUserDefdClassSets" not in self._existing_tables:
+            return None
+        existing = pd.read_sql_table(
+            "tblUserDefdClassSets",
+            self._db_writer.engine,
+            columns=["UserDefdClassSetID", "Name"],
+        )
+        _check_unique_classifier_set_names(existing, "the database")
+        mapped_ids = df.Name.map(
+            pd.Series(
+                existing.UserDefdClassSetID.to_numpy(), index=existing.Name
+            )
+        )
+        is_new = mapped_ids.isna()
+        next_id = (
+            int(existing.UserDefdClassSetID.max()) + 1
+            if not existing.empty
+            else 1
+        )
+        mapped_ids[is_new] = range(next_id, next_id + int(is_new.sum()))
+        return pd.Series(
+            mapped_ids.astype("int64").to_numpy(),
+            index=df.UserDefdClassSetID.to_numpy(),
+        )
+
+    def _map_classifier_set_ids(self, df):
+        if (
+            self._classifier_set_id_map is None
+            or "UserDefdClassSetID" not in df.columns
+        ):
+            return df
+        df["UserDefdClassSetID"] = df.UserDefdClassSetID.map(
+            self._classifier_set_id_map
+        )
+        return df
+
+    def _get_primary_key_columns(self, table_name):
+        return [
+            column
+            for column, column_constraints in self._constraint_defs.get(
+                table_name, {}
+            ).items()
+            if column_constraints["kwargs"].get("primary_key")
+        ]
+
+    def _get_max_value(self, table_name, column):
+        table = self._db_writer.get_table(table_name)
+        if table is None:
+            return 0
+        with self._db_writer.engine.connect() as conn:
+            max_value = conn.execute(
+                select(func.max(table.c[column]))
+            ).scalar()
+        return int(max_value) if max_value is not None else 0
+
+
+def _get_row_keys(df):
+    # the rows are compared by typed value, with missing values compared
+    # as None, so that for example 1 matches 1.0 but not "1"
+    return (
+        df.astype(object)
+        .where(df.notna(), None)
+        .itertuples(index=False, name=None)
+    )
+
+
+def _check_unique_classifier_set_names(df, source):
+    duplicated = df.Name[df.Name.duplicated()].unique()
+    if len(duplicated):
+        raise ValueError(
+            f"classifier sets are matched across runs by name, but {source} "
+            f"has multiple classifier sets named: {list(duplicated)}"
+        )
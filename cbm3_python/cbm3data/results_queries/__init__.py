@@ -34,6 +34,71 @@ def get_disturbance_types_view(rollup_format=False):
         return f.read()
 
 
+# the groupings of the results queries, and the columns by which each
+# grouping stratifies the results, in the order of the grouping parameters
+GROUPINGS = {
+    "disturbance_type": ["DistTypeID"],
+    "spatial_unit": ["SPUID"],
+    "classifier_set": ["UserDefdClassSetID"],
+    "land_class": ["LandClassID", "kf2", "kf3", "kf4", "kf5", "kf6"],
+}
+
+# the catalogue of the rollup tables materialized at load time
+ROLLUPS_TABLE_NAME = "tblRollups"
+
+# the abbreviation of each grouping in the rollup table names, which are
+# kept within the identifier length limits of the supported databases
+_ROLLUP_TABLE_NAME_SUFFIXES = {
+    "disturbance_type": "DT",
+    "spatial_unit": "SPU",
+    "classifier_set": "CS",
+    "land_class": "LC",
+}
+
+
+def get_grouping_names(
+    disturbance_type_grouping=False,
+    spatial_unit_grouping=False,
+    classifier_set_grouping=False,
+    land_class_grouping=False,
+):
+    """Get the names of the specified groupings. See :py:data:`GROUPINGS`
+
+    Returns:
+        list: the grouping names
+    """
+    flags = [
+        disturbance_type_grouping,
+        spatial_unit_grouping,
+        classifier_set_grouping,
+        land_class_grouping,
+    ]
+    return [name for name, flag in zip(GROUPINGS, flags) if flag]
+
+
+def get_rollup_table_name(table_name, grouping_names):
+    """Get the name of the table in which a rollup of the specified table is
+    materialized.
+
+    Args:
+        table_name (str): the name of the rolled up table, for example
+            "tblFluxIndicators"
+        grouping_names (list): the names of the groupings (see
+            :py:data:`GROUPINGS`) by which, along with TimeStep, the table is
+            rolled up
+
+    Returns:
+        str: the rollup table name, for example
+            "tblFluxIndicatorsRollup_DT_SPU"
+    """
+    suffixes = [
+        _ROLLUP_TABLE_NAME_SUFFIXES[name]
+        for name in GROUPINGS
+        if name in grouping_names
+    ]
+    return "_".join([f"{table_name}Rollup"] + suffixes)
+
+
 def build_grouping(
     table_name,
     disturbance_type_grouping=False,
@@ -42,30 +107,132 @@ def build_grouping(
     land_class_grouping=False,
 ):
     grouping = []
-    if disturbance_type_grouping:
-        grouping.append(
-            "{table_name}.DistTypeID".format(table_name=table_name)
-        )
-    if spatial_unit_grouping:
-        grouping.append("{table_name}.SPUID".format(table_name=table_name))
-    if classifier_set_grouping:
-        grouping.append(
-            "{table_name}.UserDefdClassSetID".format(table_name=table_name)
-        )
-    if land_class_grouping:
+    for name in get_grouping_names(
+        disturbance_type_grouping,
+        spatial_unit_grouping,
+        classifier_set_grouping,
+        land_class_grouping,
+    ):
         grouping.append(
             ",".join(
-                [
-                    "{table_name}.{col_name}".format(
-                        table_name=table_name, col_name=x
-                    )
-                    for x in ["LandClassID", "kf2", "kf3", "kf4", "kf5", "kf6"]
-                ]
+                "{table_name}.{col_name}".format(
+                    table_name=table_name, col_name=x
+                )
+                for x in GROUPINGS[name]
             )
         )
     return grouping
 
 
+def _format_literal(value):
+    if isinstance(value, str):
+        return "'{}'".format(value.replace("'", "''"))
+    return str(int(value))
+
+
+def _format_in_list(values):
+    return ",".join(_format_literal(value) for value in values)
+
+
+def get_filter_grouping_names(filters):
+    """Get the names of the groupings (see :py:data:`GROUPINGS`) whose
+    columns are used by the specified filters.
+
+    Args:
+        filters (dict): keyword arguments of :py:func:`build_filter`, or
+            None
+
+    Returns:
+        list: the grouping names
+    """
+    if not filters:
+        return []
+    filter_groupings = {
+        "disturbance_type_ids": "disturbance_type",
+        "spatial_unit_ids": "spatial_unit",
+        "classifier_values": "classifier_set",
+        "land_class_ids": "land_class",
+    }
+    return [
+        name
+        for key, name in filter_groupings.items()
+        if filters.get(key) is not None
+    ]
+
+
+def build_filter(
+    table_name,
+    timestep_range=None,
+    spatial_unit_ids=None,
+    disturbance_type_ids=None,
+    classifier_values=None,
+    land_class_ids=None,
+):
+    """Build the conditions of a WHERE clause restricting the rows of an
+    indicator table.
+
+    Args:
+        table_name (str): the name or alias of the filtered table
+        timestep_range (tuple, optional): the first and last timesteps,
+            inclusive. Either may be None for an open range. Defaults to
+            None.
+        spatial_unit_ids (list, optional): the SPUID values to include.
+            Defaults to None.
+        disturbance_type_ids (list, optional): the DistTypeID values to
+            include. Defaults to None.
+        classifier_values (dict, optional): a dictionary of classifier name
+            (ClassDesc) to the list of classifier value names
+            (UserDefdSubClassName) to include. Rows are included if they
+            match the values of every specified classifier. Defaults to
+            None.
+        land_class_ids (list, optional): the LandClassID values to include.
+            Defaults to None.
+
+    Returns:
+        list: the conditions
+    """
+    conditions = []
+    if timestep_range is not None:
+        first_timestep, last_timestep = timestep_range
+        if first_timestep is not None:
+            conditions.append(
+                f"{table_name}.TimeStep >= {_format_literal(first_timestep)}"
+            )
+        if last_timestep is not None:
+            conditions.append(
+                f"{table_name}.TimeStep <= {_format_literal(last_timestep)}"
+            )
+    for column, values in [
+        ("SPUID", spatial_unit_ids),
+        ("DistTypeID", disturbance_type_ids),
+        ("LandClassID", land_class_ids),
+    ]:
+        if values is None:
+            continue
+        if len(values) == 0:
+            # an empty IN list is not valid in all SQL dialects
+            conditions.append("1 = 0")
+        else:
+            conditions.append(
+                f"{table_name}.{column} IN ({_format_in_list(values)})"
+            )
+    if classifier_values:
+        with open(get_local_path("classifier_filter.sql")) as f:
+            classifier_filter = f.read()
+        for classifier_name, value_names in classifier_values.items():
+            if len(value_names) == 0:
+                conditions.append("1 = 0")
+                continue
+            subquery = classifier_filter.format(
+                _format_literal(classifier_name),
+                _format_in_list(value_names),
+            )
+            conditions.append(
+                f"{table_name}.UserDefdClassSetID IN ({subquery})"
+            )
+    return conditions
+
+
 def get_formatted_query(
     path,
     table_name,
@@ -73,11 +240,36 @@ def get_formatted_query(
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
+    filters=None,
 ):
+    """Get a results query stratified by the specified groupings, and
+    restricted to the rows matching the specified filters.
+
+    Args:
+        path (str): the query template
+        table_name (str): the alias of the queried table in the template
+        disturbance_type_grouping (bool, optional): stratify by
+            disturbance type. Defaults to False.
+        spatial_unit_grouping (bool, optional): stratify by spatial unit.
+            Defaults to False.
+        classifier_set_grouping (bool, optional): stratify by classifier
+            set. Defaults to False.
+        land_class_grouping (bool, optional): stratify by land class.
+            Defaults to False.
+        filters (dict, optional): keyword arguments of
+            :py:func:`build_filter`, which are compiled into the WHERE
+            clause of the query. Defaults to None.
+
+    Returns:
+        str: the query
+    """
     path = get_local_path(path)
     with open(path) as f:
         sql = f.read()
 
+    conditions = build_filter(table_name, **filters) if filters else []
+    where = "\nwhere " + "\nand ".join(conditions) if conditions else ""
+
     grouping = build_grouping(
         table_name,
         disturbance_type_grouping,
@@ -87,9 +279,11 @@ def get_formatted_query(
     )
 
     if len(grouping) > 0:
-        sql = sql.format(",".join(grouping) + ",", "," + ",".join(grouping))
+        sql = sql.format(
+            ",".join(grouping) + ",", "," + ",".join(grouping), where
+        )
     else:
-        sql = sql.format("", "")
+        sql = sql.format("", "", where)
     return sql
 
 
@@ -98,6 +292,7 @@ def get_flux_indicators_view(
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
+    filters=None,
 ):
     return get_formatted_query(
         get_local_path("flux_indicators_view.sql"),
@@ -106,6 +301,7 @@ def get_flux_indicators_view(
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
     )
 
 
@@ -113,6 +309,7 @@ def get_pool_indicators_view_sql(
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
+    filters=None,
 ):
     return get_formatted_query(
         get_local_path("pool_indicators_view.sql"),
@@ -121,6 +318,7 @@ def get_pool_indicators_view_sql(
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
     )
 
 
@@ -128,6 +326,7 @@ def get_age_indicators_view_sql(
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
+    filters=None,
 ):
     return get_formatted_query(
         get_local_path("age_indicators_view.sql"),
@@ -136,6 +335,7 @@ def get_age_indicators_view_sql(
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
     )
 
 
@@ -144,6 +344,7 @@ def get_disturbance_indicators_view_sql(
     spatial_unit_grouping=False,
     classifier_set_grouping=False,
     land_class_grouping=False,
+    filters=None,
 ):
     return get_formatted_query(
         get_local_path("disturbance_indicators_view.sql"),
@@ -152,4 +353,5 @@ def get_disturbance_indicators_view_sql(
         spatial_unit_grouping,
         classifier_set_grouping,
         land_class_grouping,
+        filters,
     )
@@ -4,5 +4,5 @@ tai.Biomass AS Biomass,
 tai.DOM AS DOM,
 tai.AveAge AS AveAge
 FROM tblAgeIndicators AS tai INNER JOIN tblAgeClasses
-    ON tai.AgeClassID = tblAgeClasses.AgeClassID
+    ON tai.AgeClassID = tblAgeClasses.AgeClassID{2}
 ORDER BY tai.TimeStep, tblAgeClasses.AgeClassID{1}
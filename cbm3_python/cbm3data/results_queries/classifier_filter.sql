@@ -0,0 +1,10 @@
+SELECT tblUserDefdClassSetValues.UserDefdClassSetID
+FROM (
+    tblUserDefdClasses INNER JOIN tblUserDefdClassSetValues ON
+    tblUserDefdClasses.UserDefdClassID = tblUserDefdClassSetValues.UserDefdClassID
+) INNER JOIN tblUserDefdSubclasses ON (
+    tblUserDefdClassSetValues.UserDefdSubclassID = tblUserDefdSubclasses.UserDefdSubclassID
+) AND (
+    tblUserDefdClassSetValues.UserDefdClassID = tblUserDefdSubclasses.UserDefdClassID)
+WHERE tblUserDefdClasses.ClassDesc = {0}
+AND tblUserDefdSubclasses.UserDefdSubClassName IN ({1})
@@ -2,6 +2,6 @@ SELECT
 tdi.TimeStep,{0}
 sum(tdi.DistArea) as [Area],
 sum(tdi.DistProduct) as [Product]
-from tblDistindicators tdi
+from tblDistindicators tdi{2}
 group by tdi.TimeStep{1}
 order by tdi.TimeStep{1}
\ No newline at end of file
@@ -43,6 +43,6 @@ sum(tfi.CoarseToAir) as [CoarseToAir],
 sum(tfi.FineToAir) as [FineToAir],
 sum(tfi.GrossGrowth_AG) as [GrossGrowth_AG],
 sum(tfi.GrossGrowth_BG) as [GrossGrowth_BG]
-from tblFluxIndicators tfi
+from tblFluxIndicators tfi{2}
 group by tfi.TimeStep{1}
 order by tfi.TimeStep{1}
\ No newline at end of file
@@ -48,6 +48,6 @@ sum(tpi.FastBG+tpi.Medium+tpi.SWStemSnag+tpi.SWBranchSnag
     +tpi.HWStemSnag+tpi.HWBranchSnag) as [Deadwood],
 sum(tpi.VFastAG+tpi.FastAG+tpi.SlowAG) as [Litter],
 sum(tpi.VFastBG+tpi.SlowBG+tpi.SlowBG+tpi.BlackCarbon) as [Soil C]
-from tblPoolIndicators tpi
+from tblPoolIndicators tpi{2}
 group by tpi.TimeStep{1}
 order by tpi.TimeStep{1}
\ No newline at end of file
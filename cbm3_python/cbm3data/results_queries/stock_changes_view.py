@@ -1,213 +1,354 @@
 import numpy as np
+import pandas as pd
+
+# the conditions under which a stock change is computed for a row of flux
+# indicators, and otherwise is 0
+_UNDISTURBED = "undisturbed"
+_DISTURBED = "disturbed"
+_N2O = "n2o"
+
+_GROSS_GROWTH = ["GrossGrowth_AG", "GrossGrowth_BG"]
+_BIO_EMISSIONS = ["BioCO2Emission", "BioCH4Emission", "BioCOEmission"]
+_DOM_EMISSIONS = ["DOMCO2Emission", "DOMCH4Emssion", "DOMCOEmission"]
+_PRODUCTION = ["SoftProduction", "HardProduction", "DOMProduction"]
+_DOM_TO_AIR = [
+    "VFastAGToAir",
+    "VFastBGToAir",
+    "FastAGToAir",
+    "FastBGToAir",
+    "MediumToAir",
+    "SlowAGToAir",
+    "SlowBGToAir",
+    "SWStemSnagToAir",
+    "SWBranchSnagToAir",
+    "HWStemSnagToAir",
+    "HWBranchSnagToAir",
+    "BlackCarbonToAir",
+    "PeatToAir",
+]
+_LITTER_INPUT = [
+    "MerchLitterInput",
+    "FolLitterInput",
+    "OthLitterInput",
+    "CoarseLitterInput",
+    "FineLitterInput",
+]
+
+# the stock change columns, in order, each defined as:
+#
+#   (name, added columns, subtracted columns, scale, condition)
+#
+# where the added and subtracted columns are flux indicator columns, or
+# previously defined stock change columns
+_STOCK_CHANGES = [
+    (
+        "Delta Total Ecosystem",
+        _GROSS_GROWTH,
+        _BIO_EMISSIONS + _DOM_EMISSIONS + _PRODUCTION,
+        1.0,
+        None,
+    ),
+    (
+        "Delta Total Biomass",
+        _GROSS_GROWTH,
+        _BIO_EMISSIONS + _PRODUCTION[:2] + ["BiomassToSoil"],
+        1.0,
+        None,
+    ),
+    (
+        "Delta Total DOM",
+        ["BiomassToSoil"],
+        ["DOMProduction"] + _DOM_EMISSIONS,
+        1.0,
+        None,
+    ),
+    ("Net Primary Productivity (NPP)", _GROSS_GROWTH, [], 1.0, _UNDISTURBED),
+    (
+        "Net Ecosystem Productivity (NEP)",
+        _GROSS_GROWTH,
+        _DOM_EMISSIONS,
+        1.0,
+        _UNDISTURBED,
+    ),
+    (
+        "Net Growth",
+        ["DeltaBiomass_AG", "DeltaBiomass_BG"],
+        [],
+        1.0,
+        _UNDISTURBED,
+    ),
+    ("Net Litterfall", ["DeltaDOM"], [], 1.0, _UNDISTURBED),
+    ("Total Litterfall", ["BiomassToSoil"], [], 1.0, _UNDISTURBED),
+    ("Decomposition Releases", _DOM_TO_AIR, [], 1.0, _UNDISTURBED),
+    (
+        "NetCO2emissions_removals_CO2e",
+        _GROSS_GROWTH,
+        ["DOMCO2Emission", "BioCO2Emission"] + _PRODUCTION,
+        -44 / 12,
+        None,
+    ),
+    ("SumofCOProduction_CO2e", ["COProduction"], [], 44 / 12, None),
+    ("SumofCH4Production_CO2e", ["CH4Production"], [], 16 / 12 * 25, None),
+    (
+        "N2O_CO2e",
+        ["CO2Production"],
+        [],
+        44 / 12 * 0.00017 * 298,
+        _N2O,
+    ),
+    ("ToFps_CO2e", _PRODUCTION, [], 44 / 12, None),
+    ("Total Harvest (Biomass + Snags)", _PRODUCTION, [], 1.0, None),
+    (
+        "Net forest-atmosphere exchange_CO2e",
+        [
+            "NetCO2emissions_removals_CO2e",
+            "SumofCOProduction_CO2e",
+            "SumofCH4Production_CO2e",
+            "N2O_CO2e",
+        ],
+        ["ToFps_CO2e"],
+        1.0,
+        None,
+    ),
+    (
+        "Net forest-atmosphere exchange_C",
+        [],
+        ["Delta Total Ecosystem", "Total Harvest (Biomass + Snags)"],
+        1.0,
+        None,
+    ),
+    ("Total Harvest (Biomass)", _PRODUCTION[:2], [], 1.0, None),
+    ("Total Harvest (Snags)", ["DOMProduction"], [], 1.0, None),
+    ("Softwood Harvest (Biomass)", ["SoftProduction"], [], 1.0, None),
+    ("Hardwood Harvest (Biomass)", ["HardProduction"], [], 1.0, None),
+    (
+        "Deadwood",
+        [
+            "FastBGToAir",
+            "MediumToAir",
+            "SWStemSnagToAir",
+            "SWBranchSnagToAir",
+            "HWStemSnagToAir",
+            "HWBranchSnagToAir",
+        ],
+        [],
+        1.0,
+        None,
+    ),
+    (
+        "Litter",
+        ["FastAGToAir", "VFastAGToAir", "SlowAGToAir"],
+        [],
+        1.0,
+        None,
+    ),
+    (
+        "Soil C",
+        ["VFastBGToAir", "SlowBGToAir", "BlackCarbonToAir"],
+        [],
+        1.0,
+        None,
+    ),
+    ("Aboveground Very Fast DOM Emissions", ["VFastBGToAir"], [], 1.0, None),
+    ("Belowground Very Fast DOM Emissions", ["VFastAGToAir"], [], 1.0, None),
+    ("Aboveground Fast DOM Emissions", ["FastAGToAir"], [], 1.0, None),
+    ("Belowground Fast DOM Emissions", ["FastBGToAir"], [], 1.0, None),
+    ("Medium DOM Emissions", ["MediumToAir"], [], 1.0, None),
+    ("Aboveground Slow DOM Emissions", ["SlowAGToAir"], [], 1.0, None),
+    ("Belowground Slow DOM Emissions", ["SlowBGToAir"], [], 1.0, None),
+    ("Softwood Stem Snag Emissions", ["SWStemSnagToAir"], [], 1.0, None),
+    ("Softwood Branch Snag Emissions", ["SWBranchSnagToAir"], [], 1.0, None),
+    ("Hardwood Stem Snag Emissions", ["HWStemSnagToAir"], [], 1.0, None),
+    ("Hardwood Branch Snag Emissions", ["HWBranchSnagToAir"], [], 1.0, None),
+    ("Black Carbon Emissions", ["BlackCarbonToAir"], [], 1.0, None),
+    ("Peat Emissions", ["PeatToAir"], [], 1.0, None),
+    ("Biomass To DOM", _LITTER_INPUT, [], 1.0, None),
+    ("Merchantable To DOM", ["MerchLitterInput"], [], 1.0, None),
+    ("Foliage To DOM", ["FolLitterInput"], [], 1.0, None),
+    ("Other To DOM", ["OthLitterInput"], [], 1.0, None),
+    ("Coarse Root To DOM", ["CoarseLitterInput"], [], 1.0, None),
+    ("Fine Root To DOM", ["FineLitterInput"], [], 1.0, None),
+    ("Total Emissions", _BIO_EMISSIONS + _DOM_EMISSIONS, [], 1.0, None),
+    ("Total Biomass Emissions", _BIO_EMISSIONS, [], 1.0, None),
+    ("Total DOM Emissions", _DOM_EMISSIONS, [], 1.0, None),
+    (
+        "Total CO2 Emissions",
+        ["BioCO2Emission", "DOMCO2Emission"],
+        [],
+        1.0,
+        None,
+    ),
+    ("Total CO Emissions", ["BioCOEmission", "DOMCOEmission"], [], 1.0, None),
+    (
+        "Total CH4 Emissions",
+        ["BioCH4Emission", "DOMCH4Emssion"],
+        [],
+        1.0,
+        None,
+    ),
+    ("Bio CO2 Emissions", ["BioCO2Emission"], [], 1.0, None),
+    ("Bio CO Emissions", ["BioCOEmission"], [], 1.0, None),
+    ("Bio CH4 Emissions", ["BioCH4Emission"], [], 1.0, None),
+    ("DOM CO2 Emissions", ["DOMCO2Emission"], [], 1.0, None),
+    ("DOM CO Emissions", ["DOMCOEmission"], [], 1.0, None),
+    ("DOM CH4 Emissions", ["DOMCH4Emssion"], [], 1.0, None),
+    (
+        "Disturbance Losses",
+        _BIO_EMISSIONS + _DOM_EMISSIONS + _PRODUCTION,
+        [],
+        1.0,
+        _DISTURBED,
+    ),
+    ("Bio To Soil from Disturbances", ["BiomassToSoil"], [], 1.0, _DISTURBED),
+    (
+        "Net Biome Productivity (NBP)",
+        _GROSS_GROWTH,
+        _BIO_EMISSIONS + _DOM_EMISSIONS + _PRODUCTION,
+        1.0,
+        None,
+    ),
+]
+
+
+def get_stock_changes_columns():
+    """Get the names of the stock change columns computed from the flux
+    indicators
+
+    Returns:
+        list: the column names
+    """
+    return [name for name, _, _, _, _ in _STOCK_CHANGES]
+
+
+def _allocate(n_rows):
+    # column major, so that each stock change column is contiguous, and
+    # the array is the single block of a dataframe without a copy
+    return np.empty((n_rows, len(_STOCK_CHANGES)), order="F")
+
+
+def _compute_stock_changes(tfi, out):
+    """Compute the stock change columns of the specified flux indicators
+    into the specified array of (rows, stock change columns), accumulating
+    each column in place so that no temporary arrays are allocated.
+    """
+    flux_values = {}
+    column_index = {}
+
+    def get_values(name):
+        if name in column_index:
+            return out[:, column_index[name]]
+        if name not in flux_values:
+            flux_values[name] = tfi[name].to_numpy(dtype="float64")
+        return flux_values[name]
+
+    dist_type_id = tfi["DistTypeID"].to_numpy()
+    undisturbed = dist_type_id == 0
+    excluded = {
+        _UNDISTURBED: ~undisturbed,
+        _DISTURBED: undisturbed,
+        _N2O: undisturbed
+        | (tfi["CH4Production"].to_numpy(dtype="float64") == 0.0),
+    }
+    for i_column, (name, added, subtracted, scale, condition) in enumerate(
+        _STOCK_CHANGES
+    ):
+        column = out[:, i_column]
+        if added:
+            np.copyto(column, get_values(added[0]))
+            for added_name in added[1:]:
+                np.add(column, get_values(added_name), out=column)
+        else:
+            column.fill(0.0)
+        for subtracted_name in subtracted:
+            np.subtract(column, get_values(subtracted_name), out=column)
+        if scale != 1.0:
+            np.multiply(column, scale, out=column)
+        if condition:
+            np.copyto(column, 0.0, where=excluded[condition])
+        column_index[name] = i_column
+    return out
 
 
 def get_stock_changes_view(tfi):
     df = tfi.iloc[
         :, 0 : tfi.columns.get_loc("CO2Production")  # noqa E203
     ].copy()
-
-    df["Delta Total Ecosystem"] = (
-        tfi.GrossGrowth_AG
-        + tfi.GrossGrowth_BG
-        - (
-            tfi.BioCO2Emission
-            + tfi.BioCH4Emission
-            + tfi.BioCOEmission
-            + tfi.DOMCO2Emission
-            + tfi.DOMCH4Emssion
-            + tfi.DOMCOEmission
-            + tfi.SoftProduction
-            + tfi.HardProduction
-            + tfi.DOMProduction
-        )
-    )
-    df["Delta Total Biomass"] = (
-        tfi.GrossGrowth_AG
-        + tfi.GrossGrowth_BG
-        - (
-            tfi.BioCO2Emission
-            + tfi.BioCH4Emission
-            + tfi.BioCOEmission
-            + tfi.SoftProduction
-            + tfi.HardProduction
-            + tfi.BiomassToSoil
-        )
-    )
-    df["Delta Total DOM"] = (
-        tfi.BiomassToSoil - (
-            tfi.DOMProduction
-            + tfi.DOMCO2Emission
-            + tfi.DOMCH4Emssion
-            + tfi.DOMCOEmission
-        )
-    )
-    df["Net Primary Productivity (NPP)"] = np.where(
-        tfi.DistTypeID == 0, tfi.GrossGrowth_AG + tfi.GrossGrowth_BG, 0.0
-    )
-    df["Net Ecosystem Productivity (NEP)"] = np.where(
-        tfi.DistTypeID == 0,
-        tfi.GrossGrowth_AG
-        + tfi.GrossGrowth_BG
-        - (tfi.DOMCO2Emission + tfi.DOMCH4Emssion + tfi.DOMCOEmission),
-        0.0,
-    )
-    df["Net Growth"] = np.where(
-        tfi.DistTypeID == 0, tfi.DeltaBiomass_AG + tfi.DeltaBiomass_BG, 0.0
-    )
-    df["Net Litterfall"] = np.where(tfi.DistTypeID == 0, tfi.DeltaDOM, 0.0)
-    df["Total Litterfall"] = np.where(
-        tfi.DistTypeID == 0, tfi.BiomassToSoil, 0.0
-    )
-    df["Decomposition Releases"] = np.where(
-        tfi.DistTypeID == 0,
-        (
-            tfi.VFastAGToAir
-            + tfi.VFastBGToAir
-            + tfi.FastAGToAir
-            + tfi.FastBGToAir
-            + tfi.MediumToAir
-            + tfi.SlowAGToAir
-            + tfi.SlowBGToAir
-            + tfi.SWStemSnagToAir
-            + tfi.SWBranchSnagToAir
-            + tfi.HWStemSnagToAir
-            + tfi.HWBranchSnagToAir
-            + tfi.BlackCarbonToAir
-            + tfi.PeatToAir
-        ),
-        0.0,
-    )
-    df["NetCO2emissions_removals_CO2e"] = (
-        tfi.GrossGrowth_AG
-        + tfi.GrossGrowth_BG
-        - tfi.DOMCO2Emission
-        - tfi.BioCO2Emission
-        - tfi.SoftProduction
-        - tfi.HardProduction
-        - tfi.DOMProduction
-    ) * (-44 / 12)
-
-    df["SumofCOProduction_CO2e"] = tfi.COProduction * 44 / 12
-    df["SumofCH4Production_CO2e"] = tfi.CH4Production * 16 / 12 * 25
-    df["N2O_CO2e"] = np.where(
-        (tfi.CH4Production != 0.0) & (tfi.DistTypeID != 0),
-        tfi.CO2Production * 44 / 12 * 0.00017 * 298,
-        0.0,
-    )
-    df["ToFps_CO2e"] = (
-        (tfi.SoftProduction + tfi.HardProduction + tfi.DOMProduction) * 44 / 12
+    stock_changes = pd.DataFrame(
+        _compute_stock_changes(tfi, _allocate(len(tfi.index))),
+        index=df.index,
+        columns=get_stock_changes_columns(),
+        copy=False,
     )
+    return pd.concat([df, stock_changes], axis=1)
 
-    df["Total Harvest (Biomass + Snags)"] = (
-        tfi.SoftProduction + tfi.HardProduction + tfi.DOMProduction
-    )
 
-    df["Net forest-atmosphere exchange_CO2e"] = (
-        df["NetCO2emissions_removals_CO2e"]
-        - df["ToFps_CO2e"]
-        + df["SumofCOProduction_CO2e"]
-        + df["SumofCH4Production_CO2e"]
-        + df["N2O_CO2e"]
-    )
+def iter_stock_changes(flux_chunks):
+    """Compute the stock changes of each of the specified chunks of flux
+    indicators, so that the stock changes of a large number of flux
+    indicator rows can be processed in bounded memory.
 
-    df["Net forest-atmosphere exchange_C"] = (
-        -df["Delta Total Ecosystem"] - df["Total Harvest (Biomass + Snags)"]
-    )
+    The chunks may be, for example, the chunks of a results database query,
+    such as::
 
-    df["Total Harvest (Biomass)"] = tfi.SoftProduction + tfi.HardProduction
-    df["Total Harvest (Snags)"] = tfi.DOMProduction
-    df["Softwood Harvest (Biomass)"] = tfi.SoftProduction
-    df["Hardwood Harvest (Biomass)"] = tfi.HardProduction
-    df["Deadwood"] = (
-        tfi.FastBGToAir
-        + tfi.MediumToAir
-        + tfi.SWStemSnagToAir
-        + tfi.SWBranchSnagToAir
-        + tfi.HWStemSnagToAir
-        + tfi.HWBranchSnagToAir
-    )
-    df["Litter"] = tfi.FastAGToAir + tfi.VFastAGToAir + tfi.SlowAGToAir
-    df["Soil C"] = tfi.VFastBGToAir + tfi.SlowBGToAir + tfi.BlackCarbonToAir
-    df["Aboveground Very Fast DOM Emissions"] = tfi.VFastBGToAir
-    df["Belowground Very Fast DOM Emissions"] = tfi.VFastAGToAir
-    df["Aboveground Fast DOM Emissions"] = tfi.FastAGToAir
-    df["Belowground Fast DOM Emissions"] = tfi.FastBGToAir
-    df["Medium DOM Emissions"] = tfi.MediumToAir
-    df["Aboveground Slow DOM Emissions"] = tfi.SlowAGToAir
-    df["Belowground Slow DOM Emissions"] = tfi.SlowBGToAir
-    df["Softwood Stem Snag Emissions"] = tfi.SWStemSnagToAir
-    df["Softwood Branch Snag Emissions"] = tfi.SWBranchSnagToAir
-    df["Hardwood Stem Snag Emissions"] = tfi.HWStemSnagToAir
-    df["Hardwood Branch Snag Emissions"] = tfi.HWBranchSnagToAir
-    df["Black Carbon Emissions"] = tfi.BlackCarbonToAir
-    df["Peat Emissions"] = tfi.PeatToAir
-    df["Biomass To DOM"] = (
-        tfi.MerchLitterInput
-        + tfi.FolLitterInput
-        + tfi.OthLitterInput
-        + tfi.CoarseLitterInput
-        + tfi.FineLitterInput
-    )
-    df["Merchantable To DOM"] = tfi.MerchLitterInput
-    df["Foliage To DOM"] = tfi.FolLitterInput
-    df["Other To DOM"] = tfi.OthLitterInput
-    df["Coarse Root To DOM"] = tfi.CoarseLitterInput
-    df["Fine Root To DOM"] = tfi.FineLitterInput
-    df["Total Emissions"] = (
-        tfi.BioCO2Emission
-        + tfi.BioCH4Emission
-        + tfi.BioCOEmission
-        + tfi.DOMCO2Emission
-        + tfi.DOMCH4Emssion
-        + tfi.DOMCOEmission
-    )
-    df["Total Biomass Emissions"] = (
-        tfi.BioCO2Emission + tfi.BioCH4Emission + tfi.BioCOEmission
-    )
-    df["Total DOM Emissions"] = (
-        tfi.DOMCO2Emission + tfi.DOMCH4Emssion + tfi.DOMCOEmission
-    )
-    df["Total CO2 Emissions"] = tfi.BioCO2Emission + tfi.DOMCO2Emission
-    df["Total CO Emissions"] = tfi.BioCOEmission + tfi.DOMCOEmission
-    df["Total CH4 Emissions"] = tfi.BioCH4Emission + tfi.DOMCH4Emssion
-    df["Bio CO2 Emissions"] = tfi.BioCO2Emission
-    df["Bio CO Emissions"] = tfi.BioCOEmission
-    df["Bio CH4 Emissions"] = tfi.BioCH4Emission
-    df["DOM CO2 Emissions"] = tfi.DOMCO2Emission
-    df["DOM CO Emissions"] = tfi.DOMCOEmission
-    df["DOM CH4 Emissions"] = tfi.DOMCH4Emssion
-    df["Disturbance Losses"] = np.where(
-        tfi.DistTypeID != 0,
-        (
-            tfi.BioCO2Emission
-            + tfi.BioCH4Emission
-            + tfi.BioCOEmission
-            + tfi.DOMCO2Emission
-            + tfi.DOMCH4Emssion
-            + tfi.DOMCOEmission
-            + tfi.SoftProduction
-            + tfi.HardProduction
-            + tfi.DOMProduction
-        ),
-        0.0,
-    )
-    df["Bio To Soil from Disturbances"] = np.where(
-        tfi.DistTypeID != 0, tfi.BiomassToSoil, 0.0
-    )
-    df["Net Biome Productivity (NBP)"] = (
-        tfi.GrossGrowth_AG
-        + tfi.GrossGrowth_BG
-        - (
-            tfi.BioCO2Emission
-            + tfi.BioCH4Emission
-            + tfi.BioCOEmission
-            + tfi.DOMCO2Emission
-            + tfi.DOMCH4Emssion
-            + tfi.DOMCOEmission
-            + tfi.SoftProduction
-            + tfi.HardProduction
-            + tfi.DOMProduction
+        pandas.read_sql(
+            "SELECT * FROM tblFluxIndicators", connection, chunksize=100000
         )
-    )
 
-    return df
+    or the chunks of CBM output files read by
+    :py:func:`cbm3_output_files_loader.iter_flux_indicators`.
+
+    Args:
+        flux_chunks (iterable): an iterable of pandas.DataFrame with the
+            columns of tblFluxIndicators, or of a flux indicators query
+            stratified by disturbance type
+
+    Yields:
+        pandas.DataFrame: the stock changes of each chunk. See
+            :py:func:`get_stock_changes_view`
+    """
+    for tfi in flux_chunks:
+        yield get_stock_changes_view(tfi)
+
+
+def aggregate_stock_changes(flux_chunks, by=("TimeStep", "DistTypeID")):
+    """Compute the stock changes of the specified chunks of flux indicators,
+    and sum them by the specified columns across all chunks. Only one
+    chunk and the aggregate are held in memory at any time, and the output
+    array of the stock change columns is re-used across chunks.
+
+    Args:
+        flux_chunks (iterable): an iterable of pandas.DataFrame with the
+            columns of tblFluxIndicators. See :py:func:`iter_stock_changes`
+        by (list, optional): the flux indicator columns by which the stock
+            changes are summed. Defaults to ("TimeStep", "DistTypeID").
+
+    Returns:
+        pandas.DataFrame: the summed stock changes, sorted by the by
+            columns, or None if there are no chunks
+    """
+    by = list(by)
+    columns = get_stock_changes_columns()
+    out = None
+    result = None
+    for tfi in flux_chunks:
+        n_rows = len(tfi.index)
+        if out is None or out.shape[0] < n_rows:
+            out = _allocate(n_rows)
+        stock_changes = pd.DataFrame(
+            _compute_stock_changes(tfi, out[:n_rows]), columns=columns
+        )
+        for column in by:
+            stock_changes[column] = tfi[column].to_numpy()
+        chunk_result = stock_changes.groupby(by, dropna=False)[columns].sum()
+        if result is None:
+            result = chunk_result
+        else:
+            # re-grouped rather than aligned by index, since the by columns
+            # may have null values
+            merged = pd.concat([result, chunk_result])
+            result = merged.groupby(
+                level=list(range(merged.index.nlevels)), dropna=False
+            ).sum()
+    if result is None:
+        return None
+    return result.sort_index().reset_index()
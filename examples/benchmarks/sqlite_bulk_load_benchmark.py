@@ -0,0 +1,119 @@
+"""Compare the throughput of the default and the sqlite bulk load paths of
+CBMResultsDBWriter, each with and without deferred constraints, by writing
+a synthetic tblPoolIndicators table in chunks to an SQLite database file.
+The timings include finalizing the tables when the writer is closed.
+
+usage:
+
+    python sqlite_bulk_load_benchmark.py [--rows 1000000] [--chunksize 100000]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from cbm3_python.cbm3data import cbm3_results_db_schema
+from cbm3_python.cbm3data.cbm3_results_db_writer import CBMResultsDBWriter
+
+POOL_COLUMNS = [
+    "SW_Merch",
+    "SW_Foliage",
+    "SW_Other",
+    "SW_Coarse",
+    "SW_Fine",
+    "HW_Merch",
+    "HW_Foliage",
+    "HW_Other",
+    "HW_Coarse",
+    "HW_Fine",
+    "VeryFastCAG",
+    "VeryFastCBG",
+    "FastCAG",
+    "FastCBG",
+    "Medium",
+]
+
+
+def write_metadata(writer):
+    writer.write("tblSPU", pd.DataFrame({"SPUID": [1, 2, 3]}))
+    writer.write(
+        "tblUserDefdClassSets",
+        pd.DataFrame({"UserDefdClassSetID": range(1, 51), "Name": ""}),
+    )
+    writer.write(
+        "tblUNFCCCLandClass", pd.DataFrame({"UNFCCCLandClassID": [0, 1, 2]})
+    )
+    writer.write("tblKP3334Flags", pd.DataFrame({"KP3334ID": [0, 1, 2]}))
+
+
+def create_chunk(rng, index_offset, n_rows):
+    df = pd.DataFrame(
+        {
+            "PoolIndID": np.arange(n_rows) + index_offset + 1,
+            "TimeStep": rng.integers(0, 201, n_rows),
+            "SPUID": rng.integers(1, 4, n_rows),
+            "UserDefdClassSetID": rng.integers(1, 51, n_rows),
+            "LandClassID": rng.integers(0, 3, n_rows),
+            "kf2": rng.integers(0, 3, n_rows),
+            "kf3": 0,
+            "kf4": 0,
+            "kf5": 0,
+            "kf6": 0,
+        }
+    )
+    for column in POOL_COLUMNS:
+        df[column] = rng.random(n_rows) * 100
+    return df
+
+
+def run(db_path, n_rows, chunksize, sqlite_bulk_load, deferred_constraints):
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    with CBMResultsDBWriter(
+        f"sqlite:///{db_path}",
+        cbm3_results_db_schema.get_constraints(),
+        sqlite_bulk_load=sqlite_bulk_load,
+        deferred_constraints=deferred_constraints,
+    ) as writer:
+        write_metadata(writer)
+        for index_offset in range(0, n_rows, chunksize):
+            writer.write(
+                "tblPoolIndicators",
+                create_chunk(
+                    rng, index_offset, min(chunksize, n_rows - index_offset)
+                ),
+            )
+    # includes the creation of the deferred indexes, and the foreign key
+    # check of deferred constraints, on close
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunksize", type=int, default=100000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, sqlite_bulk_load, deferred_constraints in [
+            ("to_sql", False, False),
+            ("to_sql deferred", False, True),
+            ("bulk", True, False),
+            ("bulk deferred", True, True),
+        ]:
+            seconds = run(
+                os.path.join(temp_dir, f"{name}.db"),
+                args.rows,
+                args.chunksize,
+                sqlite_bulk_load,
+                deferred_constraints,
+            )
+            print(
+                f"{name}: {args.rows} rows in {seconds:.2f}s "
+                f"({args.rows / seconds:.0f} rows/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
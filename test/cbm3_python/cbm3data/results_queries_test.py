@@ -0,0 +1,239 @@
+import re
+import sqlite3
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from cbm3_python.cbm3data import cbm3_results
+from cbm3_python.cbm3data import results_queries
+from cbm3_python.cbm3data.cbm3_results import CBM3Results
+
+
+def _create_results_db(con):
+    # a minimal results database with a single spatial unit and the
+    # classifier sets 1: (Species: "Black Spruce") and 2: (Species:
+    # "Jack's Pine")
+    flux_columns = sorted(
+        set(
+            re.findall(
+                r"tfi\.(\w+)", results_queries.get_flux_indicators_view()
+            )
+        )
+        - {"TimeStep"}
+    )
+    flux_indicators = pd.DataFrame(
+        {
+            "TimeStep": [1, 1, 2, 2, 3],
+            "DistTypeID": [0, 1, 0, 2, 0],
+            "SPUID": 1,
+            "UserDefdClassSetID": [1, 2, 1, 2, 1],
+            "LandClassID": [0, 0, 0, 1, 0],
+            "kf2": 0,
+            "kf3": 0,
+            "kf4": 0,
+            "kf5": 0,
+            "kf6": 0,
+        }
+    )
+    for column in flux_columns:
+        flux_indicators[column] = 1.0
+    flux_indicators.to_sql("tblFluxIndicators", con, index=False)
+    pd.DataFrame({"UserDefdClassID": [1], "ClassDesc": ["Species"]}).to_sql(
+        "tblUserDefdClasses", con, index=False
+    )
+    pd.DataFrame(
+        {
+            "UserDefdClassID": [1, 1],
+            "UserDefdSubclassID": [1, 2],
+            "UserDefdSubClassName": ["Black Spruce", "Jack's Pine"],
+        }
+    ).to_sql("tblUserDefdSubclasses", con, index=False)
+    pd.DataFrame(
+        {
+            "UserDefdClassSetID": [1, 2],
+            "UserDefdClassID": [1, 1],
+            "UserDefdSubclassID": [1, 2],
+        }
+    ).to_sql("tblUserDefdClassSetValues", con, index=False)
+    return flux_indicators
+
+
+class ResultsQueriesTest(unittest.TestCase):
+    def test_build_filter_no_filters(self):
+        self.assertEqual(results_queries.build_filter("t"), [])
+
+    def test_build_filter_timestep_range(self):
+        self.assertEqual(
+            results_queries.build_filter("t", timestep_range=(1, 5)),
+            ["t.TimeStep >= 1", "t.TimeStep <= 5"],
+        )
+        self.assertEqual(
+            results_queries.build_filter("t", timestep_range=(None, 5)),
+            ["t.TimeStep <= 5"],
+        )
+        self.assertEqual(
+            results_queries.build_filter("t", timestep_range=(2, None)),
+            ["t.TimeStep >= 2"],
+        )
+
+    def test_build_filter_ids(self):
+        self.assertEqual(
+            results_queries.build_filter(
+                "t",
+                spatial_unit_ids=[1, np.int64(2)],
+                disturbance_type_ids=[3],
+                land_class_ids=[0],
+            ),
+            [
+                "t.SPUID IN (1,2)",
+                "t.DistTypeID IN (3)",
+                "t.LandClassID IN (0)",
+            ],
+        )
+
+    def test_build_filter_empty_lists(self):
+        # an empty list matches no rows
+        for filters in [
+            dict(spatial_unit_ids=[]),
+            dict(disturbance_type_ids=[]),
+            dict(land_class_ids=[]),
+            dict(classifier_values={"Species": []}),
+        ]:
+            self.assertEqual(
+                results_queries.build_filter("t", **filters), ["1 = 0"]
+            )
+
+    def test_build_filter_classifier_values(self):
+        conditions = results_queries.build_filter(
+            "t",
+            classifier_values={
+                "Species": ["Black Spruce", "Jack's Pine"],
+                "Region": ["North"],
+            },
+        )
+        self.assertEqual(len(conditions), 2)
+        self.assertTrue(conditions[0].startswith("t.UserDefdClassSetID IN ("))
+        # string literals are quoted, with embedded quotes escaped
+        self.assertIn("ClassDesc = 'Species'", conditions[0])
+        self.assertIn("IN ('Black Spruce','Jack''s Pine')", conditions[0])
+        self.assertIn("ClassDesc = 'Region'", conditions[1])
+        self.assertIn("IN ('North')", conditions[1])
+
+    def test_get_formatted_query(self):
+        sql = results_queries.get_flux_indicators_view(
+            disturbance_type_grouping=True,
+            filters=dict(timestep_range=(1, 2), disturbance_type_ids=[1]),
+        )
+        self.assertIn(
+            "from tblFluxIndicators tfi\nwhere tfi.TimeStep >= 1\n"
+            "and tfi.TimeStep <= 2\nand tfi.DistTypeID IN (1)\n"
+            "group by tfi.TimeStep,tfi.DistTypeID\n",
+            sql,
+        )
+        for filters in [None, dict(timestep_range=None)]:
+            self.assertNotIn(
+                "where",
+                results_queries.get_flux_indicators_view(filters=filters),
+            )
+
+    def test_filtered_queries(self):
+        with sqlite3.connect(":memory:") as con:
+            flux_indicators = _create_results_db(con)
+            none = flux_indicators.TimeStep < 0
+            for filters, is_included in [
+                (
+                    dict(classifier_values={"Species": ["Jack's Pine"]}),
+                    flux_indicators.UserDefdClassSetID == 2,
+                ),
+                (
+                    dict(
+                        classifier_values={
+                            "Species": ["Black Spruce", "Jack's Pine"]
+                        }
+                    ),
+                    flux_indicators.UserDefdClassSetID.isin([1, 2]),
+                ),
+                (
+                    dict(disturbance_type_ids=[1, 2]),
+                    flux_indicators.DistTypeID.isin([1, 2]),
+                ),
+                (
+                    dict(land_class_ids=[1]),
+                    flux_indicators.LandClassID == 1,
+                ),
+                (
+                    dict(
+                        timestep_range=(2, None),
+                        classifier_values={"Species": ["Black Spruce"]},
+                    ),
+                    (flux_indicators.TimeStep >= 2)
+                    & (flux_indicators.UserDefdClassSetID == 1),
+                ),
+                (dict(spatial_unit_ids=[]), none),
+                (dict(classifier_values={"Species": []}), none),
+                (dict(classifier_values={"Species": ["Fir"]}), none),
+            ]:
+                result = pd.read_sql(
+                    results_queries.get_flux_indicators_view(
+                        disturbance_type_grouping=True, filters=filters
+                    ),
+                    con,
+                )
+                expected = (
+                    flux_indicators[is_included]
+                    .groupby(["TimeStep", "DistTypeID"], as_index=False)
+                    .CO2Production.sum()
+                )
+                pd.testing.assert_frame_equal(
+                    expected,
+                    result[expected.columns],
+                    check_dtype=False,
+                )
+        con.close()
+
+    def test_filters_use_covering_rollup_tables(self):
+        rollups = pd.DataFrame(
+            {
+                "TableName": "tblFluxIndicators",
+                "RollupTableName": [
+                    "tblFluxIndicatorsRollup_DT",
+                    "tblFluxIndicatorsRollup_SPU",
+                    "tblFluxIndicatorsRollup_DT_SPU",
+                ],
+                "GroupingNames": [
+                    "disturbance_type",
+                    "spatial_unit",
+                    "disturbance_type,spatial_unit",
+                ],
+            }
+        )
+        # the rolled up table of each query: a rollup table must include
+        # the columns of the filters as well as those of the grouping
+        for filters, table_name in [
+            (dict(), "tblFluxIndicatorsRollup_DT"),
+            (dict(timestep_range=(1, 5)), "tblFluxIndicatorsRollup_DT"),
+            (
+                dict(spatial_unit_ids=[1]),
+                "tblFluxIndicatorsRollup_DT_SPU",
+            ),
+            (
+                dict(classifier_values={"Species": ["Black Spruce"]}),
+                "tblFluxIndicators",
+            ),
+            (dict(land_class_ids=[]), "tblFluxIndicators"),
+        ]:
+            results = CBM3Results(None)
+            queries = []
+            with patch.object(
+                CBM3Results, "get_rollups", return_value=rollups
+            ), patch.object(
+                CBM3Results,
+                "load_df",
+                side_effect=lambda sql: (
+                    queries.append(sql) or pd.DataFrame({"DistTypeID": []})
+                ),
+            ):
+                cbm3_results.load_flux_indicators(
+                    results, disturbance_type_grouping=True, **filters
+                )
+            self.assertRegex(queries[0], rf"from {table_name} tfi\b")
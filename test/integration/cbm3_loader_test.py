@@ -1,10 +1,27 @@
 import os
+import signal
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
 import unittest
 import sqlite3
+import sqlalchemy
+from unittest.mock import patch
+from concurrent.futures.process import BrokenProcessPool
 from cbm3_python.cbm3data import cbm3_results
 from cbm3_python.cbm3data import cbm3_output_loader
+from cbm3_python.cbm3data import cbm3_output_loader_checkpoint
+from cbm3_python.cbm3data import cbm3_results_file_writer
+from cbm3_python.cbm3data import cbm3_results_duckdb_writer
+from cbm3_python.cbm3data import cbm3_results_db_schema
+from cbm3_python.cbm3data import cbm3_output_files
+from cbm3_python.cbm3data import cbm3_output_files_loader
+from cbm3_python.cbm3data import cbm3_output_descriptions
+from cbm3_python.cbm3data.results_queries import stock_changes_view
+from cbm3_python.cbm3data.cbm3_results_file_writer import CBM3ResultsFileWriter
+from cbm3_python.cbm3data.cbm3_results_db_writer import CBMResultsDBWriter
+from cbm3_python.cbm3data.cbm3_results_multi_run import MultiRunDBWriter
 from test.integration import import_run_helper
 
 
@@ -149,3 +166,1321 @@ class CBMOutputLoaderTest(unittest.TestCase):
                 os.path.join(csv2_path, "tblFluxIndicators.csv")
             )
             self.assertTrue(csv1_result.equals(csv2_result))
+
+    def test_load_deferred_descriptions_files(self):
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            csv_path = os.path.join(sim.tempdir, "csv")
+            deferred_path = os.path.join(sim.tempdir, "deferred")
+
+            for output_path, deferred in [
+                (csv_path, False),
+                (deferred_path, True),
+            ]:
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": output_path,
+                        "chunksize": 13,
+                        "deferred_descriptions": deferred,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+
+            # only the fact and dimension tables are written
+            written = set(os.listdir(deferred_path))
+            self.assertIn("tblFluxIndicators.csv", written)
+            self.assertIn("dimSpatialUnit.csv", written)
+            for metadata_table in ["tblAgeClasses", "tblSPU", "tblRandomSeed"]:
+                self.assertNotIn(f"{metadata_table}.csv", written)
+
+            expected = pd.read_csv(
+                os.path.join(csv_path, "tblFluxIndicators.csv")
+            )
+            result = cbm3_output_loader.read_descriptive_table(
+                deferred_path, "tblFluxIndicators"
+            )
+            self.assertTrue(list(expected.columns) == list(result.columns))
+            self.assertTrue(
+                np.allclose(
+                    expected.sort_values("FluxIndicatorID").CO2Production,
+                    result.sort_values("FluxIndicatorID").CO2Production,
+                )
+            )
+
+            for format in ["parquet", "arrow"]:
+                format_path = os.path.join(sim.tempdir, f"deferred_{format}")
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": format,
+                        "output_path": format_path,
+                        "chunksize": 13,
+                        "deferred_descriptions": True,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                result = pd.concat(
+                    cbm3_output_loader.read_descriptive_table(
+                        format_path,
+                        "tblFluxIndicators",
+                        chunksize=7,
+                        format=format,
+                    )
+                )
+                self.assertEqual(list(expected.columns), list(result.columns))
+                self.assertTrue(
+                    np.allclose(
+                        expected.sort_values("FluxIndicatorID").CO2Production,
+                        result.sort_values("FluxIndicatorID").CO2Production,
+                    )
+                )
+
+    def test_metadata_snapshot_cache(self):
+        with import_run_helper.simulate() as sim:
+            cache_dir = os.path.join(sim.tempdir, "metadata_cache")
+
+            def load():
+                return cbm3_output_descriptions.load_project_level_data(
+                    sim.project_path, cache_dir
+                )
+
+            with patch.object(
+                cbm3_output_descriptions,
+                "_load_project_level_data",
+                wraps=cbm3_output_descriptions._load_project_level_data,
+            ) as load_project_level_data:
+                expected = load()
+                cached = load()
+                # the snapshot of the unchanged database is used
+                self.assertEqual(load_project_level_data.call_count, 1)
+                self.assertEqual(
+                    list(expected.__dict__.keys()),
+                    list(cached.__dict__.keys()),
+                )
+                for name, df in expected.__dict__.items():
+                    pd.testing.assert_frame_equal(
+                        df.reset_index(drop=True), getattr(cached, name)
+                    )
+
+                # the database is queried again once its modification time
+                # changes
+                stat = os.stat(sim.project_path)
+                modified_ns = stat.st_mtime_ns + 10**9
+                os.utime(sim.project_path, ns=(stat.st_atime_ns, modified_ns))
+                load()
+                self.assertEqual(load_project_level_data.call_count, 2)
+
+            # or once its size changes. The padded database is not queried
+            with open(sim.project_path, "ab") as project_file:
+                project_file.write(b"\0")
+            os.utime(sim.project_path, ns=(stat.st_atime_ns, modified_ns))
+            with patch.object(
+                cbm3_output_descriptions,
+                "_load_project_level_data",
+                return_value=expected,
+            ) as load_project_level_data:
+                load()
+                self.assertEqual(load_project_level_data.call_count, 1)
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+    def test_load_concurrent_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            results = []
+            for name, max_workers in [("sequential", None), ("concurrent", 2)]:
+                output_sqlite = os.path.join(sim.tempdir, f"{name}.db")
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{output_sqlite}",
+                        "chunksize": 5,
+                        "max_workers": max_workers,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                with sqlite3.connect(output_sqlite) as sqlite_con:
+                    results.append(
+                        cbm3_results.load_stock_changes(
+                            sqlite_con, True, True, True, True, False
+                        )
+                    )
+                sqlite_con.close()
+            self.assertTrue(results[0].equals(results[1]))
+
+    def test_load_concurrent_worker_error(self):
+        with import_run_helper.simulate() as sim:
+            cbm_run_dir = os.path.join(sim.tempdir, "CBMRun")
+            shutil.copytree(
+                os.path.join(sim.tempfiles_dir, "CBMRun"), cbm_run_dir
+            )
+            os.remove(os.path.join(cbm_run_dir, "output", "fluxind.out"))
+            with self.assertRaises(FileNotFoundError):
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": os.path.join(sim.tempdir, "csv"),
+                        "chunksize": 5,
+                        "max_workers": 2,
+                    },
+                    cbm_output_dir=os.path.join(cbm_run_dir, "output"),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+
+    def test_load_concurrent_worker_terminated(self):
+        killed_pids = set()
+
+        def kill_worker(record):
+            # terminate the first worker process to record metrics, as
+            # when killed by the operating system for lack of memory
+            if record["pid"] != os.getpid() and not killed_pids:
+                killed_pids.add(record["pid"])
+                os.kill(record["pid"], signal.SIGTERM)
+
+        with import_run_helper.simulate() as sim:
+            with self.assertRaises(BrokenProcessPool):
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": os.path.join(sim.tempdir, "csv"),
+                        "chunksize": 5,
+                        "max_workers": 2,
+                        "metrics": {"callback": kill_worker},
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+            self.assertEqual(len(killed_pids), 1)
+
+    def test_load_pipelined(self):
+        class FailingWriter(CBM3ResultsFileWriter):
+            def __init__(self, *args, max_writes):
+                super().__init__(*args)
+                self.max_writes = max_writes
+
+            def write(self, table_name, df):
+                if not self.max_writes:
+                    raise RuntimeError("write failed")
+                self.max_writes -= 1
+                super().write(table_name, df)
+
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            for name, pipelined in [
+                ("sequential", False),
+                ("pipelined", True),
+            ]:
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": os.path.join(sim.tempdir, name),
+                        "chunksize": 5,
+                        "pipelined": pipelined,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+            sequential_dir = os.path.join(sim.tempdir, "sequential")
+            pipelined_dir = os.path.join(sim.tempdir, "pipelined")
+            self.assertEqual(
+                sorted(os.listdir(sequential_dir)),
+                sorted(os.listdir(pipelined_dir)),
+            )
+            for file_name in os.listdir(sequential_dir):
+                self.assertTrue(
+                    pd.read_csv(
+                        os.path.join(sequential_dir, file_name)
+                    ).equals(
+                        pd.read_csv(os.path.join(pipelined_dir, file_name))
+                    )
+                )
+
+            # an error raised in the write stage reaches the caller
+            with self.assertRaisesRegex(RuntimeError, "write failed"):
+                cbm3_output_loader.load_file(
+                    FailingWriter(
+                        "csv",
+                        os.path.join(sim.tempdir, "failed_write"),
+                        None,
+                        max_writes=20,
+                    ),
+                    cbm_output_dir,
+                    sim.project_path,
+                    sim.aidb_path,
+                    chunksize=5,
+                    pipelined=True,
+                )
+
+            # an error raised in the parse stage reaches the caller
+            with patch.object(
+                cbm3_output_files,
+                "load_flux_indicators",
+                side_effect=RuntimeError("parse failed"),
+            ):
+                with self.assertRaisesRegex(RuntimeError, "parse failed"):
+                    cbm3_output_loader.load(
+                        loader_config={
+                            "type": "csv",
+                            "output_path": os.path.join(
+                                sim.tempdir, "failed_parse"
+                            ),
+                            "chunksize": 5,
+                            "pipelined": True,
+                        },
+                        cbm_output_dir=cbm_output_dir,
+                        project_db_path=sim.project_path,
+                        aidb_path=sim.aidb_path,
+                    )
+
+    def test_memory_budget_chunksize(self):
+        get_memory_budget_chunksize = (
+            cbm3_output_files_loader.get_memory_budget_chunksize
+        )
+        self.assertEqual(get_memory_budget_chunksize(1, 256), 1024)
+        # the default row size estimate
+        self.assertEqual(get_memory_budget_chunksize(1), 128)
+        self.assertEqual(get_memory_budget_chunksize(1e-6, 256), 1)
+
+        chunk_sizer = cbm3_output_files_loader._ChunkSizer(100)
+        self.assertEqual(chunk_sizer.chunksize, 1000)
+        wide_chunk = pd.DataFrame(
+            {"a": ["x" * 100] * 10, "b": np.arange(10.0)}
+        )
+        n_rows = len(wide_chunk.index)
+        row_bytes = wide_chunk.memory_usage(index=True, deep=True).sum()
+        chunk_sizer.observe(n_rows, wide_chunk)
+        expected_chunksize = get_memory_budget_chunksize(
+            100, row_bytes / n_rows
+        )
+        self.assertEqual(chunk_sizer.chunksize, expected_chunksize)
+        # the widest observed rows size the chunks
+        chunk_sizer.observe(n_rows, wide_chunk[["b"]])
+        self.assertEqual(chunk_sizer.chunksize, expected_chunksize)
+
+    def test_load_memory_budget(self):
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            reference_dir = os.path.join(sim.tempdir, "reference")
+            budget_dir = os.path.join(sim.tempdir, "budget")
+            memory_budget_mb = 0.05
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "csv",
+                    "output_path": reference_dir,
+                    "chunksize": None,
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            records = []
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "csv",
+                    "output_path": budget_dir,
+                    "memory_budget_mb": memory_budget_mb,
+                    "metrics": {"callback": records.append},
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            expected = pd.read_csv(
+                os.path.join(reference_dir, "tblFluxIndicators.csv")
+            )
+            self.assertTrue(
+                expected.equals(
+                    pd.read_csv(
+                        os.path.join(budget_dir, "tblFluxIndicators.csv")
+                    )
+                )
+            )
+
+            chunk_rows = [
+                record["rows"]
+                for record in sorted(
+                    records, key=lambda record: record["chunk_index"]
+                )
+                if record["table_name"] == "tblFluxIndicators"
+                and record["stage"] == "out_func"
+            ]
+            # the first chunk of each table is sized without a measurement
+            self.assertEqual(
+                chunk_rows[0],
+                min(
+                    cbm3_output_files_loader._PROBE_CHUNKSIZE,
+                    cbm3_output_files_loader.get_memory_budget_chunksize(
+                        memory_budget_mb
+                    ),
+                ),
+            )
+            self.assertGreater(len(chunk_rows), 1)
+            self.assertEqual(sum(chunk_rows), len(expected.index))
+
+            with self.assertRaises(ValueError):
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": os.path.join(sim.tempdir, "invalid"),
+                        "chunksize": 5,
+                        "memory_budget_mb": memory_budget_mb,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+
+    def test_load_metrics(self):
+        with import_run_helper.simulate() as sim:
+            records = []
+            json_lines_path = os.path.join(sim.tempdir, "metrics.jsonl")
+            summary = cbm3_output_loader.load(
+                loader_config={
+                    "type": "csv",
+                    "output_path": os.path.join(sim.tempdir, "csv"),
+                    "chunksize": 5,
+                    "metrics": {
+                        "json_lines_path": json_lines_path,
+                        "callback": records.append,
+                    },
+                },
+                cbm_output_dir=os.path.join(
+                    sim.tempfiles_dir, "CBMRun", "output"
+                ),
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            json_records = pd.read_json(json_lines_path, lines=True)
+            self.assertEqual(len(json_records.index), len(records))
+            for record in records:
+                self.assertGreater(record["rss"], 0)
+                self.assertIn("rss_delta", record)
+            self.assertEqual(
+                set(summary.stage),
+                {
+                    "load_function",
+                    "process_function",
+                    "describe_function",
+                    "out_func",
+                },
+            )
+            out_rows = summary[summary.stage == "out_func"].set_index(
+                "table_name"
+            )
+            for table_name in out_rows.index:
+                self.assertEqual(
+                    out_rows.loc[table_name, "rows"],
+                    len(
+                        pd.read_csv(
+                            os.path.join(
+                                sim.tempdir, "csv", f"{table_name}.csv"
+                            )
+                        ).index
+                    ),
+                )
+
+    def test_load_checkpoint_resume(self):
+        class InterruptedWriter(CBM3ResultsFileWriter):
+            def __init__(self, *args, max_writes, write_interrupted, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.max_writes = max_writes
+                self.write_interrupted = write_interrupted
+
+            def write(self, table_name, df):
+                if not self.max_writes:
+                    if self.write_interrupted:
+                        # the chunk is written, but not recorded
+                        super().write(table_name, df)
+                    raise RuntimeError("interrupted")
+                self.max_writes -= 1
+                super().write(table_name, df)
+
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            reference_dir = os.path.join(sim.tempdir, "reference")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "csv",
+                    "output_path": reference_dir,
+                    "chunksize": 5,
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            table_names = [
+                file_name[: -len(".csv")]
+                for file_name in os.listdir(reference_dir)
+            ]
+            for name, write_interrupted, compression in [
+                ("resumed", False, None),
+                ("resumed_written", True, None),
+                ("resumed_gzip", True, "gzip"),
+            ]:
+                resumed_dir = os.path.join(sim.tempdir, name)
+                checkpoint_path = os.path.join(sim.tempdir, f"{name}.json")
+                with self.assertRaises(RuntimeError):
+                    with InterruptedWriter(
+                        "csv",
+                        resumed_dir,
+                        None,
+                        max_writes=20,
+                        write_interrupted=write_interrupted,
+                        compression=compression,
+                    ) as writer:
+                        cbm3_output_loader.load_file(
+                            writer,
+                            cbm_output_dir,
+                            sim.project_path,
+                            sim.aidb_path,
+                            chunksize=5,
+                            checkpoint=(
+                                cbm3_output_loader_checkpoint.LoadCheckpoint(
+                                    checkpoint_path
+                                )
+                            ),
+                        )
+                self.assertTrue(os.path.exists(checkpoint_path))
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": resumed_dir,
+                        "chunksize": 5,
+                        "compression": compression,
+                        "checkpoint_path": checkpoint_path,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                self.assertFalse(os.path.exists(checkpoint_path))
+                self.assertEqual(
+                    len(os.listdir(reference_dir)),
+                    len(os.listdir(resumed_dir)),
+                )
+                for table_name in table_names:
+                    self.assertTrue(
+                        pd.read_csv(
+                            cbm3_results_file_writer.get_csv_path(
+                                reference_dir, table_name
+                            )
+                        ).equals(
+                            pd.read_csv(
+                                cbm3_results_file_writer.get_csv_path(
+                                    resumed_dir, table_name, compression
+                                )
+                            )
+                        )
+                    )
+
+    def test_load_checkpoint_resume_sqlite(self):
+        class InterruptedDBWriter(CBMResultsDBWriter):
+            def __init__(self, *args, max_writes):
+                super().__init__(*args)
+                self.max_writes = max_writes
+
+            def write(self, table_name, df):
+                # interrupted after the chunk is written, but before it is
+                # recorded in the checkpoint
+                super().write(table_name, df)
+                self.max_writes -= 1
+                if not self.max_writes:
+                    raise RuntimeError("interrupted")
+
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            reference_sqlite = os.path.join(sim.tempdir, "reference.db")
+            resumed_sqlite = os.path.join(sim.tempdir, "resumed.db")
+            checkpoint_path = os.path.join(sim.tempdir, "checkpoint.json")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{reference_sqlite}",
+                    "chunksize": 5,
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            with self.assertRaises(RuntimeError):
+                with InterruptedDBWriter(
+                    f"sqlite:///{resumed_sqlite}",
+                    cbm3_results_db_schema.get_constraints(),
+                    max_writes=20,
+                ) as db_writer:
+                    cbm3_output_loader.load_db(
+                        db_writer,
+                        cbm_output_dir,
+                        sim.project_path,
+                        sim.aidb_path,
+                        chunksize=5,
+                        checkpoint=(
+                            cbm3_output_loader_checkpoint.LoadCheckpoint(
+                                checkpoint_path
+                            )
+                        ),
+                    )
+            self.assertTrue(os.path.exists(checkpoint_path))
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{resumed_sqlite}",
+                    "chunksize": 5,
+                    "checkpoint_path": checkpoint_path,
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            self.assertFalse(os.path.exists(checkpoint_path))
+            with sqlite3.connect(reference_sqlite) as reference_con:
+                table_names = pd.read_sql(
+                    "SELECT name FROM sqlite_master WHERE type='table'",
+                    reference_con,
+                ).name
+                reference = {
+                    table_name: pd.read_sql(
+                        f"SELECT * FROM {table_name}", reference_con
+                    )
+                    for table_name in table_names
+                }
+            reference_con.close()
+            with sqlite3.connect(resumed_sqlite) as resumed_con:
+                for table_name, reference_table in reference.items():
+                    pd.testing.assert_frame_equal(
+                        reference_table,
+                        pd.read_sql(
+                            f"SELECT * FROM {table_name}", resumed_con
+                        ),
+                    )
+            resumed_con.close()
+
+    def test_load_multiple_runs_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            single_run_sqlite = os.path.join(sim.tempdir, "single.db")
+            multi_run_sqlite = os.path.join(sim.tempdir, "multi.db")
+            load_args = dict(
+                cbm_output_dir=os.path.join(
+                    sim.tempfiles_dir, "CBMRun", "output"
+                ),
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{single_run_sqlite}",
+                },
+                **load_args,
+            )
+            for run_name in ["scenario_a", "scenario_b"]:
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{multi_run_sqlite}",
+                        "run": {"run_name": run_name},
+                    },
+                    **load_args,
+                )
+            with sqlite3.connect(
+                single_run_sqlite
+            ) as single_con, sqlite3.connect(multi_run_sqlite) as multi_con:
+                runs = pd.read_sql("SELECT * FROM tblRuns", multi_con)
+                self.assertEqual(list(runs.RunID), [1, 2])
+                self.assertEqual(
+                    list(runs.RunName), ["scenario_a", "scenario_b"]
+                )
+                single_pools = pd.read_sql(
+                    "SELECT * FROM tblPoolIndicators", single_con
+                )
+                multi_pools = pd.read_sql(
+                    "SELECT * FROM tblPoolIndicators", multi_con
+                )
+                self.assertEqual(
+                    len(multi_pools.index), 2 * len(single_pools.index)
+                )
+                self.assertTrue(multi_pools.PoolIndID.is_unique)
+                for table_name in ["tblSPU", "tblUserDefdClassSets"]:
+                    self.assertEqual(
+                        len(
+                            pd.read_sql(
+                                f"SELECT * FROM {table_name}", multi_con
+                            ).index
+                        ),
+                        len(
+                            pd.read_sql(
+                                f"SELECT * FROM {table_name}", single_con
+                            ).index
+                        ),
+                    )
+            single_con.close()
+            multi_con.close()
+
+    def test_multi_run_metadata_matching(self):
+        id_columns = cbm3_output_files_loader.get_output_table_id_columns()
+        constraints = cbm3_results_db_schema.get_constraints(id_columns)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            url = f"sqlite:///{os.path.join(temp_dir, 'multi.db')}"
+            for run_name in ["scenario_a", "scenario_b"]:
+                with CBMResultsDBWriter(url, constraints) as db_writer:
+                    writer = MultiRunDBWriter(
+                        db_writer, constraints, id_columns
+                    )
+                    writer.add_run("project.mdb", "output", run_name=run_name)
+                    # the key of each row is compared by value, so that
+                    # the rows of the second run match those of the first
+                    writer.write(
+                        "tblKP3334Flags",
+                        pd.DataFrame(
+                            {
+                                "KP3334ID": (
+                                    [0.0, 1.0]
+                                    if run_name == "scenario_a"
+                                    else [0, 1]
+                                ),
+                                "Name": ["a", None],
+                            }
+                        ),
+                    )
+                    if run_name == "scenario_b":
+                        # a row of an existing key must match the existing
+                        # row
+                        with self.assertRaises(ValueError):
+                            writer.write(
+                                "tblKP3334Flags",
+                                pd.DataFrame({"KP3334ID": [1], "Name": ["b"]}),
+                            )
+                    # the written data is not modified
+                    chunk = pd.DataFrame({"PoolIndID": [1, 2], "TimeStep": 1})
+                    writer.write("tblPoolIndicators", chunk)
+                    pd.testing.assert_frame_equal(
+                        chunk,
+                        pd.DataFrame({"PoolIndID": [1, 2], "TimeStep": 1}),
+                    )
+                    with self.assertRaises(ValueError):
+                        writer.write(
+                            "tblUserDefdClassSets",
+                            pd.DataFrame(
+                                {
+                                    "UserDefdClassSetID": [1, 2],
+                                    "Name": ["a,b", "a,b"],
+                                }
+                            ),
+                        )
+            with sqlite3.connect(os.path.join(temp_dir, "multi.db")) as con:
+                self.assertEqual(
+                    len(pd.read_sql("SELECT * FROM tblKP3334Flags", con)), 2
+                )
+            con.close()
+
+    def test_load_stock_changes_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            output_sqlite = os.path.join(sim.tempdir, "output.db")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{output_sqlite}",
+                    "chunksize": 5,
+                    "stock_changes": True,
+                },
+                cbm_output_dir=os.path.join(
+                    sim.tempfiles_dir, "CBMRun", "output"
+                ),
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            with sqlite3.connect(output_sqlite) as sqlite_con:
+                expected = (
+                    cbm3_results.load_stock_changes(sqlite_con)
+                    .groupby("TimeStep")["Delta Total Ecosystem"]
+                    .sum()
+                )
+                stock_changes = pd.read_sql(
+                    "SELECT * FROM tblStockChanges", sqlite_con
+                )
+                rollup = pd.read_sql(
+                    "SELECT * FROM tblStockChangesByTimeStep", sqlite_con
+                )
+                flux_count = pd.read_sql(
+                    "SELECT COUNT(*) AS n FROM tblFluxIndicators", sqlite_con
+                ).n.iloc[0]
+            sqlite_con.close()
+            self.assertEqual(len(stock_changes.index), flux_count)
+            for result in [stock_changes, rollup]:
+                np.testing.assert_allclose(
+                    result.groupby("TimeStep")["Delta Total Ecosystem"]
+                    .sum()
+                    .to_numpy(),
+                    expected.to_numpy(),
+                )
+
+    def test_aggregate_stock_changes(self):
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            output_sqlite = os.path.join(sim.tempdir, "output.db")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{output_sqlite}",
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            with sqlite3.connect(output_sqlite) as sqlite_con:
+                expected = (
+                    cbm3_results.load_stock_changes(sqlite_con)
+                    .groupby(["TimeStep", "DistTypeID"])[
+                        stock_changes_view.get_stock_changes_columns()
+                    ]
+                    .sum()
+                    .reset_index()
+                )
+                from_db = stock_changes_view.aggregate_stock_changes(
+                    pd.read_sql(
+                        "SELECT * FROM tblFluxIndicators",
+                        sqlite_con,
+                        chunksize=5,
+                    )
+                )
+            sqlite_con.close()
+            from_files = stock_changes_view.aggregate_stock_changes(
+                cbm3_output_files_loader.iter_flux_indicators(
+                    cbm_output_dir, 5
+                )
+            )
+            for result in [from_db, from_files]:
+                pd.testing.assert_frame_equal(
+                    expected, result, check_dtype=False
+                )
+
+    def test_load_parquet(self):
+        with import_run_helper.simulate() as sim:
+            csv_path = os.path.join(sim.tempdir, "csv")
+            load_args = dict(
+                cbm_output_dir=os.path.join(
+                    sim.tempfiles_dir, "CBMRun", "output"
+                ),
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            cbm3_output_loader.load(
+                loader_config={"type": "csv", "output_path": csv_path},
+                **load_args,
+            )
+            csv_result = pd.read_csv(
+                os.path.join(csv_path, "tblFluxIndicators.csv")
+            )
+            for partition_by_timestep in [False, True]:
+                parquet_path = os.path.join(
+                    sim.tempdir, f"parquet_{partition_by_timestep}"
+                )
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "parquet",
+                        "output_path": parquet_path,
+                        "chunksize": 13,
+                        "writer_kwargs": {"compression": "zstd"},
+                        "partition_by_timestep": partition_by_timestep,
+                    },
+                    **load_args,
+                )
+                parquet_result = cbm3_results_file_writer.read_parquet(
+                    parquet_path, "tblFluxIndicators"
+                )
+                parquet_result = parquet_result[csv_result.columns]
+                self.assertEqual(
+                    len(parquet_result.index), len(csv_result.index)
+                )
+                timestep_result = cbm3_results_file_writer.read_parquet(
+                    parquet_path,
+                    "tblFluxIndicators",
+                    columns=["TimeStep", "GrossGrowth_AG"],
+                    timesteps=[1, 2],
+                )
+                self.assertEqual(
+                    list(timestep_result.columns),
+                    ["TimeStep", "GrossGrowth_AG"],
+                )
+                self.assertEqual(set(timestep_result.TimeStep), {1, 2})
+                np.testing.assert_allclose(
+                    timestep_result.GrossGrowth_AG.sum(),
+                    csv_result[
+                        csv_result.TimeStep.isin([1, 2])
+                    ].GrossGrowth_AG.sum(),
+                )
+
+    def test_load_arrow(self):
+        with import_run_helper.simulate() as sim:
+            csv_path = os.path.join(sim.tempdir, "csv")
+            arrow_path = os.path.join(sim.tempdir, "arrow")
+            load_args = dict(
+                cbm_output_dir=os.path.join(
+                    sim.tempfiles_dir, "CBMRun", "output"
+                ),
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            cbm3_output_loader.load(
+                loader_config={"type": "csv", "output_path": csv_path},
+                **load_args,
+            )
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "arrow",
+                    "output_path": arrow_path,
+                    "chunksize": 13,
+                },
+                **load_args,
+            )
+            csv_result = pd.read_csv(
+                os.path.join(csv_path, "tblFluxIndicators.csv")
+            )
+            arrow_result = cbm3_results_file_writer.read_arrow(
+                arrow_path, "tblFluxIndicators", columns=["GrossGrowth_AG"]
+            )
+            self.assertEqual(list(arrow_result.columns), ["GrossGrowth_AG"])
+            np.testing.assert_allclose(
+                arrow_result.GrossGrowth_AG.to_numpy(),
+                csv_result.GrossGrowth_AG.to_numpy(),
+            )
+
+    def test_file_writer_null_first_chunk(self):
+        # the columns having only null values in the first chunk are
+        # written with the types of the values of later chunks
+        chunks = [
+            pd.DataFrame(
+                {
+                    "TimeStep": [1, 1],
+                    "Name": [None, None],
+                    "Value": [np.nan, np.nan],
+                }
+            ),
+            pd.DataFrame(
+                {"TimeStep": [1, 2], "Name": ["a", "b"], "Value": [1.5, 2.0]}
+            ),
+            pd.DataFrame(
+                {"TimeStep": [3, 3], "Name": ["c", None], "Value": [1, 2]}
+            ),
+        ]
+        expected = pd.concat(chunks, ignore_index=True)
+        for format, partition_by_timestep in [
+            ("parquet", False),
+            ("parquet", True),
+            ("arrow", False),
+        ]:
+            with tempfile.TemporaryDirectory() as out_path:
+                with CBM3ResultsFileWriter(
+                    format,
+                    out_path,
+                    None,
+                    partition_by_timestep=partition_by_timestep,
+                ) as writer:
+                    for chunk in chunks:
+                        writer.write("tblTest", chunk)
+                if format == "parquet":
+                    result = cbm3_results_file_writer.read_parquet(
+                        out_path, "tblTest"
+                    )
+                else:
+                    result = cbm3_results_file_writer.read_arrow(
+                        out_path, "tblTest"
+                    )
+                result = result[expected.columns].sort_values(
+                    ["TimeStep", "Value"], ignore_index=True
+                )
+                pd.testing.assert_frame_equal(
+                    expected.sort_values(
+                        ["TimeStep", "Value"], ignore_index=True
+                    ).fillna({"Name": ""}),
+                    result.fillna({"Name": ""}),
+                    check_dtype=False,
+                )
+
+    def test_file_writer_flushes_csv_chunks(self):
+        chunks = [
+            pd.DataFrame({"Name": ["a", "b"], "Value": [1.5, 2.0]}),
+            pd.DataFrame({"Name": ["c"], "Value": [3.0]}),
+        ]
+        compressions = [None, "gzip"]
+        if cbm3_results_file_writer.zstandard is not None:
+            compressions.append("zstd")
+        for compression in compressions:
+            with tempfile.TemporaryDirectory() as out_path:
+                csv_path = cbm3_results_file_writer.get_csv_path(
+                    out_path, "tblTest", compression
+                )
+                with CBM3ResultsFileWriter(
+                    "csv", out_path, None, compression=compression
+                ) as writer:
+                    for i_chunk, chunk in enumerate(chunks):
+                        writer.write("tblTest", chunk)
+                        # each written chunk is readable while the file is
+                        # held open
+                        pd.testing.assert_frame_equal(
+                            pd.read_csv(csv_path),
+                            pd.concat(
+                                chunks[: i_chunk + 1], ignore_index=True
+                            ),
+                        )
+
+    def test_load_sqlite_bulk_load(self):
+        with import_run_helper.simulate() as sim:
+            results = []
+            index_names = []
+            for name, sqlite_bulk_load in [("to_sql", False), ("bulk", True)]:
+                output_sqlite = os.path.join(sim.tempdir, f"{name}.db")
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{output_sqlite}",
+                        "chunksize": 5,
+                        "sqlite_bulk_load": sqlite_bulk_load,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                with sqlite3.connect(output_sqlite) as sqlite_con:
+                    results.append(
+                        cbm3_results.load_stock_changes(
+                            sqlite_con, True, True, True, True, False
+                        )
+                    )
+                    index_names.append(
+                        pd.read_sql(
+                            "SELECT name FROM sqlite_master "
+                            "WHERE type = 'index' ORDER BY name",
+                            sqlite_con,
+                        ).name.tolist()
+                    )
+                    journal_mode = sqlite_con.execute(
+                        "PRAGMA journal_mode"
+                    ).fetchone()[0]
+                sqlite_con.close()
+            self.assertTrue(results[0].equals(results[1]))
+            self.assertEqual(index_names[0], index_names[1])
+            self.assertEqual(journal_mode, "delete")
+
+    def test_load_deferred_constraints_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            results = []
+            table_sql = []
+            index_names = []
+            for name, deferred_constraints, query_indexes in [
+                ("constrained", False, None),
+                ("deferred", True, ["TimeStep", "CO2Production"]),
+            ]:
+                output_sqlite = os.path.join(sim.tempdir, f"{name}.db")
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{output_sqlite}",
+                        "chunksize": 5,
+                        "deferred_constraints": deferred_constraints,
+                        "query_indexes": query_indexes,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                with sqlite3.connect(output_sqlite) as sqlite_con:
+                    results.append(
+                        cbm3_results.load_stock_changes(
+                            sqlite_con, True, True, True, True, False
+                        )
+                    )
+                    sqlite_master = pd.read_sql(
+                        "SELECT type, name, sql FROM sqlite_master",
+                        sqlite_con,
+                    )
+                sqlite_con.close()
+                tables = sqlite_master[sqlite_master.type == "table"]
+                table_sql.append(dict(zip(tables.name, tables.sql)))
+                index_names.append(
+                    set(sqlite_master[sqlite_master.type == "index"].name)
+                )
+            self.assertTrue(results[0].equals(results[1]))
+            # the tables are created with the same constraints, with only
+            # the indexes deferred
+            self.assertEqual(table_sql[0], table_sql[1])
+            # TimeStep is already indexed, so only the CO2Production index
+            # is added
+            self.assertEqual(
+                index_names[0] | {"ix_tblFluxIndicators_CO2Production"},
+                index_names[1],
+            )
+
+    def test_db_writer_closed_on_finalize_error(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_sqlite = os.path.join(temp_dir, "output.db")
+            with patch.object(
+                CBMResultsDBWriter,
+                "finalize",
+                side_effect=RuntimeError("finalize failed"),
+            ):
+                with self.assertRaisesRegex(RuntimeError, "finalize failed"):
+                    with CBMResultsDBWriter(
+                        f"sqlite:///{output_sqlite}",
+                        cbm3_results_db_schema.get_constraints(),
+                        sqlite_bulk_load=True,
+                    ) as db_writer:
+                        db_writer.write(
+                            "tblSPU", pd.DataFrame({"SPUID": [1, 2]})
+                        )
+            # the bulk load transaction was closed along with the
+            # connection, releasing the lock on the database
+            with sqlite3.connect(output_sqlite, timeout=0) as sqlite_con:
+                sqlite_con.execute("BEGIN EXCLUSIVE")
+                sqlite_con.rollback()
+            sqlite_con.close()
+
+    @unittest.skipIf(
+        not os.environ.get("CBM3_PYTHON_TEST_POSTGRES_URL"),
+        "set CBM3_PYTHON_TEST_POSTGRES_URL to the url of a scratch "
+        "PostgreSQL database to run this test. Its tables are dropped.",
+    )
+    def test_load_postgres_copy(self):
+        postgres_url = os.environ["CBM3_PYTHON_TEST_POSTGRES_URL"]
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            output_sqlite = os.path.join(sim.tempdir, "results.db")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{output_sqlite}",
+                    "chunksize": 5,
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            expected = pd.read_sql_table(
+                "tblFluxIndicators", f"sqlite:///{output_sqlite}"
+            ).sort_values("FluxIndicatorID", ignore_index=True)
+            for copy_format in ["csv", "binary"]:
+                engine = sqlalchemy.create_engine(postgres_url)
+                meta = sqlalchemy.MetaData()
+                meta.reflect(engine)
+                meta.drop_all(engine)
+                engine.dispose()
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": postgres_url,
+                        "chunksize": 5,
+                        "postgres_copy": copy_format,
+                    },
+                    cbm_output_dir=cbm_output_dir,
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                result = pd.read_sql_table(
+                    "tblFluxIndicators", postgres_url
+                ).sort_values("FluxIndicatorID", ignore_index=True)
+                pd.testing.assert_frame_equal(
+                    expected, result, check_dtype=False
+                )
+
+    def test_load_async_writer_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            results = []
+            for name, async_writer in [
+                ("sync", None),
+                ("async", {"max_queue_size": 2}),
+            ]:
+                output_sqlite = os.path.join(sim.tempdir, f"{name}.db")
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{output_sqlite}",
+                        "chunksize": 5,
+                        "async_writer": async_writer,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+                with sqlite3.connect(output_sqlite) as sqlite_con:
+                    results.append(
+                        cbm3_results.load_stock_changes(
+                            sqlite_con, True, True, True, True, False
+                        )
+                    )
+                sqlite_con.close()
+            self.assertTrue(results[0].equals(results[1]))
+
+    def test_load_compressed_csv(self):
+        with import_run_helper.simulate() as sim:
+            csv_path = os.path.join(sim.tempdir, "csv")
+            gzip_path = os.path.join(sim.tempdir, "gzip")
+            for output_path, compression, float_format in [
+                (csv_path, None, None),
+                (gzip_path, "gzip", "%.10g"),
+            ]:
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "csv",
+                        "output_path": output_path,
+                        "chunksize": 5,
+                        "compression": compression,
+                        "float_format": float_format,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+            csv_file = os.path.join(csv_path, "tblFluxIndicators.csv")
+            gzip_file = os.path.join(gzip_path, "tblFluxIndicators.csv.gz")
+            self.assertTrue(
+                os.path.getsize(gzip_file) < os.path.getsize(csv_file)
+            )
+            expected = pd.read_csv(csv_file)
+            result = pd.read_csv(gzip_file)
+            self.assertTrue(list(expected.columns) == list(result.columns))
+            self.assertTrue(
+                np.allclose(expected.CO2Production, result.CO2Production)
+            )
+
+    @unittest.skipIf(
+        cbm3_results_duckdb_writer.duckdb is None,
+        "the duckdb loader type requires duckdb",
+    )
+    def test_load_duckdb(self):
+        import duckdb
+
+        with import_run_helper.simulate() as sim:
+            output_sqlite = os.path.join(sim.tempdir, "output.db")
+            output_duckdb = os.path.join(sim.tempdir, "output.duckdb")
+            for loader_config in [
+                {"type": "db", "url": f"sqlite:///{output_sqlite}"},
+                {"type": "duckdb", "output_path": output_duckdb},
+            ]:
+                loader_config["chunksize"] = 5
+                cbm3_output_loader.load(
+                    loader_config=loader_config,
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+            sqlite_con = sqlite3.connect(output_sqlite)
+            duckdb_con = duckdb.connect(output_duckdb)
+            try:
+                for load_func in [
+                    cbm3_results.load_pool_indicators,
+                    cbm3_results.load_flux_indicators,
+                    cbm3_results.load_age_indicators,
+                    cbm3_results.load_disturbance_indicators,
+                    cbm3_results.load_stock_changes,
+                ]:
+                    expected = load_func(
+                        sqlite_con, classifier_set_grouping=True
+                    )
+                    result = load_func(
+                        duckdb_con, classifier_set_grouping=True
+                    )
+                    pd.testing.assert_frame_equal(
+                        expected.sort_values(
+                            list(expected.columns)
+                        ).reset_index(drop=True),
+                        result[expected.columns]
+                        .sort_values(list(expected.columns))
+                        .reset_index(drop=True),
+                        check_dtype=False,
+                    )
+            finally:
+                sqlite_con.close()
+                duckdb_con.close()
+
+    def test_load_rollups_sqlite(self):
+        with import_run_helper.simulate() as sim:
+            output_sqlite = os.path.join(sim.tempdir, "output.db")
+            rollups_sqlite = os.path.join(sim.tempdir, "rollups.db")
+            for path, rollups in [
+                (output_sqlite, None),
+                (rollups_sqlite, [["disturbance_type", "spatial_unit"]]),
+            ]:
+                cbm3_output_loader.load(
+                    loader_config={
+                        "type": "db",
+                        "url": f"sqlite:///{path}",
+                        "chunksize": 5,
+                        "rollups": rollups,
+                    },
+                    cbm_output_dir=os.path.join(
+                        sim.tempfiles_dir, "CBMRun", "output"
+                    ),
+                    project_db_path=sim.project_path,
+                    aidb_path=sim.aidb_path,
+                )
+            sqlite_con = sqlite3.connect(output_sqlite)
+            rollups_con = sqlite3.connect(rollups_sqlite)
+            try:
+                with cbm3_results.CBM3Results(rollups_con) as results:
+                    for table_name in [
+                        "tblPoolIndicators",
+                        "tblFluxIndicators",
+                        "tblDistIndicators",
+                    ]:
+                        self.assertIsNotNone(
+                            results.get_rollup_table_name(
+                                table_name, ["spatial_unit"]
+                            )
+                        )
+                for load_func in [
+                    cbm3_results.load_pool_indicators,
+                    cbm3_results.load_flux_indicators,
+                    cbm3_results.load_disturbance_indicators,
+                    cbm3_results.load_stock_changes,
+                ]:
+                    expected = load_func(
+                        sqlite_con, spatial_unit_grouping=True
+                    )
+                    result = load_func(rollups_con, spatial_unit_grouping=True)
+                    pd.testing.assert_frame_equal(
+                        expected.sort_values(
+                            list(expected.columns)
+                        ).reset_index(drop=True),
+                        result[expected.columns]
+                        .sort_values(list(expected.columns))
+                        .reset_index(drop=True),
+                        check_dtype=False,
+                    )
+            finally:
+                sqlite_con.close()
+                rollups_con.close()
@@ -1,9 +1,12 @@
 import os
 import unittest
 import sqlite3
+import pandas as pd
 
 from cbm3_python.cbm3data import cbm3_results
+from cbm3_python.cbm3data import cbm3_results_cache
 from cbm3_python.cbm3data import cbm3_output_loader
+from cbm3_python.cbm3data import cbm3_output_files_query
 from test.integration import import_run_helper
 
 
@@ -74,3 +77,172 @@ class CBMResultsIntegrationTests(unittest.TestCase):
             self.assertTrue(
                 list(dist_ind.columns) == list(dist_ind_sqlite.columns)
             )
+
+    def test_results_session(self):
+        with import_run_helper.simulate() as sim:
+            expected_flux_ind = cbm3_results.load_flux_indicators(
+                sim.results_path, True, True, True, True, False
+            )
+            expected_pool_ind = cbm3_results.load_pool_indicators(
+                sim.results_path, True, True, True, False
+            )
+            with cbm3_results.CBM3Results(sim.results_path) as results:
+                flux_ind = results.load_flux_indicators(
+                    True, True, True, True, False
+                )
+                pool_ind = results.load_pool_indicators(
+                    True, True, True, False
+                )
+            pd.testing.assert_frame_equal(expected_flux_ind, flux_ind)
+            pd.testing.assert_frame_equal(expected_pool_ind, pool_ind)
+
+    @unittest.skipIf(
+        cbm3_results_cache.pyarrow is None,
+        "the query cache requires pyarrow",
+    )
+    def test_query_cache(self):
+        with import_run_helper.simulate() as sim:
+            expected = cbm3_results.load_flux_indicators(
+                sim.results_path, True, True, True, True, False
+            )
+            cache_dir = os.path.join(sim.tempdir, "query_cache")
+            cbm3_results.set_query_cache(cache_dir)
+            try:
+                results = [
+                    cbm3_results.load_flux_indicators(
+                        sim.results_path, True, True, True, True, False
+                    )
+                    for _ in range(2)
+                ]
+            finally:
+                cbm3_results.set_query_cache(None)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            for result in results:
+                pd.testing.assert_frame_equal(expected, result)
+
+    @unittest.skipIf(
+        cbm3_output_files_query.duckdb is None,
+        "querying CBM output files requires duckdb",
+    )
+    def test_query_output_files(self):
+        with import_run_helper.simulate() as sim:
+            cbm_output_dir = os.path.join(
+                sim.tempfiles_dir, "CBMRun", "output"
+            )
+            output_sqlite = os.path.join(sim.tempdir, "results_sqlite.db")
+            cbm3_output_loader.load(
+                loader_config={
+                    "type": "db",
+                    "url": f"sqlite:///{output_sqlite}",
+                },
+                cbm_output_dir=cbm_output_dir,
+                project_db_path=sim.project_path,
+                aidb_path=sim.aidb_path,
+            )
+            sqlite_con = sqlite3.connect(output_sqlite)
+            # the second connection queries the Parquet copies cached by
+            # the first
+            cache_dir = os.path.join(sim.tempdir, "output_cache")
+            for _ in range(2):
+                with cbm3_output_files_query.connect(
+                    cbm_output_dir,
+                    sim.project_path,
+                    sim.aidb_path,
+                    cache_dir=cache_dir,
+                ) as query_con:
+                    for load_func in [
+                        cbm3_results.load_pool_indicators,
+                        cbm3_results.load_flux_indicators,
+                        cbm3_results.load_age_indicators,
+                        cbm3_results.load_disturbance_indicators,
+                    ]:
+                        expected = load_func(sqlite_con, True, True, True)
+                        result = load_func(query_con, True, True, True)
+                        columns = list(expected.columns)
+                        pd.testing.assert_frame_equal(
+                            expected.sort_values(columns).reset_index(
+                                drop=True
+                            ),
+                            result[columns]
+                            .sort_values(columns)
+                            .reset_index(drop=True),
+                            check_dtype=False,
+                        )
+            sqlite_con.close()
+
+    def test_load_filters(self):
+        with import_run_helper.simulate() as sim:
+            unfiltered = cbm3_results.load_flux_indicators(
+                sim.results_path,
+                disturbance_type_grouping=True,
+                spatial_unit_grouping=True,
+            )
+            spatial_unit_id = unfiltered.SPUID.iloc[0]
+            expected = unfiltered[
+                (unfiltered.TimeStep >= 1)
+                & (unfiltered.TimeStep <= 5)
+                & (unfiltered.SPUID == spatial_unit_id)
+            ]
+            result = cbm3_results.load_flux_indicators(
+                sim.results_path,
+                disturbance_type_grouping=True,
+                spatial_unit_grouping=True,
+                timestep_range=(1, 5),
+                spatial_unit_ids=[spatial_unit_id],
+            )
+            self.assertGreater(len(result.index), 0)
+            columns = ["TimeStep", "SPUID", "DistTypeID"]
+            pd.testing.assert_frame_equal(
+                expected.sort_values(columns).reset_index(drop=True),
+                result.sort_values(columns).reset_index(drop=True),
+            )
+
+    def test_classifier_values_cache(self):
+        with import_run_helper.simulate() as sim:
+            results = [
+                cbm3_results.load_pool_indicators(
+                    sim.results_path, classifier_set_grouping=True
+                )
+                for _ in range(2)
+            ]
+            pd.testing.assert_frame_equal(results[0], results[1])
+            # the classifier value columns precede the indicator columns
+            classifier_columns = results[0].columns[
+                1 : results[0].columns.get_loc("TimeStep")
+            ]
+            self.assertGreater(len(classifier_columns), 0)
+            for column in classifier_columns:
+                self.assertIsInstance(
+                    results[0][column].dtype, pd.CategoricalDtype
+                )
+
+    def test_load_indicator_bundle(self):
+        with import_run_helper.simulate() as sim:
+            bundle = cbm3_results.load_indicator_bundle(
+                sim.results_path, spatial_unit_grouping=True
+            )
+            expected = dict(
+                pool_indicators=cbm3_results.load_pool_indicators(
+                    sim.results_path, spatial_unit_grouping=True
+                ),
+                flux_indicators=cbm3_results.load_flux_indicators(
+                    sim.results_path,
+                    disturbance_type_grouping=True,
+                    spatial_unit_grouping=True,
+                ),
+                stock_changes=cbm3_results.load_stock_changes(
+                    sim.results_path, spatial_unit_grouping=True
+                ),
+                age_indicators=cbm3_results.load_age_indicators(
+                    sim.results_path, spatial_unit_grouping=True
+                ),
+                disturbance_indicators=(
+                    cbm3_results.load_disturbance_indicators(
+                        sim.results_path,
+                        disturbance_type_grouping=True,
+                        spatial_unit_grouping=True,
+                    )
+                ),
+            )
+            for name, df in expected.items():
+                pd.testing.assert_frame_equal(df, getattr(bundle, name))